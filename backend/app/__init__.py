@@ -1,43 +1,61 @@
+import logging
 from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import Config
-db = SQLAlchemy()
+from app.services.replica import RoutingSession
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 from app.models import User, Tenant, Product, Event, CustomerProfile, UserRole
 migrate = Migrate()
 jwt = JWTManager()
+logger = logging.getLogger(__name__)
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Pool profile from the DB_* settings unless engine options were given explicitly
+    from app.services import pooling
+    if not app.config.get('SQLALCHEMY_ENGINE_OPTIONS'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = pooling.engine_options(app.config)
+    # Optional DATABASE_REPLICA_URL bind for read-only views
+    from app.services import replica
+    replica.init_app(app)
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+
+    # Request/SQL metrics on /metrics and the slow-query log
+    from app.services import metrics
+    metrics.init_app(app, db)
+    # Test mode: per-endpoint statement budgets and N+1 detection
+    from app.services import query_budget
+    query_budget.init_app(app, db)
     
     # CORS: Allow Vercel production URL and local development
     CORS(app, resources={r"/*": {"origins": [
         "https://queens-mall.vercel.app", 
         "http://localhost:5173"
-    ]}})
+    ]}}, expose_headers=["X-Next-Cursor", replica.STICKY_HEADER])
 
     # JWT Error Handlers for debugging
     @jwt.invalid_token_loader
     def invalid_token_callback(error_string):
-        print(f"Invalid token: {error_string}")
+        logger.info("Invalid token: %s", error_string)
         return jsonify({"message": f"Invalid token: {error_string}"}), 401
 
     @jwt.unauthorized_loader
     def missing_token_callback(error_string):
-        print(f"Missing token: {error_string}")
+        logger.info("Missing token: %s", error_string)
         return jsonify({"message": f"Missing authorization header: {error_string}"}), 401
 
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
-        print(f"Token expired: {jwt_payload}")
+        logger.info("Token expired for %s", jwt_payload.get('sub'))
         return jsonify({"message": "Token has expired"}), 401
 
     # Register blueprints
@@ -48,6 +66,16 @@ def create_app(config_class=Config):
     app.register_blueprint(customer.bp)
     app.register_blueprint(events.bp)
     
+    # Background jobs and CLI commands
+    from app import commands
+    from app.services import background, expiry, idempotency, revenue
+    background.init_app(app, [
+        ('REVENUE_COMPACT_INTERVAL', revenue.compact),
+        ('ORDER_EXPIRY_INTERVAL', expiry.expire_overdue),
+        ('IDEMPOTENCY_PURGE_INTERVAL', idempotency.purge_expired),
+    ])
+    commands.register(app)
+    
     @app.route('/')
     def index():
         return {"message": "Welcome to The Queens Project API"}
@@ -0,0 +1,92 @@
+import click
+from app import db
+from app.models import Tenant
+from app.services import activity, catalog_import, expiry, revenue, sales_rollup, search, seed as seeding
+
+# Operational `flask` CLI commands (run with FLASK_APP=run.py)
+
+def register(app):
+    @app.cli.command('compact-revenue')
+    @click.option('--batch-size', default=revenue.COMPACT_BATCH_SIZE, show_default=True)
+    def compact_revenue(batch_size):
+        """Fold tenant revenue entries into balance snapshots."""
+        folded = revenue.compact(batch_size=batch_size)
+        click.echo(f"Compacted {folded} revenue entries")
+
+    @app.cli.command('expire-orders')
+    @click.option('--batch-size', default=expiry.EXPIRY_BATCH_SIZE, show_default=True)
+    def expire_orders(batch_size):
+        """Expire Pending orders whose delivery time has passed."""
+        expired = expiry.expire_overdue(batch_size=batch_size)
+        click.echo(f"Expired {expired} orders")
+
+    @app.cli.command('backfill-revenue-rollup')
+    @click.option('--chunk-size', default=sales_rollup.BACKFILL_CHUNK_SIZE, show_default=True)
+    def backfill_revenue_rollup(chunk_size):
+        """Rebuild the daily revenue rollup from the orders table."""
+        written = sales_rollup.backfill(chunk_size=chunk_size)
+        click.echo(f"Wrote {written} daily revenue rows")
+
+    @app.cli.command('backfill-activity')
+    def backfill_activity():
+        """Rebuild the hourly order counters from the orders table."""
+        written = activity.backfill_orders()
+        click.echo(f"Wrote {written} hourly order counters")
+
+    @app.cli.command('import-catalog')
+    @click.argument('tenant_id', type=int)
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(catalog_import.FORMATS),
+                  help='Defaults to the file extension (.csv, .ndjson/.jsonl).')
+    @click.option('--batch-size', default=catalog_import.IMPORT_BATCH_SIZE, show_default=True)
+    def import_catalog(tenant_id, path, fmt, batch_size):
+        """Upsert a tenant's products by SKU from a CSV or NDJSON file."""
+        if db.session.get(Tenant, tenant_id) is None:
+            raise click.ClickException(f"Tenant {tenant_id} not found")
+        if fmt is None:
+            fmt = 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+        with open(path, 'rb') as f:
+            report = catalog_import.import_rows(tenant_id, catalog_import.read_rows(f, fmt), batch_size=batch_size)
+
+        for error in report['errors']:
+            click.echo(f"line {error['line']}: {error['sku'] or '-'}: {error['error']}", err=True)
+        if report['errors_truncated']:
+            click.echo("(further errors not shown)", err=True)
+        click.echo(f"{report['received']} rows: {report['inserted']} inserted, "
+                   f"{report['updated']} updated, {report['failed']} failed")
+
+    @app.cli.command('reindex-search')
+    def reindex_search():
+        """Rebuild the full-text product search index."""
+        indexed = search.reindex_all()
+        click.echo(f"Indexed {indexed} products")
+
+    @app.cli.command('seed')
+    @click.option('--scale', type=click.Choice(list(seeding.SCALES)), default='small', show_default=True,
+                  help='Preset sizes; the options below override single counts.')
+    @click.option('--tenants', type=int)
+    @click.option('--products', type=int)
+    @click.option('--customers', type=int)
+    @click.option('--orders', type=int)
+    @click.option('--events', type=int)
+    @click.option('--seed', 'seed_value', default=0, show_default=True, help='Random seed.')
+    @click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']),
+                  help='Last day of order history (default today); fix it for identical reruns.')
+    @click.option('--batch-size', default=seeding.SEED_BATCH_SIZE, show_default=True)
+    def seed(scale, tenants, products, customers, orders, events, seed_value, end_date, batch_size):
+        """Fill an empty database with a synthetic, skewed mall dataset."""
+        sizes = dict(seeding.SCALES[scale])
+        overrides = {'tenants': tenants, 'products': products, 'customers': customers, 'orders': orders, 'events': events}
+        sizes.update({name: value for name, value in overrides.items() if value is not None})
+        click.echo(', '.join(f"{value} {name}" for name, value in sizes.items()))
+
+        def progress(table, rows, seconds):
+            click.echo(f"  {table:<24} {rows:>10} rows  {seconds:7.1f}s")
+
+        try:
+            seeding.seed(**sizes, seed=seed_value, end_date=end_date and end_date.date(),
+                         batch_size=batch_size, progress=progress)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Seeded; every account's password is '{seeding.PASSWORD}' (admin, owner1.., customer1..)")
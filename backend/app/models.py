@@ -12,7 +12,7 @@ class User(db.Model):
     username = db.Column(db.String(64), unique=True, index=True, nullable=False)
     email = db.Column(db.String(120), unique=True, index=True, nullable=False)
     password_hash = db.Column(db.String(255))
-    role = db.Column(db.String(20), default=UserRole.CUSTOMER.value)
+    role = db.Column(db.String(20), default=UserRole.CUSTOMER.value, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -29,29 +29,36 @@ class User(db.Model):
 
 class Tenant(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     shop_name = db.Column(db.String(100), nullable=False)
     category = db.Column(db.String(50))
     shop_number = db.Column(db.String(20))
     image_url = db.Column(db.String(500)) # URL to shop image
     description = db.Column(db.Text)      # Shop description
-    account_balance = db.Column(db.Float, default=0.0) # New: For revenue tracking
+    account_balance = db.Column(db.Float, default=0.0) # Legacy opening balance; live revenue is in TenantRevenueEntry
     is_approved = db.Column(db.Boolean, default=False)
     
     products = db.relationship('Product', backref='tenant', lazy='dynamic')
     events = db.relationship('Event', backref='tenant', lazy='dynamic')
 
-    def to_dict(self):
-        return {
+    def to_dict(self, balance=None, include_balance=True):
+        data = {
             'id': self.id,
             'shop_name': self.shop_name,
             'category': self.category,
             'shop_number': self.shop_number,
             'image_url': self.image_url,
             'description': self.description,
-            'account_balance': self.account_balance,
             'is_approved': self.is_approved
         }
+        # Revenue is private: the public catalog leaves it out (and stays cacheable)
+        if include_balance:
+            # List endpoints pass balances fetched in bulk via app.services.revenue.balances()
+            if balance is None:
+                from app.services import revenue
+                balance = revenue.balance_of(self)
+            data['account_balance'] = balance
+        return data
 
 # ... (skipped CustomerProfile, Product, Event, Wishlist) ...
 
@@ -66,10 +73,20 @@ class Order(db.Model):
     contact_number = db.Column(db.String(100), nullable=True)
     delivery_time = db.Column(db.DateTime, nullable=True)
     
-    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    # Python-side UTC like the other models, so SQLite stores one comparable format (keyset cursors)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     items = db.relationship('OrderItem', backref='order', lazy=True)
 
+    __table_args__ = (
+        # Used by the expiry sweeper: WHERE status = 'Pending' AND delivery_time < now
+        db.Index('ix_order_status_delivery_time', 'status', 'delivery_time'),
+        # Customer order history: WHERE user_id = ? ORDER BY created_at DESC
+        db.Index('ix_order_user_id_created_at', 'user_id', 'created_at'),
+        # Keyset pagination and date-range reports over (created_at, id)
+        db.Index('ix_order_created_at_id', 'created_at', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -84,7 +101,7 @@ class Order(db.Model):
 
 class CustomerProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     loyalty_points = db.Column(db.Integer, default=0)
     tier = db.Column(db.String(20), default='Bronze')
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -97,8 +114,14 @@ class CustomerProfile(db.Model):
         }
 
 class Product(db.Model):
+    __table_args__ = (
+        # Bulk catalog imports upsert on the tenant's own SKU
+        db.UniqueConstraint('tenant_id', 'sku', name='uq_product_tenant_id_sku'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    tenant_id = db.Column(db.Integer, db.ForeignKey('tenant.id'), nullable=False)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenant.id'), nullable=False, index=True)
+    sku = db.Column(db.String(64))
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     price = db.Column(db.Float, nullable=False)
@@ -114,14 +137,15 @@ class Product(db.Model):
             'price': self.price,
             'stock': self.stock,
             'image_url': self.image_url,
-            'tenant_id': self.tenant_id
+            'tenant_id': self.tenant_id,
+            'sku': self.sku
         }
 
 class Event(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    date = db.Column(db.DateTime, nullable=False)
+    date = db.Column(db.DateTime, nullable=False, index=True)
     tenant_id = db.Column(db.Integer, db.ForeignKey('tenant.id'), nullable=True) # Nullable if mall-wide event
     image_url = db.Column(db.String(255))
 
@@ -142,20 +166,103 @@ class Wishlist(db.Model):
     
     product = db.relationship('Product')
 
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'product_id', name='uq_wishlist_user_id_product_id'),
+    )
+
 
 
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     price_at_purchase = db.Column(db.Float, nullable=False)
     
     product = db.relationship('Product')
 
+    __table_args__ = (
+        # Tenant-side lookups go product -> order items (EXISTS in the tenant orders feed)
+        db.Index('ix_order_item_product_id_order_id', 'product_id', 'order_id'),
+    )
+
     def to_dict(self):
         return {
             'product_name': self.product.name,
             'quantity': self.quantity,
             'price': self.price_at_purchase
         }
+
+class InventoryLedger(db.Model):
+    # Append-only record of stock movements: negative quantity = reserved, positive = released
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False, index=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=True, index=True)
+    quantity = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(20), nullable=False) # reserve, release
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TenantRevenueEntry(db.Model):
+    # Insert-only revenue log written at checkout; folded into TenantBalanceSnapshot by the compactor
+    id = db.Column(db.Integer, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenant.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=True)
+    amount = db.Column(db.Float, nullable=False)
+    compacted = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_tenant_revenue_entry_compacted_tenant_id', 'compacted', 'tenant_id'),
+    )
+
+class TenantBalanceSnapshot(db.Model):
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenant.id'), primary_key=True)
+    balance = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class IdempotencyKey(db.Model):
+    # Stored outcome of a request sent with an Idempotency-Key header, replayed on retries
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_key_user_id_key'),
+    )
+
+class ChangeCounter(db.Model):
+    # Version counters behind catalog ETags: 'shops', 'events', 'tenant:<id>'
+    scope = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class OrderRevenueDaily(db.Model):
+    # Revenue rollup behind the admin dashboard: a few slot rows per (UTC day, tenant),
+    # maintained by checkout and order status changes. Cancelled/Expired orders
+    # are taken back out, so it always holds the live (net) figures.
+    day = db.Column(db.Date, primary_key=True)
+    tenant_id = db.Column(db.Integer, db.ForeignKey('tenant.id'), primary_key=True)
+    slot = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+class ActivityCounter(db.Model):
+    # Hourly activity counters ('order', 'visit', ...) behind the traffic charts.
+    # Each hour is split over a few slots so concurrent writers rarely share a row.
+    kind = db.Column(db.String(32), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    slot = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class DashboardSnapshot(db.Model):
+    # Precomputed admin dashboard payload shared by every worker. lease_until
+    # marks the one worker currently recomputing it (services/dashboard.py).
+    name = db.Column(db.String(64), primary_key=True)
+    payload = db.Column(db.Text, nullable=True)
+    computed_at = db.Column(db.DateTime, nullable=True)
+    lease_until = db.Column(db.DateTime, nullable=True)
@@ -1,86 +1,70 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask_jwt_extended import jwt_required
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 
-from app.models import User, Tenant, UserRole, Order, Product
+from app.models import Tenant, UserRole
 from app import db
+from app.services import activity, conditional, dashboard, pooling, principal, replica, revenue, serializers
+from app.services.cache import LRUCache
 from sqlalchemy import func
 import datetime
 
 @bp.route('/tenants', methods=['GET'])
+@replica.read_only
 @jwt_required()
 def get_all_tenants():
-    tenants = Tenant.query.all()
-    return jsonify([t.to_dict() for t in tenants]), 200
+    tenants = serializers.shops(approved_only=False)
+    balances = revenue.balances()
+    for tenant in tenants:
+        tenant['account_balance'] = balances.get(tenant['id'], 0.0)
+    return serializers.json_response(tenants)
 
 @bp.route('/stats', methods=['GET'])
+@replica.read_only
 @jwt_required()
 def get_stats():
-    total_users = User.query.count()
-    total_tenants = User.query.filter_by(role=UserRole.TENANT.value).count()
-    
-    # Calculate real revenue from Tenant balances
-    tenants = Tenant.query.all()
-    total_revenue = sum(t.account_balance for t in tenants)
-    
-    # Revenue per shop for the admin to see breakdown
-    shop_revenue = [
-        {
-            'shop_name': t.shop_name,
-            'revenue': t.account_balance,
-            'category': t.category
-        } for t in tenants
-    ]
-    
-    occupancy_rate = 85 # Could calculate based on shop capacity if defined
-    
-    # Detect database engine for date formatting
-    engine_name = db.engine.name
-    
-    # Calculate Monthly Revenue from real orders
-    if engine_name == 'postgresql':
-        # PostgreSQL: to_char returns 01, 02...
-        monthly_query = db.session.query(
-            func.to_char(Order.created_at, 'MM').label('month'),
-            func.sum(Order.total_amount).label('total')
-        ).group_by('month')
-    else:
-        # SQLite: strftime
-        monthly_query = db.session.query(
-            func.strftime('%m', Order.created_at).label('month'),
-            func.sum(Order.total_amount).label('total')
-        ).group_by('month')
+    # Shared snapshot, recomputed by one worker at most every DASHBOARD_SNAPSHOT_TTL seconds
+    return Response(dashboard.snapshot_json(), mimetype='application/json'), 200
 
-    monthly_data = monthly_query.all()
+@bp.route('/shops/revenue', methods=['GET'])
+@replica.read_only
+@principal.principal_required(UserRole.ADMIN)
+def get_shop_revenue():
+    # Full per-shop breakdown, highest revenue first, one page at a time
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), 200))
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({"message": "Invalid limit or offset"}), 400
 
-    month_names = {
-        '01': 'Jan', '02': 'Feb', '03': 'Mar', '04': 'Apr',
-        '05': 'May', '06': 'Jun', '07': 'Jul', '08': 'Aug',
-        '09': 'Sep', '10': 'Oct', '11': 'Nov', '12': 'Dec'
-    }
-    
-    # Pre-fill with all months if needed, or just what's in DB
-    monthly_revenue = []
-    for m_num, m_name in month_names.items():
-        val = next((float(d.total) for d in monthly_data if d.month == m_num), 0)
-        monthly_revenue.append({'name': m_name, 'value': val})
+    return jsonify({
+        "shops": dashboard.shop_revenue(limit, offset),
+        "total": dashboard.shop_count(),
+        "limit": limit,
+        "offset": offset
+    }), 200
 
+@bp.route('/caches', methods=['GET'])
+@principal.principal_required(UserRole.ADMIN)
+def get_cache_stats():
+    # Counters of this worker process only; each gunicorn worker has its own caches
     return jsonify({
-        "total_users": total_users,
-        "total_tenants": total_tenants,
-        "total_revenue": total_revenue,
-        "shop_revenue": shop_revenue,
-        "occupancy_rate": occupancy_rate,
-        "monthly_revenue": monthly_revenue
+        name.removesuffix('_cache'): cache.stats()
+        for name, cache in current_app.extensions.items()
+        if isinstance(cache, LRUCache)
     }), 200
 
+@bp.route('/pool', methods=['GET'])
+@principal.principal_required(UserRole.ADMIN)
+def get_pool_stats():
+    # Connection pool of this worker process
+    return jsonify(pooling.stats(db.engine)), 200
+
 @bp.route('/analytics', methods=['GET'])
+@replica.read_only
 @jwt_required()
 def get_detailed_analytics():
-    # Detect database engine
-    engine_name = db.engine.name
-
     # 1. Shop Category Distribution
     categories = db.session.query(
         Tenant.category, 
@@ -92,44 +76,31 @@ def get_detailed_analytics():
         for cat, count in categories
     ]
 
-    # 2. Weekly Footfall (Derived from Orders for now)
-    if engine_name == 'postgresql':
-        # PostgreSQL: to_char with 'D' (1-7, 1=Sun) or 'ID' (1-7, 1=Mon)
-        # We'll use 'w' for 0-6 (0=Sun)
-        footfall_query = db.session.query(
-            func.to_char(Order.created_at, 'd').label('day_raw'), # 1-7, 1=Sun
-            func.count(Order.id).label('count')
-        ).group_by('day_raw')
-        
-        footfall_data_raw = footfall_query.all()
-        # Convert 1-7 (Sun-Sat) to 0-6 (Sun-Sat) for compatibility
-        footfall_data = []
-        for d in footfall_data_raw:
-            day_num = str(int(d.day_raw) - 1)
-            footfall_data.append(type('Data', (), {'day': day_num, 'count': d.count}))
-    else:
-        # SQLite: strftime('%w') returns 0-6 (0=Sun)
-        footfall_data = db.session.query(
-            func.strftime('%w', Order.created_at).label('day'),
-            func.count(Order.id).label('count')
-        ).group_by('day').all()
+    # 2. Weekly Footfall over ?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive), default the last 4 weeks
+    try:
+        today = datetime.datetime.utcnow().date()
+        end = datetime.date.fromisoformat(request.args['end']) if 'end' in request.args else today
+        start = datetime.date.fromisoformat(request.args['start']) if 'start' in request.args else end - datetime.timedelta(days=27)
+    except ValueError:
+        return jsonify({"message": "Invalid date, expected YYYY-MM-DD"}), 400
+    if start > end or (end - start).days >= activity.MAX_RANGE_DAYS:
+        return jsonify({"message": f"Date range must span 1 to {activity.MAX_RANGE_DAYS} days"}), 400
 
-    day_names = {
-        '0': 'Sun', '1': 'Mon', '2': 'Tue', '3': 'Wed',
-        '4': 'Thu', '5': 'Fri', '6': 'Sat'
-    }
-    
-    # Sort to start from Mon
-    mon_start_days = ['1', '2', '3', '4', '5', '6', '0']
+    # Read from the hourly activity counters (Derived from orders for now)
+    range_start = datetime.datetime.combine(start, datetime.time.min)
+    range_end = datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min)
+    weekday_orders = activity.by_weekday(activity.ORDER, range_start, range_end)
+
+    day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
     traffic_data = []
-    for d_num in mon_start_days:
-        count = next((int(d.count) for d in footfall_data if d.day == d_num), 0)
+    for day_name, count in zip(day_names, weekday_orders):
         # Scale count slightly to look like "visits" if it's based on orders
-        traffic_data.append({"name": day_names[d_num], "visits": count * 5 + 10}) 
+        traffic_data.append({"name": day_name, "visits": count * 5 + 10})
 
     return jsonify({
         "category_data": category_data,
-        "traffic_data": traffic_data
+        "traffic_data": traffic_data,
+        "range": {"start": start.isoformat(), "end": end.isoformat()}
     }), 200
 
 @bp.route('/tenants/<int:id>/approve', methods=['POST'])
@@ -138,6 +109,7 @@ def approve_tenant(id):
     # Basic role check could be added here, though @jwt_required + prefix usually handled
     tenant = Tenant.query.get_or_404(id)
     tenant.is_approved = not tenant.is_approved
+    conditional.bump(conditional.SHOPS, conditional.tenant_scope(tenant.id))
     db.session.commit()
     return jsonify({
         "message": f"Tenant {'approved' if tenant.is_approved else 'unapproved'} successfully",
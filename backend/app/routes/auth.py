@@ -1,11 +1,16 @@
 from flask import Blueprint, request, jsonify
 from app import db, jwt
 from app.models import User, UserRole
+from app.services import passwords, principal
 from flask_jwt_extended import create_access_token
-from werkzeug.security import generate_password_hash, check_password_hash
 
 bp = Blueprint('auth', __name__, url_prefix='/auth')
 
+def _busy():
+    response = jsonify({"message": "Too many sign-in attempts right now, please retry shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
 @bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -20,11 +25,17 @@ def register():
 
     if User.query.filter((User.username == username) | (User.email == email)).first():
         return jsonify({"message": "User already exists"}), 400
+    db.session.close() # don't hold a pooled connection while hashing
+
+    try:
+        password_hash = passwords.hash_password(password)
+    except passwords.HashingBusy:
+        return _busy()
 
     new_user = User(
         username=username,
         email=email,
-        password_hash=generate_password_hash(password),
+        password_hash=password_hash,
         role=role
     )
     db.session.add(new_user)
@@ -51,12 +62,29 @@ def login():
     password = data.get('password')
 
     user = User.query.filter_by(username=username).first()
+    # Hand the pooled connection back before the slow part; user stays readable detached
+    db.session.close()
+
+    try:
+        valid = user is not None and passwords.verify_password(user.password_hash, password)
+    except passwords.HashingBusy:
+        return _busy()
+
+    if valid:
+        # Upgrade hashes made with an older algorithm or cost; retried next login if the pool is busy
+        if passwords.needs_rehash(user.password_hash):
+            try:
+                new_hash = passwords.hash_password(password)
+                User.query.filter_by(id=user.id).update({User.password_hash: new_hash})
+                db.session.commit()
+            except passwords.HashingBusy:
+                pass
 
-    if user and check_password_hash(user.password_hash, password):
-        # Identity must be a string, additional data goes in additional_claims
+        # Identity must be a string, additional data goes in additional_claims.
+        # Profile ids ride along so protected routes can authorize without a query.
         access_token = create_access_token(
             identity=str(user.id),
-            additional_claims={'role': user.role, 'username': user.username}
+            additional_claims=principal.claims_for(user.id)
         )
         return jsonify(access_token=access_token, role=user.role, username=user.username), 200
 
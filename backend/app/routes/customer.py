@@ -1,7 +1,8 @@
-from flask import Blueprint, jsonify, request
-from app.models import Tenant, Product, User, CustomerProfile, Wishlist, Order, OrderItem
+from flask import Blueprint, abort, jsonify, request
+from app.models import CustomerProfile
 from app import db
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services import checkout, conditional, idempotency, inventory, principal, replica, search, serializers, wishlist
+from flask_jwt_extended import jwt_required
 import datetime
 
 bp = Blueprint('customer', __name__, url_prefix='/customer')
@@ -11,11 +12,7 @@ bp = Blueprint('customer', __name__, url_prefix='/customer')
 @bp.route('/orders', methods=['POST'])
 @jwt_required()
 def place_order():
-    current_user_id = get_jwt_identity()
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
+    user_id = principal.current().user_id
 
     data = request.get_json()
     items = data.get('items', [])
@@ -33,127 +30,103 @@ def place_order():
         except:
             pass
 
-    new_order = Order(
-        user_id=user_id, 
-        total_amount=0, 
-        status='Pending',
-        delivery_address=delivery_info.get('address'),
-        contact_number=delivery_info.get('contact'),
-        delivery_time=delivery_time
-    )
-    db.session.add(new_order)
-    db.session.flush()
-
-    total_amount = 0
-
-    for item in items:
-        product = Product.query.get(item['id'])
-        if product:
-            quantity = item.get('quantity', 1)
-            line_total = product.price * quantity
-            total_amount += line_total
-            
-            order_item = OrderItem(
-                order_id=new_order.id,
-                product_id=product.id,
-                quantity=quantity,
-                price_at_purchase=product.price
-            )
-            db.session.add(order_item)
-            
-            # Stock mgmt
-            if product.stock >= quantity:
-                product.stock -= quantity
-                
-            # Revenue Calculation: Credit Tenant
-            if product.tenant:
-                product.tenant.account_balance += line_total
-
-    new_order.total_amount = total_amount
-    
-    # Loyalty & Tier Logic
-    user = User.query.get(user_id)
-    if user.customer_profile:
-        # 1 point per $1
-        points_earned = int(total_amount)
-        user.customer_profile.loyalty_points += points_earned
-        
-        # Tier Upgrades
-        pts = user.customer_profile.loyalty_points
-        if pts >= 1500:
-            user.customer_profile.tier = 'Gold'
-        elif pts >= 500:
-            user.customer_profile.tier = 'Silver'
-        else:
-            user.customer_profile.tier = 'Bronze'
+    # Retries carrying the same Idempotency-Key get the stored response back
+    replay = idempotency.begin(user_id, data)
+    if replay is not None:
+        return replay
+
+    try:
+        new_order = checkout.place_order(
+            user_id,
+            items,
+            delivery_address=delivery_info.get('address'),
+            contact_number=delivery_info.get('contact'),
+            delivery_time=delivery_time
+        )
+    except inventory.OutOfStock as e:
+        db.session.rollback()
+        return jsonify({"message": "Some items are out of stock", "product_ids": e.product_ids}), 409
+    body = {"message": "Order placed successfully", "order_id": new_order.id}
+    idempotency.finish(201, body)
     
     db.session.commit()
-    return jsonify({"message": "Order placed successfully", "order_id": new_order.id}), 201
+    return jsonify(body), 201
 
 @bp.route('/orders', methods=['GET'])
 @jwt_required()
 def get_orders():
-    current_user_id = get_jwt_identity()
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
-        
-    # Order Expiry logic: 
-    # If delivery_time < now and status is Pending -> Expired
-    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) # naive comparison
-    pending_orders = Order.query.filter_by(user_id=user_id, status='Pending').all()
-    for order in pending_orders:
-        if order.delivery_time and order.delivery_time < now:
-            order.status = 'Expired'
-            # Optional: Refund logic? The user didn't specify, but usually cleanup means restocking
-            # For now, just mark Expired as requested.
-            db.session.add(order)
-    
-    if pending_orders:
-        db.session.commit()
+    user_id = principal.current().user_id
 
-    orders = Order.query.filter_by(user_id=user_id).order_by(Order.created_at.desc()).all()
-    return jsonify([o.to_dict() for o in orders]), 200
+    # Read-only: overdue Pending orders are expired by the background sweeper (app.services.expiry)
+    return serializers.json_response(serializers.orders(user_id))
 
 @bp.route('/shops', methods=['GET'])
+@replica.read_only
+@conditional.conditional(lambda: [conditional.SHOPS], cached=True)
 def get_shops():
-    shops = Tenant.query.filter_by(is_approved=True).all()
-    # Serialize manually or add to_dict to Tenant model
-    return jsonify([shop.to_dict() for shop in shops]), 200
+    return serializers.json_response(serializers.shops())
 
 @bp.route('/shops/<int:tenant_id>', methods=['GET'])
+@replica.read_only
+@conditional.conditional(lambda tenant_id: [conditional.tenant_scope(tenant_id)], cached=True)
 def get_shop_details(tenant_id):
-    shop = Tenant.query.get_or_404(tenant_id)
-    return jsonify(shop.to_dict()), 200
+    shop = serializers.shop(tenant_id)
+    if shop is None:
+        abort(404)
+    return serializers.json_response(shop)
 
 @bp.route('/shops/<int:tenant_id>/products', methods=['GET'])
+@replica.read_only
+@conditional.conditional(lambda tenant_id: [conditional.tenant_scope(tenant_id)], extra=conditional.stock_window,
+                         cached=True)
 def get_shop_products(tenant_id):
-    products = Product.query.filter_by(tenant_id=tenant_id).all()
-    return jsonify([p.to_dict() for p in products]), 200
+    return serializers.json_response(serializers.products(tenant_id))
+
+@bp.route('/search', methods=['GET'])
+@replica.read_only
+def search_products():
+    # ?q=words&category=...&limit=...&cursor=... ; next page cursor in X-Next-Cursor
+    try:
+        limit = int(request.args.get('limit', search.DEFAULT_PAGE_SIZE))
+        results, next_cursor = search.search(
+            request.args.get('q', ''),
+            category=request.args.get('category') or None,
+            cursor=request.args.get('cursor'),
+            limit=limit
+        )
+    except (ValueError, search.InvalidCursor):
+        return jsonify({"message": "Invalid cursor or limit"}), 400
+
+    response = jsonify(results)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
 
 @bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
-    current_user_id = get_jwt_identity()
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
+    caller = principal.current()
 
-    user = User.query.get(int(user_id))
-    
-    if not user.customer_profile:
+    if caller.customer_profile_id:
+        profile = db.session.get(CustomerProfile, caller.customer_profile_id)
+    else:
+        # Only customers carry a customer_profile_id claim; look others up by user
+        profile = CustomerProfile.query.filter_by(user_id=caller.user_id).first()
+    if profile is None:
         # Create default profile if missing
-        profile = CustomerProfile(user_id=user.id, loyalty_points=120) # Mock points for now
+        profile = CustomerProfile(user_id=caller.user_id, loyalty_points=120) # Mock points for now
         db.session.add(profile)
         db.session.commit()
-    else:
-        profile = user.customer_profile
+        principal.forget(caller.user_id)
+
+    # Email isn't in the token; the identity cache has it
+    user = principal.identity(caller.user_id)
+    if user is None:
+        return jsonify({"message": "User not found"}), 404
         
     return jsonify({
-        "username": user.username,
-        "email": user.email,
+        "username": user['username'],
+        "email": user['email'],
         "loyalty_points": profile.loyalty_points,
         "tier": profile.tier,
         "joined_at": profile.joined_at.isoformat()
@@ -162,36 +135,28 @@ def get_profile():
 @bp.route('/wishlist', methods=['GET', 'POST', 'DELETE'])
 @jwt_required()
 def manage_wishlist():
-    current_user_id = get_jwt_identity()
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
+    user_id = principal.current().user_id
 
     if request.method == 'GET':
-        wishlist_items = Wishlist.query.filter_by(user_id=user_id).all()
-        # Return full product details
-        return jsonify([item.product.to_dict() for item in wishlist_items]), 200
+        # ?view=availability returns only id/price/stock per product
+        if request.args.get('view') == 'availability':
+            return serializers.json_response(wishlist.availability(user_id))
+        return serializers.json_response(wishlist.items(user_id))
 
-    data = request.get_json()
-    product_id = data.get('product_id')
-    if not product_id:
-        return jsonify({"message": "Product ID required"}), 400
+    try:
+        product_ids = wishlist.product_ids(request.get_json() or {})
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
     if request.method == 'POST':
-        # Check if already exists
-        exists = Wishlist.query.filter_by(user_id=user_id, product_id=product_id).first()
-        if exists:
-            return jsonify({"message": "Already in wishlist"}), 200
-            
-        new_item = Wishlist(user_id=user_id, product_id=product_id)
-        db.session.add(new_item)
+        # Products already on the wishlist or that don't exist are skipped
+        added = wishlist.add(user_id, product_ids)
         db.session.commit()
-        return jsonify({"message": "Added to wishlist"}), 201
+        if not added:
+            return jsonify({"message": "Already in wishlist", "added": 0}), 200
+        return jsonify({"message": "Added to wishlist", "added": added}), 201
 
     if request.method == 'DELETE':
-        item = Wishlist.query.filter_by(user_id=user_id, product_id=product_id).first()
-        if item:
-            db.session.delete(item)
-            db.session.commit()
-        return jsonify({"message": "Removed from wishlist"}), 200
+        removed = wishlist.remove(user_id, product_ids)
+        db.session.commit()
+        return jsonify({"message": "Removed from wishlist", "removed": removed}), 200
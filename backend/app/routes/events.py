@@ -1,44 +1,33 @@
-from flask import Blueprint, jsonify, request
-from app.models import Event, Tenant, User, UserRole
+from flask import Blueprint, Response, jsonify, request
+from app.models import Event, UserRole
 from app import db
+from app.services import conditional, event_listing, principal, replica
 from datetime import datetime
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import logging
 
 bp = Blueprint('events', __name__, url_prefix='/events')
+logger = logging.getLogger(__name__)
 
 @bp.route('/', methods=['GET'])
+@replica.read_only
+@conditional.conditional(lambda: [conditional.EVENTS], extra=conditional.today)
 def get_events():
     # Fetch all upcoming events (including today)
-    from sqlalchemy import func
-    now = datetime.utcnow()
-    # Use func.date to compare just the date part (ignoring time)
-    # This ensures an event at 10 AM today is still visible at 2 PM today
-    events = Event.query.filter(func.date(Event.date) >= func.date(now)).order_by(Event.date.asc()).all()
-    return jsonify([event.to_dict() for event in events]), 200
+    # Events from midnight UTC onwards, so an event at 10 AM today is still visible at 2 PM today
+    return Response(event_listing.upcoming_json(), status=200, mimetype='application/json')
 
 @bp.route('/', methods=['POST'])
-@jwt_required()
+@principal.principal_required(UserRole.ADMIN, UserRole.TENANT) # Allow Admins and Tenants to create events
 def create_event():
-    current_user_id = get_jwt_identity()
-    # Handle both string and dict identity for backward compatibility/robustness
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
-
-    user = User.query.get(int(user_id))
-    
-    # Allow Admins and Tenants to create events
-    if user.role not in [UserRole.ADMIN, UserRole.TENANT]:
-        return jsonify({"message": "Unauthorized"}), 403
+    caller = principal.current()
 
     data = request.get_json()
     
     try:
         # If tenant, associate event with them
         tenant_id = None
-        if user.role == UserRole.TENANT and user.tenant_profile:
-            tenant_id = user.tenant_profile.id
+        if caller.role == UserRole.TENANT:
+            tenant_id = caller.tenant_id
             
         new_event = Event(
             name=data['name'],
@@ -48,37 +37,31 @@ def create_event():
             tenant_id=tenant_id
         )
         db.session.add(new_event)
+        conditional.bump(conditional.EVENTS)
         db.session.commit()
+        event_listing.invalidate()
         return jsonify(new_event.to_dict()), 201
-    except Exception as e:
-        print(f"Error creating event: {e}")
+    except Exception:
+        logger.exception("Error creating event")
         return jsonify({"message": "Failed to create event"}), 500
 
 @bp.route('/<int:id>', methods=['PUT', 'DELETE'])
-@jwt_required()
+@principal.principal_required(UserRole.ADMIN, UserRole.TENANT) # Allow Admins and Tenants
 def manage_event(id):
-    current_user_id = get_jwt_identity()
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
-
-    user = User.query.get(int(user_id))
-    
-    # Allow Admins and Tenants
-    if user.role not in [UserRole.ADMIN, UserRole.TENANT]:
-        return jsonify({"message": "Unauthorized"}), 403
+    caller = principal.current()
 
     event = Event.query.get_or_404(id)
 
     # If tenant, ensure they own the event
-    if user.role == UserRole.TENANT:
-        if not event.tenant_id or event.tenant_id != user.tenant_profile.id:
+    if caller.role == UserRole.TENANT:
+        if not event.tenant_id or event.tenant_id != caller.tenant_id:
              return jsonify({"message": "Unauthorized"}), 403
 
     if request.method == 'DELETE':
         db.session.delete(event)
+        conditional.bump(conditional.EVENTS)
         db.session.commit()
+        event_listing.invalidate()
         return jsonify({"message": "Event deleted"}), 200
 
     if request.method == 'PUT':
@@ -88,8 +71,10 @@ def manage_event(id):
         if 'date' in data:
             event.date = datetime.fromisoformat(data['date'].replace('Z', '+00:00'))
         event.image_url = data.get('image_url', event.image_url)
+        conditional.bump(conditional.EVENTS)
         
         db.session.commit()
+        event_listing.invalidate()
         return jsonify(event.to_dict()), 200
 
 # Endpoint to seed some dummy events if none exist (for demo)
@@ -102,6 +87,8 @@ def seed_events():
             Event(name="Kids Carnival", description="Fun games and prizes for kids.", date=datetime(2026, 5, 20), image_url="https://source.unsplash.com/random?carnival"),
         ]
         db.session.add_all(events)
+        conditional.bump(conditional.EVENTS)
         db.session.commit()
+        event_listing.invalidate()
         return jsonify({"message": "Seeded events"}), 201
     return jsonify({"message": "Events already exist"}), 200
@@ -1,41 +1,41 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Product, Tenant, User, UserRole
+import io
+import logging
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required
+from app.models import Product, Tenant
 from app import db
+from app.services import catalog_import, conditional, inventory, order_feed, principal, replica, revenue, sales_rollup, search, serializers
 
 bp = Blueprint('tenant', __name__, url_prefix='/tenant')
+logger = logging.getLogger(__name__)
 
 def get_current_tenant():
-    user_id = get_jwt_identity()  # Now returns string user ID
-    user = User.query.get(int(user_id))
-    
-    # Auto-create tenant profile if missing (for demo purposes)
-    if not user.tenant_profile:
-        tenant = Tenant(user_id=user.id, shop_name=f"{user.username}'s Shop", category="General")
-        db.session.add(tenant)
-        db.session.commit()
+    caller = principal.current()
+    if caller.tenant_id:
+        tenant = db.session.get(Tenant, caller.tenant_id)
+    else:
+        # Admins and customers carry no tenant_id claim; they may still own a shop
+        tenant = Tenant.query.filter_by(user_id=caller.user_id).first()
+    if tenant:
         return tenant
     
-    return user.tenant_profile
+    # Auto-create tenant profile if missing (for demo purposes)
+    tenant = Tenant(user_id=caller.user_id, shop_name=f"{caller.username}'s Shop", category="General")
+    db.session.add(tenant)
+    db.session.commit()
+    principal.forget(caller.user_id)
+    return tenant
 
 @bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_stats():
-    current_user_id = get_jwt_identity() 
-    # Handle string or dict ID
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
-        
-    user = User.query.get(int(user_id))
-    tenant = user.tenant_profile
+    tenant_id = principal.current().tenant_id
+    tenant = db.session.get(Tenant, tenant_id) if tenant_id else None
     if not tenant:
         return jsonify({"message": "Tenant profile not found"}), 404
         
     product_count = Product.query.filter_by(tenant_id=tenant.id).count()
-    # Mock sales data for now
-    total_sales = 5000 
+    total_sales = revenue.balance_of(tenant)
     
     return jsonify({
         "shop_name": tenant.shop_name,
@@ -49,13 +49,6 @@ def get_stats():
 @bp.route('/profile', methods=['PUT'])
 @jwt_required()
 def update_profile():
-    current_user_id = get_jwt_identity()
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
-
-    user = User.query.get(int(user_id))
     tenant = get_current_tenant() # Use helper
     if not tenant:
         return jsonify({"message": "Unauthorized"}), 403
@@ -70,6 +63,10 @@ def update_profile():
         tenant.image_url = data['image_url']
     if 'category' in data:
         tenant.category = data['category']
+    if 'shop_name' in data or 'category' in data:
+        # Both are part of every product's search document
+        search.index_tenant(tenant.id)
+    conditional.bump(conditional.SHOPS, conditional.tenant_scope(tenant.id))
         
     db.session.commit()
     return jsonify(tenant.to_dict()), 200
@@ -77,14 +74,11 @@ def update_profile():
 @bp.route('/products', methods=['GET'])
 @jwt_required()
 def get_products():
-    user_id = get_jwt_identity()
-    user = User.query.get(int(user_id))
-    
-    if not user.tenant_profile:
+    tenant_id = principal.current().tenant_id
+    if not tenant_id:
         return jsonify([]), 200
         
-    products = Product.query.filter_by(tenant_id=user.tenant_profile.id).all()
-    return jsonify([p.to_dict() for p in products]), 200
+    return serializers.json_response(serializers.products(tenant_id))
 
 @bp.route('/products', methods=['POST'])
 @jwt_required()
@@ -98,7 +92,6 @@ def add_product():
             return jsonify({"message": "Shop not approved. Please contact admin."}), 403
 
         data = request.get_json()
-        print(f"Received data: {data}")
         
         new_product = Product(
             tenant_id=tenant.id,
@@ -109,23 +102,42 @@ def add_product():
             image_url=data.get('image_url', '')
         )
         db.session.add(new_product)
+        db.session.flush()
+        search.index_products([new_product.id])
+        conditional.bump(conditional.tenant_scope(tenant.id))
         db.session.commit()
-        print(f"Product created: {new_product.to_dict()}")
         return jsonify(new_product.to_dict()), 201
     except Exception as e:
-        import traceback
-        print(f"Error adding product: {e}")
-        traceback.print_exc()
+        logger.exception("Error adding product")
         return jsonify({"message": f"Failed to add product: {str(e)}"}), 500
 
+@bp.route('/products/import', methods=['POST'])
+@jwt_required()
+def import_products():
+    # Streams the body: CSV (text/csv) or NDJSON (application/x-ndjson), or ?format=
+    tenant = get_current_tenant()
+    if not tenant.is_approved:
+        return jsonify({"message": "Shop not approved. Please contact admin."}), 403
+
+    try:
+        fmt = catalog_import.format_for(request.content_type, request.args.get('format'))
+    except catalog_import.UnknownFormat as e:
+        return jsonify({"message": f"Unsupported import format: {e}", "formats": list(catalog_import.FORMATS)}), 415
+
+    tenant_id = tenant.id
+    db.session.close() # no connection held while waiting on the upload
+    rows = catalog_import.read_rows(io.BufferedReader(request.stream), fmt)
+    report = catalog_import.import_rows(tenant_id, rows)
+    return jsonify(report), 200
+
 @bp.route('/products/<int:id>', methods=['PUT'])
 @jwt_required()
 def update_product(id):
-    tenant = get_current_tenant()
-    if not tenant:
+    tenant_id = principal.current().tenant_id
+    if not tenant_id:
         return jsonify({"message": "Unauthorized"}), 403
     
-    product = Product.query.filter_by(id=id, tenant_id=tenant.id).first_or_404()
+    product = Product.query.filter_by(id=id, tenant_id=tenant_id).first_or_404()
     data = request.get_json()
     
     try:
@@ -134,96 +146,59 @@ def update_product(id):
         product.price = float(data.get('price', product.price))
         product.stock = int(data.get('stock', product.stock))
         product.image_url = data.get('image_url', product.image_url)
+        search.index_products([product.id])
+        conditional.bump(conditional.tenant_scope(tenant_id))
         
         db.session.commit()
         return jsonify(product.to_dict()), 200
-    except Exception as e:
-        print(f"Error updating product: {e}")
+    except Exception:
+        logger.exception("Error updating product %s", id)
         return jsonify({"message": "Failed to update product"}), 500
 
 @bp.route('/products/<int:id>', methods=['DELETE'])
 @jwt_required()
 def delete_product(id):
-    tenant = get_current_tenant()
-    if not tenant:
+    tenant_id = principal.current().tenant_id
+    if not tenant_id:
         return jsonify({"message": "Unauthorized"}), 403
     
-    product = Product.query.filter_by(id=id, tenant_id=tenant.id).first_or_404()
+    product = Product.query.filter_by(id=id, tenant_id=tenant_id).first_or_404()
+    search.remove_products([product.id])
     db.session.delete(product)
+    conditional.bump(conditional.tenant_scope(tenant_id))
     db.session.commit()
     
     return jsonify({"message": "Product deleted"}), 200
 
 @bp.route('/orders', methods=['GET'])
+@replica.read_only
 @jwt_required()
 def get_tenant_orders():
-    current_user_id = get_jwt_identity()
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
-
-    tenant = Tenant.query.filter_by(user_id=user_id).first()
-    if not tenant:
+    tenant_id = principal.current().tenant_id
+    if not tenant_id:
         return jsonify({"message": "Tenant not found"}), 404
     
-    from app.models import Order, OrderItem, Product
-    import datetime
-    
-    # Expiry Check
-    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
-    
-    # join Order -> OrderItem -> Product
-    results = db.session.query(Order, OrderItem, Product)\
-        .join(OrderItem, OrderItem.order_id == Order.id)\
-        .join(Product, OrderItem.product_id == Product.id)\
-        .filter(Product.tenant_id == tenant.id)\
-        .order_by(Order.created_at.desc())\
-        .all()
-        
-    orders_map = {}
-    for order, item, prod in results:
-        # Check for expiry on the fly
-        if order.status == 'Pending' and order.delivery_time and order.delivery_time < now:
-            order.status = 'Expired'
-            db.session.add(order)
-            db.session.commit() # Commit each to avoid session conflicts in this specific query loop
-
-        if order.id not in orders_map:
-            orders_map[order.id] = {
-                'id': order.id,
-                'customer_id': order.user_id,
-                'date': order.created_at.isoformat(),
-                'status': order.status,
-                'delivery_address': order.delivery_address,
-                'contact_number': order.contact_number,
-                'delivery_time': order.delivery_time.isoformat() if order.delivery_time else None,
-                'items': [],
-                'total_revenue': 0
-            }
-        
-        line_total = item.price_at_purchase * item.quantity
-        orders_map[order.id]['items'].append({
-            'product_name': prod.name,
-            'quantity': item.quantity,
-            'price': item.price_at_purchase,
-            'total': line_total
-        })
-        orders_map[order.id]['total_revenue'] += line_total
+    # Read-only: overdue Pending orders are expired by the background sweeper (app.services.expiry)
+    if request.args.get('stream') == '1':
+        # Whole history as one JSON array, produced incrementally
+        return Response(stream_with_context(order_feed.stream(tenant_id)), mimetype='application/json')
+
+    try:
+        limit = int(request.args.get('limit', order_feed.DEFAULT_PAGE_SIZE))
+        orders, next_cursor = order_feed.page(tenant_id, cursor=request.args.get('cursor'), limit=limit)
+    except (ValueError, order_feed.InvalidCursor):
+        return jsonify({"message": "Invalid cursor or limit"}), 400
 
-    return jsonify(list(orders_map.values())), 200
+    response = jsonify(orders)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
 
 @bp.route('/orders/<int:order_id>/status', methods=['PUT'])
 @jwt_required()
 def update_order_status(order_id):
-    current_user_id = get_jwt_identity()
-    if isinstance(current_user_id, dict):
-        user_id = current_user_id.get('id')
-    else:
-        user_id = current_user_id
-
-    tenant = Tenant.query.filter_by(user_id=user_id).first()
-    if not tenant:
+    tenant_id = principal.current().tenant_id
+    if not tenant_id:
         return jsonify({"message": "Tenant not found"}), 404
 
     data = request.get_json()
@@ -233,14 +208,38 @@ def update_order_status(order_id):
 
     from app.models import Order, OrderItem, Product
     
-    # Verify the order contains a product from this tenant
+    # Verify the order contains a product from this tenant, and whether other shops' products are in it too
     # Using double quotes for "order" because it's a reserved keyword in some SQL dialects
-    order = db.session.query(Order).join(OrderItem).join(Product)\
+    other_shops = db.session.query(OrderItem.id).join(Product)\
+        .filter(OrderItem.order_id == Order.id)\
+        .filter(Product.tenant_id != tenant_id)\
+        .exists()
+    order, shared = db.session.query(Order, other_shops).join(OrderItem).join(Product)\
         .filter(Order.id == order_id)\
-        .filter(Product.tenant_id == tenant.id)\
+        .filter(Product.tenant_id == tenant_id)\
         .first_or_404()
 
-    order.status = new_status
+    old_status = order.status
+    if old_status in inventory.RELEASE_STATUSES:
+        # Its stock was already returned; reviving it would sell stock it no longer holds
+        return jsonify({"message": f"Order is {old_status} and can no longer change"}), 409
+    if new_status in inventory.RELEASE_STATUSES and shared:
+        # Status is per order, so one shop can't cancel the other shops' lines
+        return jsonify({"message": "Order includes products from other shops and can't be cancelled by one shop"}), 409
+
+    # Only move the order if nobody changed it since we read it, so two
+    # concurrent updates can't both release its stock or adjust the revenue rollup
+    moved = db.session.query(Order)\
+        .filter(Order.id == order.id, Order.status == old_status)\
+        .update({Order.status: new_status}, synchronize_session=False)
+    if not moved:
+        db.session.rollback()
+        return jsonify({"message": "Order was updated concurrently, please retry"}), 409
+
+    if new_status in inventory.RELEASE_STATUSES:
+        inventory.release([order.id])
+        revenue.reverse([order.id])
+    sales_rollup.status_changed([order.id], old_status, new_status)
     db.session.commit()
 
     return jsonify({"message": f"Order status updated to {new_status}", "status": new_status}), 200
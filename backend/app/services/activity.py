@@ -0,0 +1,64 @@
+import random
+from datetime import datetime
+from sqlalchemy import delete, func, insert, select
+from app import db
+from app.models import ActivityCounter, Order
+from app.services.dialect import hour_bucket, upsert_adding
+
+# Hourly activity counters (activity_counter) behind /admin/analytics.
+# Events are counted into UTC hour buckets as they happen; readers sum the
+# buckets of a date range, so the cost depends on the range, not on how many
+# orders or visits there were. Each hour is split over SLOTS rows picked at
+# random so concurrent writers rarely wait on the same row lock.
+
+ORDER = 'order'
+VISIT = 'visit'
+
+SLOTS = 8
+MAX_RANGE_DAYS = 366
+
+def truncate_to_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def record(kind, at=None, count=1):
+    """Count `count` events of `kind` at `at` (default now); commits with the caller's transaction."""
+    at = at or datetime.utcnow()
+    db.session.execute(
+        upsert_adding(ActivityCounter.__table__, ['kind', 'bucket', 'slot'], ['count']),
+        [{'kind': kind, 'bucket': truncate_to_hour(at), 'slot': random.randrange(SLOTS), 'count': count}]
+    )
+
+def range_query(kind, start, end):
+    return select(ActivityCounter.bucket, func.sum(ActivityCounter.count))\
+        .where(ActivityCounter.kind == kind)\
+        .where(ActivityCounter.bucket >= start)\
+        .where(ActivityCounter.bucket < end)\
+        .group_by(ActivityCounter.bucket)
+
+def hourly(kind, start, end):
+    """{hour: count} for the half-open range [start, end)."""
+    return {bucket: int(count) for bucket, count in db.session.execute(range_query(kind, start, end))}
+
+def by_weekday(kind, start, end):
+    """Event counts per weekday (0 = Monday) for [start, end)."""
+    counts = [0] * 7
+    for bucket, count in hourly(kind, start, end).items():
+        counts[bucket.weekday()] += count
+    return counts
+
+def backfill_orders():
+    """Rebuild the 'order' counters from the orders table. Returns the number of hours written."""
+    bucket = hour_bucket(Order.created_at)
+    counts = select(bucket, func.count(Order.id))\
+        .where(Order.created_at.isnot(None))\
+        .group_by(bucket)
+
+    db.session.execute(delete(ActivityCounter).where(ActivityCounter.kind == ORDER))
+    rows = [
+        {'kind': ORDER, 'bucket': hour, 'slot': 0, 'count': count}
+        for hour, count in db.session.execute(counts)
+    ]
+    if rows:
+        db.session.execute(insert(ActivityCounter), rows)
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,49 @@
+import logging
+import threading
+import time
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# Periodic jobs that run on a daemon thread inside each serving process.
+# They start with the first request a worker handles, so CLI commands, migrations
+# and scripts that call create_app() never spawn threads. A job whose interval
+# setting is 0 (or BACKGROUND_JOBS is off / TESTING is on) is never started.
+
+def init_app(app, jobs):
+    # jobs: list of (config key holding the interval in seconds, callable)
+    app.extensions['background_jobs'] = {'jobs': list(jobs), 'started': False, 'lock': threading.Lock()}
+
+    @app.before_request
+    def start_background_jobs():
+        state = app.extensions['background_jobs']
+        if state['started']:
+            return
+        with state['lock']:
+            if state['started']:
+                return
+            state['started'] = True
+        if app.testing or not app.config.get('BACKGROUND_JOBS', True):
+            return
+        for config_key, job in state['jobs']:
+            interval = app.config.get(config_key, 0)
+            if interval and interval > 0:
+                start_periodic(app, job, interval)
+
+def run_job(app, job):
+    with app.app_context():
+        try:
+            return job()
+        except Exception:
+            logger.exception("Background job %s failed", job.__name__)
+            db.session.rollback()
+
+def start_periodic(app, job, interval):
+    def loop():
+        while True:
+            time.sleep(interval)
+            run_job(app, job)
+
+    thread = threading.Thread(target=loop, name=f"{job.__module__}.{job.__name__}", daemon=True)
+    thread.start()
+    return thread
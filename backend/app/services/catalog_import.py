@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+import math
+from sqlalchemy import select
+from app import db
+from app.models import Product
+from app.services import conditional, search
+from app.services.dialect import upsert_replacing
+
+# Bulk catalog import (POST /tenant/products/import, `flask import-catalog`).
+# Rows are read one at a time from a CSV or NDJSON stream, validated, and
+# upserted by (tenant_id, sku) in executemany batches, each committed on its
+# own. Only the current batch and a capped error report are held in memory,
+# so file size doesn't matter. Every row describes the whole product:
+# sku, name, price and stock are required; description and image_url
+# default to empty.
+
+FORMATS = ('csv', 'ndjson')
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+# product.stock is a 32-bit INTEGER on PostgreSQL
+MAX_STOCK = 2**31 - 1
+
+UPDATE_COLUMNS = ['name', 'description', 'price', 'stock', 'image_url']
+
+class UnknownFormat(ValueError):
+    pass
+
+def format_for(content_type, requested=None):
+    if requested:
+        if requested not in FORMATS:
+            raise UnknownFormat(requested)
+        return requested
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    if mimetype in ('text/csv', 'application/csv'):
+        return 'csv'
+    if mimetype in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        return 'ndjson'
+    raise UnknownFormat(mimetype or 'missing Content-Type')
+
+def read_rows(binary_stream, fmt):
+    """Yield (line number, row dict or parse error message) from a byte stream."""
+    text = io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"invalid JSON: {e}"
+            continue
+        yield line_no, row if isinstance(row, dict) else "expected a JSON object"
+
+def _text(row, field, max_length, required=False):
+    value = row.get(field)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ValueError(f"{field} is required")
+    if len(value) > max_length:
+        raise ValueError(f"{field} is longer than {max_length} characters")
+    return value
+
+def _number(row, field, cast, maximum=None):
+    value = row.get(field)
+    if value is None or str(value).strip() == '':
+        raise ValueError(f"{field} is required")
+    # JSON true/false would otherwise cast to 1/0
+    if isinstance(value, bool):
+        raise ValueError(f"{field} must be a number")
+    try:
+        number = cast(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"{field} must be a number")
+    if not math.isfinite(number):
+        raise ValueError(f"{field} must be a finite number")
+    if number < 0:
+        raise ValueError(f"{field} can't be negative")
+    if maximum is not None and number > maximum:
+        raise ValueError(f"{field} can't be more than {maximum}")
+    return number
+
+def validate(row):
+    """Return the product columns of one import row, or raise ValueError listing every problem."""
+    product, errors = {}, []
+    checks = [
+        ('sku', lambda: _text(row, 'sku', 64, required=True)),
+        ('name', lambda: _text(row, 'name', 100, required=True)),
+        ('description', lambda: _text(row, 'description', 10000)),
+        ('image_url', lambda: _text(row, 'image_url', 255)),
+        ('price', lambda: _number(row, 'price', float)),
+        ('stock', lambda: _number(row, 'stock', lambda v: int(str(v)), MAX_STOCK)),
+    ]
+    for field, check in checks:
+        try:
+            product[field] = check()
+        except ValueError as e:
+            errors.append(str(e))
+    if errors:
+        raise ValueError('; '.join(errors))
+    return product
+
+def _flush(tenant_id, batch, report):
+    # 1 query to tell inserts from updates, 1 executemany upsert, 2 search index statements
+    existing = set(db.session.execute(
+        select(Product.sku).where(Product.tenant_id == tenant_id).where(Product.sku.in_(list(batch.keys())))
+    ).scalars())
+    db.session.execute(
+        upsert_replacing(Product.__table__, ['tenant_id', 'sku'], UPDATE_COLUMNS),
+        [dict(product, tenant_id=tenant_id) for product in batch.values()]
+    )
+    search.index_skus(tenant_id, batch.keys())
+    conditional.bump(conditional.tenant_scope(tenant_id))
+    db.session.commit()
+
+    report['updated'] += len(existing)
+    report['inserted'] += len(batch) - len(existing)
+    batch.clear()
+
+def import_rows(tenant_id, rows, batch_size=IMPORT_BATCH_SIZE):
+    """Upsert (line number, row) pairs into the tenant's catalog; returns the import report."""
+    report = {'received': 0, 'inserted': 0, 'updated': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    batch = {}
+
+    for line_no, row in rows:
+        report['received'] += 1
+        try:
+            if isinstance(row, str):
+                raise ValueError(row)
+            product = validate(row)
+        except ValueError as e:
+            report['failed'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                sku = row.get('sku') if isinstance(row, dict) else None
+                report['errors'].append({'line': line_no, 'sku': sku, 'error': str(e)})
+            else:
+                report['errors_truncated'] = True
+            continue
+
+        # A SKU repeated within one batch would hit the same row twice in one statement
+        if product['sku'] in batch:
+            _flush(tenant_id, batch, report)
+        batch[product['sku']] = product
+        if len(batch) >= batch_size:
+            _flush(tenant_id, batch, report)
+
+    if batch:
+        _flush(tenant_id, batch, report)
+    return report
@@ -0,0 +1,101 @@
+from collections import OrderedDict, defaultdict
+from sqlalchemy import insert
+from app import db
+from app.models import Product, CustomerProfile, Order, OrderItem
+from app.services import activity, inventory, revenue, sales_rollup
+
+# Checkout engine used by POST /customer/orders.
+# Every step is set-based so the number of statements sent to the database
+# stays the same whether the basket holds 1 line or 100.
+
+def _merge_lines(items):
+    # Collapse duplicate cart lines into {product_id: quantity}, keeping cart order
+    lines = OrderedDict()
+    for item in items:
+        try:
+            product_id = int(item['id'])
+            quantity = int(item.get('quantity', 1))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if quantity <= 0:
+            continue
+        lines[product_id] = lines.get(product_id, 0) + quantity
+    return lines
+
+def tier_for(points):
+    if points >= 1500:
+        return 'Gold'
+    elif points >= 500:
+        return 'Silver'
+    return 'Bronze'
+
+def place_order(user_id, items, delivery_address=None, contact_number=None, delivery_time=None):
+    lines = _merge_lines(items)
+
+    # 1 query: every product in the basket
+    products = {}
+    if lines:
+        rows = Product.query.filter(Product.id.in_(list(lines.keys()))).all()
+        products = {p.id: p for p in rows}
+
+    order_items = []
+    reservations = {}
+    tenant_credits = defaultdict(float)
+    total_amount = 0
+
+    for product_id, quantity in lines.items():
+        product = products.get(product_id)
+        if not product:
+            continue
+
+        line_total = product.price * quantity
+        total_amount += line_total
+
+        order_items.append({
+            'product_id': product.id,
+            'quantity': quantity,
+            'price_at_purchase': product.price
+        })
+
+        reservations[product.id] = quantity
+
+        # Revenue Calculation: Credit Tenant
+        tenant_credits[product.tenant_id] += line_total
+
+    # 1 query: the order header, with its total already known
+    new_order = Order(
+        user_id=user_id,
+        total_amount=total_amount,
+        status='Pending',
+        delivery_address=delivery_address,
+        contact_number=contact_number,
+        delivery_time=delivery_time
+    )
+    db.session.add(new_order)
+    db.session.flush()
+
+    # 1 executemany: all order lines
+    if order_items:
+        for row in order_items:
+            row['order_id'] = new_order.id
+        db.session.execute(insert(OrderItem), order_items)
+
+    # 2 statements: conditional stock decrement + ledger append (raises OutOfStock)
+    inventory.reserve(new_order.id, reservations)
+
+    # 1 executemany: append one revenue entry per tenant, never touching the tenant row
+    revenue.record(new_order.id, tenant_credits)
+
+    # Loyalty & Tier Logic (1 point per $1)
+    profile = CustomerProfile.query.filter_by(user_id=user_id).first()
+    if profile:
+        profile.loyalty_points = (profile.loyalty_points or 0) + int(total_amount)
+        profile.tier = tier_for(profile.loyalty_points)
+
+    # 1 upsert: dashboard rollup rows, last so their row locks are held briefly
+    sales_rollup.record_order(new_order.created_at, tenant_credits)
+
+    # 1 upsert: hourly order counter for the traffic charts
+    activity.record(activity.ORDER, at=new_order.created_at)
+
+    return new_order
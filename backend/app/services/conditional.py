@@ -0,0 +1,124 @@
+import hashlib
+import time
+from datetime import datetime
+from functools import wraps
+from flask import Response, current_app, make_response, request
+from sqlalchemy import select
+from app import db
+from app.models import ChangeCounter
+from app.services.cache import LRUCache
+from app.services.dialect import insert_ignoring_conflicts
+
+# Conditional GET (ETag / Last-Modified) for the public catalog.
+# Writers bump per-scope change counters in the same transaction as their change;
+# readers derive the ETag from those counters with one primary-key lookup, so a
+# matching If-None-Match is answered with 304 before any model is loaded.
+#
+# Views marked cached=True also keep their serialized 200 body in a per-process
+# LRU, one entry per path holding the body and the ETag it was rendered for. A
+# bump (or a new stock window) changes the ETag, so every worker stops using
+# the old body on its next request, whichever process made the change, and the
+# new body replaces it rather than piling up next to it.
+# CATALOG_CACHE_SIZE=0 turns the cache off (e.g. for tests).
+
+SHOPS = 'shops'
+EVENTS = 'events'
+
+def tenant_scope(tenant_id):
+    return f"tenant:{tenant_id}"
+
+def stock_window():
+    # Checkout changes stock without bumping counters (that would put every order
+    # for a shop back on one hot row), so product ETags also roll every
+    # CATALOG_STOCK_WINDOW seconds. Checkout itself always enforces real stock.
+    return str(int(time.time() // current_app.config['CATALOG_STOCK_WINDOW']))
+
+def today():
+    # The upcoming-events list changes at midnight UTC
+    return datetime.utcnow().date().isoformat()
+
+def bump(*scopes):
+    """Advance the counters of the given scopes; commit with the caller's transaction."""
+    counter = ChangeCounter.__table__
+    now = datetime.utcnow()
+    db.session.execute(
+        insert_ignoring_conflicts(counter),
+        [{'scope': scope, 'version': 0, 'updated_at': now} for scope in scopes]
+    )
+    db.session.execute(
+        counter.update()
+        .where(counter.c.scope.in_(scopes))
+        .values(version=counter.c.version + 1, updated_at=now)
+    )
+
+def versions(scopes):
+    counter = ChangeCounter.__table__
+    rows = db.session.execute(
+        select(counter.c.scope, counter.c.version, counter.c.updated_at).where(counter.c.scope.in_(scopes))
+    ).all()
+    found = {row.scope: row for row in rows}
+    parts = [f"{scope}={found[scope].version if scope in found else 0}" for scope in scopes]
+    modified = [row.updated_at for row in rows if row.updated_at]
+    return parts, (max(modified) if modified else None)
+
+def _body_cache():
+    cache = current_app.extensions.get('catalog_cache')
+    if cache is None:
+        config = current_app.config
+        cache = LRUCache(config['CATALOG_CACHE_SIZE'], config['CATALOG_CACHE_TTL'])
+        current_app.extensions['catalog_cache'] = cache
+    return cache if cache.max_size else None
+
+def _render(view, etag, cached, args, kwargs):
+    cache = _body_cache() if cached else None
+    if cache is None:
+        return make_response(view(*args, **kwargs))
+
+    body = cache.get(request.path, version=etag)
+    if body is not None:
+        return Response(body, mimetype='application/json')
+    response = make_response(view(*args, **kwargs))
+    if response.status_code == 200:
+        cache.set(request.path, response.get_data(), version=etag)
+    return response
+
+def conditional(scopes, extra=None, cached=False):
+    """Decorate a GET view with ETag/Last-Modified handling.
+
+    scopes: callable receiving the view kwargs and returning the counter scopes.
+    extra: optional callable adding a string to the ETag (e.g. the current day).
+    The counters can't date such a change, so these views send no Last-Modified
+    and only revalidate by ETag.
+    cached: keep the JSON body per ETag in the catalog cache; the view's output
+    must depend only on its path and the versions behind the ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            parts, last_modified = versions(scopes(**kwargs))
+            if extra is not None:
+                parts.append(extra())
+                last_modified = None
+            etag = hashlib.sha1('|'.join([request.path] + parts).encode()).hexdigest()[:20]
+            if last_modified is not None:
+                last_modified = last_modified.replace(microsecond=0)
+
+            not_modified = request.if_none_match.contains(etag) if request.if_none_match else (
+                last_modified is not None and request.if_modified_since is not None
+                and last_modified <= request.if_modified_since.replace(tzinfo=None)
+            )
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = _render(view, etag, cached, args, kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Clients may keep the body but must revalidate before reusing it
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,141 @@
+import json
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, or_, select
+from app import db
+from app.models import DashboardSnapshot, Tenant, User, UserRole
+from app.services import revenue, sales_rollup
+from app.services.cache import LRUCache
+from app.services.dialect import insert_ignoring_conflicts
+
+# Admin dashboard (GET /admin/stats) served from a shared snapshot.
+# The payload is computed with SQL aggregates and stored in dashboard_snapshot.
+# Once it is older than DASHBOARD_SNAPSHOT_TTL, the first worker to take the
+# lease recomputes it while everyone else keeps serving the previous payload,
+# so any number of concurrent admins cause at most one recomputation per TTL.
+
+NAME = 'admin'
+LEASE_SECONDS = 60      # a crashed recompute blocks others for at most this long
+FIRST_BUILD_WAIT = 5    # seconds to wait for another worker's very first snapshot
+
+def shop_revenue_query(limit, offset=0):
+    # Shops by current balance, highest first; ties broken by id for stable pages
+    balances = revenue.balances_query().subquery()
+    return select(Tenant.id, Tenant.shop_name, Tenant.category, balances.c.balance)\
+        .join(balances, balances.c.id == Tenant.id)\
+        .order_by(balances.c.balance.desc(), Tenant.id)\
+        .limit(limit).offset(offset)
+
+def shop_revenue(limit, offset=0):
+    return [
+        {'id': tenant_id, 'shop_name': shop_name, 'revenue': float(balance), 'category': category}
+        for tenant_id, shop_name, category, balance in db.session.execute(shop_revenue_query(limit, offset))
+    ]
+
+def shop_count():
+    return db.session.execute(select(func.count(Tenant.id))).scalar()
+
+def compute():
+    """Build the dashboard payload; every figure is a SQL aggregate."""
+    balances = revenue.balances_query().subquery()
+    total_revenue = db.session.execute(select(func.coalesce(func.sum(balances.c.balance), 0))).scalar()
+    return {
+        "total_users": db.session.execute(select(func.count(User.id))).scalar(),
+        "total_tenants": db.session.execute(
+            select(func.count(User.id)).where(User.role == UserRole.TENANT.value)
+        ).scalar(),
+        "total_revenue": float(total_revenue),
+        "shop_count": shop_count(),
+        "shop_revenue": shop_revenue(current_app.config['DASHBOARD_TOP_SHOPS']),
+        "occupancy_rate": 85, # Could calculate based on shop capacity if defined
+        "monthly_revenue": sales_rollup.monthly_revenue(),
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+def _cache():
+    cache = current_app.extensions.get('dashboard_cache')
+    if cache is None:
+        cache = LRUCache(max_size=1, ttl=current_app.config['DASHBOARD_SNAPSHOT_TTL'])
+        current_app.extensions['dashboard_cache'] = cache
+    return cache
+
+def _stored():
+    snapshot = DashboardSnapshot.__table__
+    return db.session.execute(
+        select(snapshot.c.payload, snapshot.c.computed_at).where(snapshot.c.name == NAME)
+    ).first()
+
+def _claim(now, ttl):
+    # Take the recompute lease if the snapshot is due and nobody holds a live lease
+    snapshot = DashboardSnapshot.__table__
+    db.session.execute(insert_ignoring_conflicts(snapshot), [{'name': NAME}])
+    claimed = db.session.execute(
+        snapshot.update()
+        .where(snapshot.c.name == NAME)
+        .where(or_(snapshot.c.computed_at.is_(None), snapshot.c.computed_at <= now - ttl))
+        .where(or_(snapshot.c.lease_until.is_(None), snapshot.c.lease_until < now))
+        .values(lease_until=now + timedelta(seconds=LEASE_SECONDS))
+    ).rowcount
+    db.session.commit()
+    return claimed == 1
+
+def refresh(force=False):
+    """Recompute the snapshot if it is due and no other worker is on it.
+
+    Returns the new payload as JSON, or None when this worker did not recompute.
+    """
+    now = datetime.utcnow()
+    ttl = timedelta(seconds=0 if force else current_app.config['DASHBOARD_SNAPSHOT_TTL'])
+    if not _claim(now, ttl):
+        return None
+
+    snapshot = DashboardSnapshot.__table__
+    try:
+        body = json.dumps(compute())
+    except Exception:
+        db.session.rollback()
+        db.session.execute(snapshot.update().where(snapshot.c.name == NAME).values(lease_until=None))
+        db.session.commit()
+        raise
+
+    # computed_at is when we started, so the snapshot never looks fresher than it is
+    db.session.execute(
+        snapshot.update()
+        .where(snapshot.c.name == NAME)
+        .values(payload=body, computed_at=now, lease_until=None)
+    )
+    db.session.commit()
+    _cache().set(NAME, body)
+    return body
+
+def snapshot_json():
+    """Current dashboard payload as JSON, recomputing it here only if this worker wins the lease."""
+    body = _cache().get(NAME)
+    if body is not None:
+        return body
+
+    ttl = current_app.config['DASHBOARD_SNAPSHOT_TTL']
+    stored = _stored()
+    if stored and stored.payload:
+        age = (datetime.utcnow() - stored.computed_at).total_seconds()
+        if age < ttl:
+            _cache().set(NAME, stored.payload, ttl=ttl - age)
+            return stored.payload
+
+    body = refresh()
+    if body is not None:
+        return body
+    if stored and stored.payload:
+        # Another worker is recomputing: serve the previous snapshot meanwhile
+        return stored.payload
+
+    # No snapshot exists yet and another worker is building the first one
+    deadline = time.monotonic() + FIRST_BUILD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        db.session.rollback() # end the read transaction so the new row is visible
+        stored = _stored()
+        if stored and stored.payload:
+            return stored.payload
+    return json.dumps(compute())
@@ -0,0 +1,36 @@
+from sqlalchemy import DateTime, func, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+
+# Small helpers for statements whose syntax differs between SQLite (dev) and
+# PostgreSQL (Neon), so callers keep a single code path.
+
+def _dialect():
+    return postgresql if db.engine.name == 'postgresql' else sqlite
+
+def insert_ignoring_conflicts(table):
+    """INSERT ... ON CONFLICT DO NOTHING for the current engine."""
+    return _dialect().insert(table).on_conflict_do_nothing()
+
+def upsert_adding(table, key_columns, add_columns):
+    """INSERT ... ON CONFLICT (key_columns) DO UPDATE, adding add_columns onto the existing row."""
+    stmt = _dialect().insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: table.c[column] + stmt.excluded[column] for column in add_columns}
+    )
+
+def upsert_replacing(table, key_columns, update_columns):
+    """INSERT ... ON CONFLICT (key_columns) DO UPDATE, overwriting update_columns with the new values."""
+    stmt = _dialect().insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: stmt.excluded[column] for column in update_columns}
+    )
+
+def hour_bucket(column):
+    """Truncate a timestamp column to the start of its hour, typed as DateTime."""
+    if db.engine.name == 'postgresql':
+        return func.date_trunc('hour', column)
+    # Same text layout SQLAlchemy stores DateTime values in on SQLite
+    return type_coerce(func.strftime('%Y-%m-%d %H:00:00.000000', column), DateTime)
@@ -0,0 +1,38 @@
+from datetime import datetime, time
+from flask import current_app
+from sqlalchemy import select
+from app.models import Event
+from app.services import serializers
+from app.services.cache import LRUCache
+
+# Public upcoming-events list (GET /events/).
+# The serialized payload is cached per process and keyed by the UTC date, so
+# the list rolls over by itself at midnight. Event writes call invalidate();
+# EVENTS_CACHE_TTL bounds how stale other worker processes can be.
+
+def start_of_today(now=None):
+    now = now or datetime.utcnow()
+    return datetime.combine(now.date(), time.min)
+
+def upcoming_query(now=None):
+    # Range predicate on the bare column so ix_event_date can be used
+    return select(Event).where(Event.date >= start_of_today(now)).order_by(Event.date.asc())
+
+def _cache():
+    cache = current_app.extensions.get('events_cache')
+    if cache is None:
+        cache = LRUCache(max_size=2, ttl=current_app.config['EVENTS_CACHE_TTL'])
+        current_app.extensions['events_cache'] = cache
+    return cache
+
+def upcoming_json():
+    """Serialized list of events from the start of today (UTC) onwards."""
+    today = start_of_today()
+    body = _cache().get(today)
+    if body is None:
+        body = serializers.dumps(serializers.events(upcoming_query(today)))
+        _cache().set(today, body)
+    return body
+
+def invalidate():
+    _cache().clear()
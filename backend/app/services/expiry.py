@@ -0,0 +1,61 @@
+import datetime
+from sqlalchemy import select
+from app import db
+from app.models import Order
+from app.services import inventory, revenue, sales_rollup
+
+# Scheduled expiry of Pending orders whose delivery time has passed.
+# Replaces the old expiry-on-read in GET /customer/orders and GET /tenant/orders;
+# runs as a background job (ORDER_EXPIRY_INTERVAL) and as `flask expire-orders`.
+
+EXPIRY_BATCH_SIZE = 5000
+
+def _expire_batch(now, batch_size):
+    order = Order.__table__
+    due = select(order.c.id)\
+        .where(order.c.status == 'Pending')\
+        .where(order.c.delivery_time < now)\
+        .limit(batch_size)
+
+    if db.engine.dialect.update_returning:
+        return db.session.execute(
+            order.update()
+            .where(order.c.id.in_(due))
+            .where(order.c.status == 'Pending')
+            .values(status='Expired')
+            .returning(order.c.id)
+        ).scalars().all()
+
+    # Without RETURNING: same predicate per row, keeping only the orders this
+    # transaction moved, since only those may have their stock released
+    expired = []
+    for order_id in db.session.execute(due).scalars().all():
+        result = db.session.execute(
+            order.update()
+            .where(order.c.id == order_id)
+            .where(order.c.status == 'Pending')
+            .values(status='Expired')
+        )
+        if result.rowcount:
+            expired.append(order_id)
+    return expired
+
+def expire_overdue(now=None, batch_size=EXPIRY_BATCH_SIZE):
+    """Mark overdue Pending orders Expired and release their stock. Returns the count."""
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) # naive comparison
+
+    expired = 0
+    while True:
+        ids = _expire_batch(now, batch_size)
+        if not ids:
+            break
+        inventory.release(ids)
+        revenue.reverse(ids)
+        sales_rollup.status_changed(ids, 'Pending', 'Expired')
+        db.session.commit()
+
+        expired += len(ids)
+        if len(ids) < batch_size:
+            break
+    return expired
@@ -0,0 +1,112 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from flask import Response, after_this_request, current_app, g, jsonify, request
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import IdempotencyKey
+from app.services.cache import LRUCache
+
+# Idempotency-Key support for unsafe endpoints (POST /customer/orders).
+#
+# The key row is inserted as the first write of the request's transaction and
+# completed in the same commit as the order. A concurrent duplicate's INSERT
+# therefore blocks on the unique (user_id, key) constraint until the winner
+# commits, then fails and replays the stored response. If the winner rolls back,
+# the duplicate's INSERT succeeds and it becomes the winner instead.
+# Completed responses are also kept in an in-process LRU so retries usually
+# never reach the database.
+
+HEADER = 'Idempotency-Key'
+
+def _cache():
+    cache = current_app.extensions.get('idempotency_cache')
+    if cache is None:
+        cache = LRUCache(current_app.config['IDEMPOTENCY_CACHE_SIZE'], current_app.config['IDEMPOTENCY_TTL'])
+        current_app.extensions['idempotency_cache'] = cache
+    return cache
+
+def _fingerprint(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def _replay(stored, request_hash):
+    status_code, body, stored_hash = stored
+    if stored_hash != request_hash:
+        return jsonify({"message": f"{HEADER} was already used with a different request"}), 422
+    response = Response(body, status=status_code, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def begin(user_id, payload):
+    """Claim the request's Idempotency-Key, if it sent one.
+
+    Returns a response to send back unchanged when the key was already used,
+    or None when this request should go ahead (and later call finish()).
+    Must run before the request writes anything else.
+    """
+    key = request.headers.get(HEADER)
+    if not key:
+        return None
+    if len(key) > 255:
+        return jsonify({"message": f"{HEADER} is too long"}), 400
+
+    user_id = int(user_id)
+    request_hash = _fingerprint(payload)
+    cached = _cache().get((user_id, key))
+    if cached is not None:
+        return _replay(cached, request_hash)
+
+    now = datetime.utcnow()
+    ttl = timedelta(seconds=current_app.config['IDEMPOTENCY_TTL'])
+    for _ in range(2):
+        record = IdempotencyKey(user_id=user_id, key=key, request_hash=request_hash, created_at=now, expires_at=now + ttl)
+        db.session.add(record)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+        else:
+            g.idempotency_record = record
+            return None
+
+        existing = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+        if existing is None:
+            continue
+        if existing.expires_at <= now:
+            # Expired but not purged yet: reclaim the key
+            db.session.delete(existing)
+            db.session.commit()
+            continue
+        if existing.status_code is None:
+            break
+
+        stored = (existing.status_code, existing.response_body, existing.request_hash)
+        db.session.rollback()
+        _cache().set((user_id, key), stored, ttl=(existing.expires_at - now).total_seconds())
+        return _replay(stored, request_hash)
+
+    response = jsonify({"message": "A request with this Idempotency-Key is still being processed"})
+    response.headers['Retry-After'] = '1'
+    return response, 409
+
+def finish(status_code, body):
+    """Record the response for the claimed key; it is committed with the caller's transaction."""
+    record = g.pop('idempotency_record', None)
+    if record is None:
+        return
+    record.status_code = status_code
+    record.response_body = json.dumps(body)
+    stored = (status_code, record.response_body, record.request_hash)
+    cache_key = (record.user_id, record.key)
+
+    @after_this_request
+    def remember(response):
+        # Only cache once the transaction has actually gone through
+        if response.status_code == status_code:
+            _cache().set(cache_key, stored)
+        return response
+
+def purge_expired():
+    deleted = IdempotencyKey.query.filter(IdempotencyKey.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,105 @@
+from datetime import datetime
+from sqlalchemy import bindparam, case, func, insert, select
+from app import db
+from app.models import Product, InventoryLedger
+
+# Stock reservation on top of Product.stock.
+# Stock is only ever changed with conditional, set-based UPDATEs so concurrent
+# checkouts can never oversell and never read-modify-write the same row in Python.
+# Every reservation and release is also appended to inventory_ledger; tenants
+# setting stock by hand (product edits, catalog import) overwrite it unlogged.
+
+RELEASE_STATUSES = ('Cancelled', 'Expired')
+
+class OutOfStock(Exception):
+    def __init__(self, product_ids):
+        super().__init__(f"Insufficient stock for products: {product_ids}")
+        self.product_ids = product_ids
+
+def reserve(order_id, quantities):
+    """Take {product_id: quantity} out of stock for an order, all or nothing.
+
+    Raises OutOfStock when any product lacks stock; the caller must roll back.
+    """
+    if not quantities:
+        return
+
+    product = Product.__table__
+    wanted = case(quantities, value=product.c.id)
+
+    if db.engine.dialect.update_returning:
+        # stock = stock - :q WHERE stock >= :q, for the whole basket in one statement
+        reserved = db.session.execute(
+            product.update()
+            .where(product.c.id.in_(list(quantities.keys())))
+            .where(product.c.stock >= wanted)
+            .values(stock=product.c.stock - wanted)
+            .returning(product.c.id)
+        ).scalars().all()
+    else:
+        # Dialects without UPDATE ... RETURNING: same predicate, checked per row
+        reserved = []
+        for product_id, quantity in quantities.items():
+            result = db.session.execute(
+                product.update()
+                .where(product.c.id == product_id)
+                .where(product.c.stock >= quantity)
+                .values(stock=product.c.stock - quantity)
+            )
+            if result.rowcount:
+                reserved.append(product_id)
+
+    missing = sorted(set(quantities) - set(reserved))
+    if missing:
+        raise OutOfStock(missing)
+
+    now = datetime.utcnow()
+    db.session.execute(insert(InventoryLedger), [
+        {'product_id': product_id, 'order_id': order_id, 'quantity': -quantity, 'reason': 'reserve', 'created_at': now}
+        for product_id, quantity in quantities.items()
+    ])
+
+def release(order_ids):
+    """Return the outstanding reservations of the given orders to stock.
+
+    Only the net reserved quantity left in the ledger is released, so calls made
+    one after another are harmless. Concurrent calls are not: both would read the
+    same outstanding sum. Callers must first move the orders into a release
+    status with a conditional UPDATE (WHERE status = <the status they read>) in
+    the same transaction and pass only the ids that UPDATE matched; the row lock
+    it takes lets exactly one transaction release each order.
+    """
+    if not order_ids:
+        return 0
+
+    outstanding = db.session.execute(
+        select(
+            InventoryLedger.order_id,
+            InventoryLedger.product_id,
+            func.sum(InventoryLedger.quantity).label('net')
+        )
+        .where(InventoryLedger.order_id.in_(list(order_ids)))
+        .group_by(InventoryLedger.order_id, InventoryLedger.product_id)
+        .having(func.sum(InventoryLedger.quantity) < 0)
+    ).all()
+    if not outstanding:
+        return 0
+
+    now = datetime.utcnow()
+    db.session.execute(insert(InventoryLedger), [
+        {'product_id': row.product_id, 'order_id': row.order_id, 'quantity': -row.net, 'reason': 'release', 'created_at': now}
+        for row in outstanding
+    ])
+
+    per_product = {}
+    for row in outstanding:
+        per_product[row.product_id] = per_product.get(row.product_id, 0) - row.net
+
+    product = Product.__table__
+    db.session.execute(
+        product.update()
+        .where(product.c.id == bindparam('b_id'))
+        .values(stock=product.c.stock + bindparam('b_quantity')),
+        [{'b_id': product_id, 'b_quantity': quantity} for product_id, quantity in per_product.items()]
+    )
+    return len(outstanding)
@@ -0,0 +1,101 @@
+import logging
+import os
+import time
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+logger = logging.getLogger(__name__)
+
+# Per-request instrumentation exposed on GET /metrics (Prometheus text format).
+# Every request records its latency, status, response size, and the number
+# and total time of the SQL statements it ran (engine events on every bind).
+# Statements slower than SLOW_QUERY_MS are logged with the blueprint and
+# endpoint that issued them; background jobs log as "-".
+#
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR (set in gunicorn.conf.py) makes
+# every worker write its samples to files there and /metrics sums them, so
+# any worker can answer the scrape. Without it (flask run) the metrics are
+# this process's only. METRICS_TOKEN, when set, is required as a Bearer token.
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency', ['method', 'endpoint'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+REQUESTS = Counter('http_requests', 'Requests by response status', ['method', 'endpoint', 'status'])
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size (streamed bodies excluded)', ['endpoint'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+SQL_STATEMENTS = Histogram(
+    'db_statements_per_request', 'SQL statements executed per request', ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+SQL_TIME = Histogram(
+    'db_time_per_request_seconds', 'Time spent in SQL per request', ['endpoint'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+SLOW_QUERIES = Counter('db_slow_queries', 'Statements slower than SLOW_QUERY_MS', ['endpoint'])
+
+def _endpoint():
+    # Route name, never the raw path, so labels stay bounded
+    return request.endpoint or 'unmatched'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.metrics_started = time.perf_counter()
+
+def _after_cursor_execute(app):
+    threshold = app.config['SLOW_QUERY_MS'] / 1000
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.metrics_started
+        endpoint = _endpoint() if has_request_context() else '-'
+        if has_request_context():
+            g.sql_count = g.get('sql_count', 0) + 1
+            g.sql_time = g.get('sql_time', 0.0) + elapsed
+        if threshold and elapsed >= threshold:
+            SLOW_QUERIES.labels(endpoint).inc()
+            blueprint = (request.blueprint or '-') if has_request_context() else '-'
+            logger.warning("Slow query %.0fms [%s %s] %s", elapsed * 1000, blueprint, endpoint, ' '.join(statement.split())[:1000])
+    return listener
+
+def _registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def init_app(app, db):
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute(app))
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        g.sql_count, g.sql_time = 0, 0.0
+
+    @app.after_request
+    def record(response):
+        started = g.pop('request_started', None)
+        if started is None or request.endpoint == 'metrics':
+            return response
+        endpoint = _endpoint()
+        REQUEST_LATENCY.labels(request.method, endpoint).observe(time.perf_counter() - started)
+        REQUESTS.labels(request.method, endpoint, str(response.status_code)).inc()
+        if not response.is_streamed:
+            RESPONSE_SIZE.labels(endpoint).observe(response.calculate_content_length() or 0)
+        SQL_STATEMENTS.labels(endpoint).observe(g.get('sql_count', 0))
+        SQL_TIME.labels(endpoint).observe(g.get('sql_time', 0.0))
+        return response
+
+    @app.route('/metrics', endpoint='metrics')
+    def metrics():
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f"Bearer {token}":
+            return Response(status=401)
+        return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,118 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import exists, select, tuple_
+from app import db
+from app.models import Order, OrderItem, Product
+
+# Tenant orders feed (GET /tenant/orders).
+# Paged mode walks orders newest-first with a keyset cursor over (created_at, id);
+# stream mode emits the whole history as one JSON array, row by row, from a
+# server-side cursor. Neither ever holds more than one page in memory.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+STREAM_CHUNK_SIZE = 500
+
+ORDER_COLUMNS = (
+    Order.id, Order.user_id, Order.created_at, Order.status,
+    Order.delivery_address, Order.contact_number, Order.delivery_time
+)
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(created_at, order_id):
+    raw = f"{created_at.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor):
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+
+def _order_dict(row):
+    return {
+        'id': row.id,
+        'customer_id': row.user_id,
+        'date': row.created_at.isoformat(),
+        'status': row.status,
+        'delivery_address': row.delivery_address,
+        'contact_number': row.contact_number,
+        'delivery_time': row.delivery_time.isoformat() if row.delivery_time else None,
+        'items': [],
+        'total_revenue': 0
+    }
+
+def _add_item(order, product_name, quantity, price):
+    line_total = price * quantity
+    order['items'].append({
+        'product_name': product_name,
+        'quantity': quantity,
+        'price': price,
+        'total': line_total
+    })
+    order['total_revenue'] += line_total
+
+def page_query(tenant_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    # Orders containing at least one of the tenant's products, after the cursor
+    sells_here = exists().where(OrderItem.order_id == Order.id)\
+        .where(OrderItem.product_id == Product.id)\
+        .where(Product.tenant_id == tenant_id)
+    query = select(*ORDER_COLUMNS).where(sells_here)
+    if cursor:
+        created_at, order_id = decode_cursor(cursor)
+        query = query.where(tuple_(Order.created_at, Order.id) < tuple_(created_at, order_id))
+    return query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit)
+
+def page(tenant_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return (orders, next_cursor) for one page of the tenant's orders, newest first."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    rows = db.session.execute(page_query(tenant_id, cursor, limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], None
+
+    orders = {row.id: _order_dict(row) for row in rows}
+    items = db.session.execute(
+        select(OrderItem.order_id, Product.name, OrderItem.quantity, OrderItem.price_at_purchase)
+        .join(Product, OrderItem.product_id == Product.id)
+        .where(OrderItem.order_id.in_(list(orders.keys())))
+        .where(Product.tenant_id == tenant_id)
+        .order_by(OrderItem.id)
+    )
+    for order_id, product_name, quantity, price in items:
+        _add_item(orders[order_id], product_name, quantity, price)
+
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    return list(orders.values()), next_cursor
+
+def stream_query(tenant_id):
+    return select(*ORDER_COLUMNS, Product.name, OrderItem.quantity, OrderItem.price_at_purchase)\
+        .join(OrderItem, OrderItem.order_id == Order.id)\
+        .join(Product, OrderItem.product_id == Product.id)\
+        .where(Product.tenant_id == tenant_id)\
+        .order_by(Order.created_at.desc(), Order.id.desc(), OrderItem.id)
+
+def stream(tenant_id):
+    """Yield the tenant's full order history as chunks of one JSON array."""
+    rows = db.session.execute(stream_query(tenant_id).execution_options(yield_per=STREAM_CHUNK_SIZE))
+
+    # Rows arrive grouped by order, so only the order being assembled is held
+    yield '['
+    current = None
+    separator = ''
+    for row in rows:
+        if current is None or current['id'] != row.id:
+            if current is not None:
+                yield separator + json.dumps(current)
+                separator = ','
+            current = _order_dict(row)
+        _add_item(current, row.name, row.quantity, row.price_at_purchase)
+    if current is not None:
+        yield separator + json.dumps(current)
+    yield ']'
@@ -0,0 +1,84 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Password hashing off the request threads.
+# Hashes are computed in a small per-process pool of PASSWORD_HASH_WORKERS
+# processes, so a login burst can only use that much CPU and cheap endpoints
+# keep being served. At most PASSWORD_HASH_QUEUE jobs may wait on top of the
+# running ones; beyond that callers get HashingBusy (sent back as 429). Both
+# are per gunicorn worker and only matter with threaded workers (see
+# gunicorn.conf.py): their sum must stay below the worker's threads.
+# PASSWORD_HASH_METHOD is any Werkzeug method string ('scrypt:32768:8:1',
+# 'pbkdf2:sha256:600000'); hashes made with other parameters are upgraded
+# on the user's next successful login.
+
+class HashingBusy(Exception):
+    pass
+
+class _Hasher:
+    def __init__(self, workers, queue, timeout):
+        self.timeout = timeout
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Created on first use, i.e. after gunicorn has forked this worker.
+        # Spawned children only import Werkzeug, not the app or its threads.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HashingBusy()
+
+def _hasher():
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is None:
+        config = current_app.config
+        # Tests hash inline so they never spawn processes
+        workers = 0 if current_app.testing else config['PASSWORD_HASH_WORKERS']
+        hasher = _Hasher(workers, config['PASSWORD_HASH_QUEUE'], config['PASSWORD_HASH_TIMEOUT'])
+        current_app.extensions['password_hasher'] = hasher
+    return hasher
+
+def _method():
+    return current_app.config['PASSWORD_HASH_METHOD']
+
+def _prefix(method):
+    # Canonical parameter prefix Werkzeug writes for a method ('scrypt' -> 'scrypt:32768:8:1')
+    prefixes = current_app.extensions.setdefault('password_hash_prefixes', {})
+    if method not in prefixes:
+        prefixes[method] = generate_password_hash('', method).split('$', 1)[0]
+    return prefixes[method]
+
+def hash_password(password):
+    """Hash with the configured method. Raises HashingBusy when the pool is saturated."""
+    return _hasher().run(generate_password_hash, password, _method())
+
+def verify_password(stored_hash, password):
+    """Check a password against its stored hash. Raises HashingBusy when the pool is saturated."""
+    if not stored_hash or password is None:
+        return False
+    return _hasher().run(check_password_hash, stored_hash, password)
+
+def needs_rehash(stored_hash):
+    return stored_hash.split('$', 1)[0] != _prefix(_method())
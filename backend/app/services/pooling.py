@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from sqlalchemy import exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Database connection pool profile (DB_* settings in config.py).
+# Neon drops idle connections and its compute may need a few seconds to wake
+# up, so pooled connections are recycled before the idle cutoff, checked with
+# a pre-ping before use, and connect with a timeout and TCP keepalives. With
+# DB_PGBOUNCER (transaction-mode poolers such as Neon's "-pooler" host) the
+# driver never relies on session state: no server-side prepared statements
+# and no startup options, so the statement timeout has to be set on the
+# database role instead (ALTER ROLE ... SET statement_timeout).
+#
+# The pool records how long checkouts wait for a free connection; stats()
+# reports that with the checked-out/overflow counts for GET /admin/pool.
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that counts checkouts, time spent waiting for them, and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = self.timeouts = 0
+        self.wait_total = self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+def engine_options(config, url=None):
+    """Engine options for url (default: SQLALCHEMY_DATABASE_URI) from the DB_* settings."""
+    url = make_url(url or config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {} # one shared in-memory connection; nothing to pool
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if url.get_backend_name() != 'postgresql':
+        return options
+
+    connect_args = {
+        'connect_timeout': config['DB_CONNECT_TIMEOUT'],
+        'keepalives': 1,
+        'keepalives_idle': 30,
+        'keepalives_interval': 10,
+        'keepalives_count': 3,
+    }
+    if config['DB_PGBOUNCER']:
+        if url.get_driver_name() == 'psycopg':
+            connect_args['prepare_threshold'] = None # psycopg 3 would prepare repeated statements
+        # psycopg2 never prepares server-side; nothing else to turn off
+    elif config['DB_STATEMENT_TIMEOUT_MS']:
+        connect_args['options'] = f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"
+    options['connect_args'] = connect_args
+    return options
+
+def warm_up(app):
+    """Open DB_WARMUP_CONNECTIONS pooled connections now, e.g. when a gunicorn worker boots.
+
+    Returns (connections opened, seconds taken).
+    """
+    wanted = app.config.get('DB_WARMUP_CONNECTIONS', 0)
+    if not wanted:
+        return 0, 0.0
+    from app import db
+    started = time.perf_counter()
+    with app.app_context():
+        connections = []
+        try:
+            # Held together so the pool has to open that many
+            for _ in range(wanted):
+                conn = db.engine.connect()
+                connections.append(conn)
+                conn.execute(text('SELECT 1'))
+        except Exception:
+            logger.exception("Database warm-up failed after %d connections", len(connections))
+        finally:
+            for conn in connections:
+                conn.close()
+    return len(connections), time.perf_counter() - started
+
+def stats(engine):
+    pool = engine.pool
+    data = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        data.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._metrics_lock:
+            data.update({
+                'checkouts': pool.checkouts,
+                'checkout_timeouts': pool.timeouts,
+                'checkout_wait_total_ms': round(pool.wait_total * 1000, 3),
+                'checkout_wait_max_ms': round(pool.wait_max * 1000, 3),
+            })
+    return data
@@ -0,0 +1,111 @@
+from functools import wraps
+from typing import NamedTuple, Optional
+from flask import abort, current_app, g, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+from sqlalchemy import select
+from app import db
+from app.models import CustomerProfile, Tenant, User, UserRole
+from app.services.cache import LRUCache
+
+# The signed-in caller, read from the JWT instead of the database.
+# auth.login puts role, tenant_id and customer_profile_id into the token, so
+# authorizing a request costs no queries. Tokens issued before those claims
+# existed, and tenants/customers whose profile was created after login, fall
+# back to a short-lived per-process identity cache (IDENTITY_CACHE_TTL).
+
+class Principal(NamedTuple):
+    user_id: int
+    role: Optional[str]
+    username: Optional[str]
+    tenant_id: Optional[int]
+    customer_profile_id: Optional[int]
+
+def _cache():
+    cache = current_app.extensions.get('identity_cache')
+    if cache is None:
+        cache = LRUCache(current_app.config['IDENTITY_CACHE_SIZE'], current_app.config['IDENTITY_CACHE_TTL'])
+        current_app.extensions['identity_cache'] = cache
+    return cache
+
+def identity(user_id):
+    """The user's row plus profile ids as a dict (one query, then cached), or None if unknown."""
+    user_id = int(user_id)
+    cached = _cache().get(user_id)
+    if cached is not None:
+        return cached
+
+    row = db.session.execute(
+        select(User.id, User.username, User.email, User.role, Tenant.id.label('tenant_id'),
+               CustomerProfile.id.label('customer_profile_id'))
+        .outerjoin(Tenant, Tenant.user_id == User.id)
+        .outerjoin(CustomerProfile, CustomerProfile.user_id == User.id)
+        .where(User.id == user_id)
+        .limit(1)
+    ).first()
+    if row is None:
+        return None
+    found = dict(row._mapping)
+    _cache().set(user_id, found)
+    return found
+
+def forget(user_id):
+    # Call after creating or removing a user's tenant/customer profile
+    _cache().delete(int(user_id))
+
+def claims_for(user_id):
+    """Additional JWT claims for a user (used at login)."""
+    found = identity(user_id) or {}
+    return {
+        'role': found.get('role'),
+        'username': found.get('username'),
+        'tenant_id': found.get('tenant_id'),
+        'customer_profile_id': found.get('customer_profile_id'),
+    }
+
+def _needs_lookup(claims):
+    if 'tenant_id' not in claims or 'customer_profile_id' not in claims:
+        return True
+    # Profile created after the token was issued
+    if claims['role'] == UserRole.TENANT.value and claims['tenant_id'] is None:
+        return True
+    return claims['role'] == UserRole.CUSTOMER.value and claims['customer_profile_id'] is None
+
+def current():
+    """Principal for the current request; must run under jwt_required()."""
+    token = get_jwt()
+    # Memoized per token, since g can outlive one request when an app context is reused
+    memo = g.get('principal')
+    if memo is not None and memo[0] == token.get('jti'):
+        return memo[1]
+
+    user_id = get_jwt_identity()
+    # Handle string or dict ID
+    if isinstance(user_id, dict):
+        user_id = user_id.get('id')
+    claims = token
+    if _needs_lookup(claims):
+        claims = identity(user_id)
+        if claims is None:
+            abort(401)
+
+    principal = Principal(
+        user_id=int(user_id),
+        role=claims.get('role'),
+        username=claims.get('username'),
+        tenant_id=claims.get('tenant_id'),
+        customer_profile_id=claims.get('customer_profile_id'),
+    )
+    g.principal = (token.get('jti'), principal)
+    return principal
+
+def principal_required(*roles):
+    """jwt_required() that also checks the caller's role, without touching the database."""
+    def decorator(fn):
+        @wraps(fn)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            if roles and current().role not in roles:
+                return jsonify({"message": "Unauthorized"}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
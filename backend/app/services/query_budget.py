@@ -0,0 +1,142 @@
+import os
+import traceback
+from collections import defaultdict
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Query budgets (test mode, QUERY_BUDGETS=1).
+# Every request's SQL statements are recorded and checked when it finishes:
+# more statements than the endpoint's budget below, or the same statement run
+# QUERY_N_PLUS_ONE_REPEATS+ times with different parameters (an N+1 loop),
+# raises QueryBudgetExceeded naming the SQL and where in the app it was
+# issued. Under TESTING the exception reaches the test client (for streamed
+# bodies, when the response is closed); every finished request is also kept
+# in app.extensions['query_budget'] for benchmarks/query_report.py.
+# An executemany counts as one statement.
+#
+# Budgets are per request and must not depend on the amount of data.
+# Endpoints without an entry fail, so new routes have to declare one;
+# UNBOUNDED is for endpoints that batch by design (repeats are expected there).
+
+UNBOUNDED = None
+
+BUDGETS = {
+    'index': 0,
+    'static': 0,
+    'metrics': 0,
+    'auth.register': 2,
+    'auth.login': 1,
+    # Catalog reads: the change_counter version for the ETag, then the page
+    'customer.get_shops': 2,
+    'customer.get_shop_details': 2,
+    'customer.get_shop_products': 2,
+    'customer.search_products': 1,
+    'customer.get_orders': 1,
+    'customer.get_profile': 1,
+    'customer.manage_wishlist': 1,
+    # Load the basket (no row locks: stock is a conditional decrement), order + items, stock, ledger, revenue, loyalty, counters
+    'customer.place_order': 10,
+    'tenant.get_stats': 3,
+    'tenant.get_products': 1,
+    # A page of orders, then all of their items in one IN (...)
+    'tenant.get_tenant_orders': 2,
+    'tenant.update_profile': 8,
+    'tenant.add_product': 7,
+    'tenant.update_product': 7,
+    'tenant.delete_product': 5,
+    'tenant.update_order_status': 7,
+    # catalog_import.IMPORT_BATCH_SIZE rows per batch, the same statements per batch
+    'tenant.import_products': UNBOUNDED,
+    'admin.get_all_tenants': 2,
+    # A cold snapshot: lease, recompute, store
+    'admin.get_stats': 10,
+    'admin.get_shop_revenue': 2,
+    'admin.get_detailed_analytics': 2,
+    'admin.get_cache_stats': 0,
+    'admin.get_pool_stats': 0,
+    'admin.approve_tenant': 5,
+    'events.get_events': 2,
+    'events.create_event': 4,
+    'events.manage_event': 5,
+    'events.seed_events': 1,
+}
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_FRAMES = 6
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+def _stack_excerpt():
+    # The innermost frames inside the app package, minus this module
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(APP_ROOT) and frame.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames[-STACK_FRAMES:]))
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    log = g.get('query_log') if has_request_context() else None
+    if log is not None:
+        log.append((statement, repr(parameters), _stack_excerpt()))
+
+def _repeated(log):
+    # Same SQL with different parameters, in first-seen order
+    runs = defaultdict(list)
+    for statement, parameters, stack in log:
+        runs[statement].append((parameters, stack))
+    for statement, calls in runs.items():
+        if len({parameters for parameters, _ in calls}) >= current_app.config['QUERY_N_PLUS_ONE_REPEATS']:
+            yield statement, calls
+
+def check(endpoint, log):
+    """Raise QueryBudgetExceeded if a finished request broke its endpoint's budget."""
+    if endpoint not in BUDGETS:
+        raise QueryBudgetExceeded(f"{endpoint}: no query budget declared in app.services.query_budget.BUDGETS")
+    budget = BUDGETS[endpoint]
+    if budget is UNBOUNDED:
+        return
+
+    for statement, calls in _repeated(log):
+        raise QueryBudgetExceeded(
+            f"{endpoint}: N+1 - the same statement ran {len(calls)} times with different parameters\n"
+            f"  {' '.join(statement.split())}\n"
+            f"  parameters: {calls[0][0]}, {calls[1][0]}, ...\n"
+            f"first issued at:\n{calls[0][1]}"
+        )
+    if len(log) > budget:
+        listing = '\n'.join(f"  {' '.join(statement.split())[:200]}" for statement, _, _ in log)
+        raise QueryBudgetExceeded(
+            f"{endpoint}: {len(log)} statements, budget is {budget}\n{listing}\n"
+            f"last issued at:\n{log[-1][2]}"
+        )
+
+def init_app(app, db):
+    if not app.config.get('QUERY_BUDGETS'):
+        return
+    app.extensions['query_budget'] = {'requests': []}
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _record)
+
+    @app.before_request
+    def start_query_log():
+        g.query_log = []
+
+    @app.after_request
+    def check_query_budget(response):
+        log = g.get('query_log')
+        if log is None or request.endpoint is None:
+            return response
+        method, endpoint = request.method, request.endpoint
+
+        def finish():
+            app.extensions['query_budget']['requests'].append((method, endpoint, len(log)))
+            check(endpoint, log)
+
+        if response.is_streamed:
+            # A streamed body keeps querying while it is sent; check once it is closed
+            response.call_on_close(finish)
+        else:
+            finish()
+        return response
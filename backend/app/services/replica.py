@@ -0,0 +1,103 @@
+import time
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from app.services.cache import LRUCache
+
+# Read-replica routing (DATABASE_REPLICA_URL, optional).
+# Views decorated with @read_only run their SELECTs on the 'replica' bind;
+# everything else, and every INSERT/UPDATE/DELETE, flush or SELECT ... FOR
+# UPDATE even inside such a view, goes to the primary. Once a request has
+# written, the rest of it reads from the primary too.
+#
+# Read-your-writes: after a user's successful write (any non-GET request),
+# their reads stay on the primary for REPLICA_STICKY_SECONDS. The window is
+# remembered in this process and also sent back as X-Read-Primary-Until
+# (epoch seconds); clients echo that header so the next request is pinned
+# whichever worker serves it. A client can only pin itself, and never for
+# longer than the window.
+
+REPLICA = 'replica'
+STICKY_HEADER = 'X-Read-Primary-Until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+def read_only(view):
+    """Mark a view whose reads may be served by the replica."""
+    view.replica_reads = True
+    return view
+
+def _reads_only(clause):
+    if clause is None or getattr(clause, '_for_update_arg', None) is not None:
+        return False
+    if getattr(clause, 'is_select', False):
+        return True
+    # Raw SQL (e.g. full-text search) counts when it is a plain SELECT
+    return bool(getattr(clause, 'is_text', False)) and clause.text.lstrip()[:6].upper() == 'SELECT'
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends the reads of replica-routed requests to the replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and g.get('db_route') == REPLICA:
+            engines = self._db.engines
+            if not self._flushing and REPLICA in engines and _reads_only(clause):
+                return engines[REPLICA]
+            # A write: keep this request on the primary from here on
+            g.db_route = None
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _sticky():
+    cache = current_app.extensions.get('replica_sticky')
+    if cache is None:
+        cache = LRUCache(max_size=100000, ttl=current_app.config['REPLICA_STICKY_SECONDS'])
+        current_app.extensions['replica_sticky'] = cache
+    return cache
+
+def _user_id():
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None # invalid or expired tokens are the view's business
+
+def _pinned_by_header():
+    try:
+        until = float(request.headers.get(STICKY_HEADER, 0))
+    except ValueError:
+        return False
+    now = time.time()
+    return now < until <= now + current_app.config['REPLICA_STICKY_SECONDS']
+
+def init_app(app):
+    app.config['SQLALCHEMY_BINDS'] = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    if app.config.get('DATABASE_REPLICA_URL'):
+        from app.services import pooling
+        app.config['SQLALCHEMY_BINDS'][REPLICA] = dict(
+            pooling.engine_options(app.config, app.config['DATABASE_REPLICA_URL']),
+            url=app.config['DATABASE_REPLICA_URL']
+        )
+
+    @app.before_request
+    def route_reads():
+        if REPLICA not in app.config['SQLALCHEMY_BINDS'] or request.method not in SAFE_METHODS:
+            return
+        view = app.view_functions.get(request.endpoint)
+        if not getattr(view, 'replica_reads', False) or _pinned_by_header():
+            return
+        user_id = _user_id()
+        if user_id is not None and _sticky().get(user_id):
+            return
+        g.db_route = REPLICA
+
+    @app.after_request
+    def remember_writes(response):
+        if REPLICA not in app.config['SQLALCHEMY_BINDS'] or request.method in SAFE_METHODS:
+            return response
+        if response.status_code >= 400:
+            return response
+        user_id = _user_id()
+        if user_id is not None:
+            _sticky().set(user_id, True)
+        window = app.config['REPLICA_STICKY_SECONDS']
+        response.headers[STICKY_HEADER] = f"{time.time() + window:.3f}"
+        return response
@@ -0,0 +1,142 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import bindparam, func, insert, select
+from app import db
+from app.models import Tenant, TenantRevenueEntry, TenantBalanceSnapshot
+
+# Tenant revenue is an insert-only ledger (tenant_revenue_entry).
+# Checkout only ever appends rows, so concurrent orders for the same shop never
+# wait on a shared tenant row. The compactor periodically folds entries into
+# tenant_balance_snapshot; readers add the not-yet-compacted tail on top.
+# Orders that become Cancelled/Expired are taken back out with negative entries
+# (reverse), so balances agree with the daily rollup.
+# Tenant.account_balance is only used as the opening balance of tenants that
+# have no snapshot yet.
+
+COMPACT_BATCH_SIZE = 5000
+
+def record(order_id, credits):
+    # credits: {tenant_id: amount}
+    if not credits:
+        return
+    now = datetime.utcnow()
+    db.session.execute(insert(TenantRevenueEntry), [
+        {'tenant_id': tenant_id, 'order_id': order_id, 'amount': amount, 'compacted': False, 'created_at': now}
+        for tenant_id, amount in credits.items()
+    ])
+
+def reverse(order_ids):
+    """Append entries cancelling whatever the given orders still credit; commits with the caller's transaction."""
+    if not order_ids:
+        return
+    net = db.session.execute(
+        select(TenantRevenueEntry.order_id, TenantRevenueEntry.tenant_id, func.sum(TenantRevenueEntry.amount))
+        .where(TenantRevenueEntry.order_id.in_(list(order_ids)))
+        .group_by(TenantRevenueEntry.order_id, TenantRevenueEntry.tenant_id)
+    ).all()
+    now = datetime.utcnow()
+    rows = [
+        {'tenant_id': tenant_id, 'order_id': order_id, 'amount': -amount, 'compacted': False, 'created_at': now}
+        for order_id, tenant_id, amount in net if amount
+    ]
+    if rows:
+        db.session.execute(insert(TenantRevenueEntry), rows)
+
+def balances_query(tenant_ids=None):
+    # Columns: tenant id, current balance (snapshot + uncompacted tail)
+    tail = select(
+        TenantRevenueEntry.tenant_id,
+        func.sum(TenantRevenueEntry.amount).label('amount')
+    ).where(TenantRevenueEntry.compacted == False)
+    if tenant_ids is not None:
+        tail = tail.where(TenantRevenueEntry.tenant_id.in_(tenant_ids))
+    tail = tail.group_by(TenantRevenueEntry.tenant_id).subquery()
+
+    balance = func.coalesce(TenantBalanceSnapshot.balance, Tenant.account_balance, 0) + func.coalesce(tail.c.amount, 0)
+    query = select(Tenant.id, balance.label('balance'))\
+        .outerjoin(TenantBalanceSnapshot, TenantBalanceSnapshot.tenant_id == Tenant.id)\
+        .outerjoin(tail, tail.c.tenant_id == Tenant.id)
+    if tenant_ids is not None:
+        query = query.where(Tenant.id.in_(tenant_ids))
+    return query
+
+def balances(tenant_ids=None):
+    return {tenant_id: float(balance) for tenant_id, balance in db.session.execute(balances_query(tenant_ids))}
+
+def balance_of(tenant):
+    return balances([tenant.id]).get(tenant.id, 0.0)
+
+def _claim_batch(batch_size):
+    # Mark a batch of entries compacted and return exactly the rows that were marked,
+    # so an entry committed late by a slow checkout is never skipped or folded twice
+    entry = TenantRevenueEntry.__table__
+    batch_ids = select(entry.c.id)\
+        .where(entry.c.compacted == False)\
+        .order_by(entry.c.id)\
+        .limit(batch_size)
+
+    if db.engine.dialect.update_returning:
+        return db.session.execute(
+            entry.update()
+            .where(entry.c.id.in_(batch_ids))
+            .where(entry.c.compacted == False)
+            .values(compacted=True)
+            .returning(entry.c.tenant_id, entry.c.amount)
+        ).all()
+
+    rows = db.session.execute(
+        select(entry.c.id, entry.c.tenant_id, entry.c.amount).where(entry.c.id.in_(batch_ids))
+    ).all()
+    if rows:
+        db.session.execute(entry.update().where(entry.c.id.in_([r.id for r in rows])).values(compacted=True))
+    return [(r.tenant_id, r.amount) for r in rows]
+
+def _fold(totals):
+    now = datetime.utcnow()
+    current = db.session.execute(
+        select(Tenant.id, Tenant.account_balance, TenantBalanceSnapshot.balance)
+        .outerjoin(TenantBalanceSnapshot, TenantBalanceSnapshot.tenant_id == Tenant.id)
+        .where(Tenant.id.in_(list(totals.keys())))
+    ).all()
+
+    updates = [
+        {'b_tenant_id': tenant_id, 'b_amount': totals[tenant_id]}
+        for tenant_id, _, snapshot in current if snapshot is not None
+    ]
+    inserts = [
+        {'tenant_id': tenant_id, 'balance': (opening or 0.0) + totals[tenant_id], 'updated_at': now}
+        for tenant_id, opening, snapshot in current if snapshot is None
+    ]
+
+    if updates:
+        snapshot_table = TenantBalanceSnapshot.__table__
+        db.session.execute(
+            snapshot_table.update()
+            .where(snapshot_table.c.tenant_id == bindparam('b_tenant_id'))
+            .values(balance=snapshot_table.c.balance + bindparam('b_amount'), updated_at=now),
+            updates
+        )
+    if inserts:
+        db.session.execute(insert(TenantBalanceSnapshot), inserts)
+
+def compact(batch_size=COMPACT_BATCH_SIZE):
+    """Fold uncompacted revenue entries into per-tenant snapshots.
+
+    Commits once per batch and returns the number of entries folded.
+    """
+    folded = 0
+    while True:
+        rows = _claim_batch(batch_size)
+        if not rows:
+            break
+
+        totals = defaultdict(float)
+        for tenant_id, amount in rows:
+            totals[tenant_id] += amount
+        _fold(totals)
+        db.session.commit()
+
+        folded += len(rows)
+        if len(rows) < batch_size:
+            break
+    return folded
@@ -0,0 +1,104 @@
+import random
+from collections import defaultdict
+from datetime import date, datetime
+from sqlalchemy import delete, func, select
+from app import db
+from app.models import Order, OrderItem, OrderRevenueDaily, Product
+from app.services.dialect import upsert_adding
+from app.services.inventory import RELEASE_STATUSES
+
+# Daily revenue rollup (order_revenue_daily) read by /admin/stats.
+# Checkout adds each order to its (day, tenant) rows and status changes into or
+# out of Cancelled/Expired take it back out or put it back, all in the caller's
+# transaction, so the dashboard reads O(days) rows instead of every order.
+# Like activity counters, each (day, tenant) is split over SLOTS rows picked at
+# random, so a popular shop's checkouts rarely wait on the same row lock;
+# readers sum the slots.
+# `flask backfill-revenue-rollup` rebuilds it from the orders table.
+
+BACKFILL_CHUNK_SIZE = 5000
+SLOTS = 8
+
+def counted(status):
+    return status not in RELEASE_STATUSES
+
+def _apply(totals, slot=None):
+    # totals: {(day, tenant_id): [revenue, order_count]}; slot None picks one at random
+    if not totals:
+        return
+    slot = random.randrange(SLOTS) if slot is None else slot
+    # Sorted so concurrent writers lock rollup rows in the same order
+    db.session.execute(
+        upsert_adding(OrderRevenueDaily.__table__, ['day', 'tenant_id', 'slot'], ['revenue', 'order_count']),
+        [
+            {'day': day, 'tenant_id': tenant_id, 'slot': slot, 'revenue': revenue, 'order_count': count}
+            for (day, tenant_id), (revenue, count) in sorted(totals.items())
+        ]
+    )
+
+def _shares_query():
+    # One row per (order, tenant): the tenant's share of the order
+    return select(Order.created_at, Product.tenant_id, func.sum(OrderItem.quantity * OrderItem.price_at_purchase))\
+        .join(OrderItem, OrderItem.order_id == Order.id)\
+        .join(Product, OrderItem.product_id == Product.id)\
+        .group_by(Order.id, Order.created_at, Product.tenant_id)
+
+def _fold(rows, totals, sign=1):
+    for created_at, tenant_id, amount in rows:
+        entry = totals[(created_at.date(), tenant_id)]
+        entry[0] += sign * (amount or 0.0)
+        entry[1] += sign
+    return totals
+
+def record_order(created_at, tenant_credits):
+    """Add a new order's per-tenant amounts to the rollup."""
+    day = created_at.date()
+    _apply({(day, tenant_id): [amount, 1] for tenant_id, amount in tenant_credits.items()})
+
+def status_changed(order_ids, old_status, new_status):
+    """Move orders in or out of the rollup when they cross into/out of Cancelled/Expired."""
+    if not order_ids or counted(old_status) == counted(new_status):
+        return
+    sign = 1 if counted(new_status) else -1
+    rows = db.session.execute(_shares_query().where(Order.id.in_(order_ids)))
+    _apply(_fold(rows, defaultdict(lambda: [0.0, 0]), sign))
+
+def backfill(chunk_size=BACKFILL_CHUNK_SIZE):
+    """Rebuild the rollup from every order. Returns the number of rollup rows written.
+
+    Runs in one transaction; orders placed while it runs may be missed, so run it
+    when checkout is quiet (e.g. right after deploying the migration).
+    """
+    query = _shares_query().where(Order.status.notin_(RELEASE_STATUSES))
+    rows = db.session.execute(query.execution_options(yield_per=chunk_size))
+    totals = _fold(rows, defaultdict(lambda: [0.0, 0]))
+
+    db.session.execute(delete(OrderRevenueDaily))
+    _apply(totals, slot=0)
+    db.session.commit()
+    return len(totals)
+
+def _month_start(today, months_back):
+    index = today.year * 12 + today.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+def monthly_revenue(months=12, today=None):
+    """Revenue per calendar month for the last `months` months, oldest first."""
+    today = today or datetime.utcnow().date()
+    first = _month_start(today, months - 1)
+    rows = db.session.execute(
+        select(OrderRevenueDaily.day, func.sum(OrderRevenueDaily.revenue))
+        .where(OrderRevenueDaily.day >= first)
+        .group_by(OrderRevenueDaily.day)
+    )
+
+    # Bucketed by (year, month) in Python, so no dialect-specific date formatting
+    totals = defaultdict(float)
+    for day, revenue in rows:
+        totals[(day.year, day.month)] += revenue or 0.0
+
+    series = []
+    for months_back in range(months - 1, -1, -1):
+        month = _month_start(today, months_back)
+        series.append({'name': month.strftime('%b %Y'), 'value': round(totals[(month.year, month.month)], 2)})
+    return series
@@ -0,0 +1,188 @@
+import base64
+import re
+from sqlalchemy import bindparam, text
+from app import db
+
+# Full-text product search (GET /customer/search).
+# Each product has one search document made of its name and description plus
+# its shop's name and category. On SQLite it lives in an FTS5 table keyed by
+# rowid = product id; on PostgreSQL in product_search with a weighted tsvector
+# and a GIN index. The search tables are kept out of the SQLAlchemy models
+# (and out of autogenerate); tenant product routes, catalog imports and shop
+# profile edits re-index the affected products in their own transaction.
+#
+# Every query term is a prefix match and all terms must match. Results are
+# ordered by a score where lower is better (bm25 on SQLite, -ts_rank on
+# PostgreSQL), then by product id, and paged with a (score, id) keyset cursor.
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_TERMS = 8
+
+class InvalidCursor(ValueError):
+    pass
+
+def _postgres():
+    return db.engine.name == 'postgresql'
+
+# --- schema -----------------------------------------------------------------
+
+SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS product_search USING fts5("
+    "name, description, shop_name, category, tokenize = 'unicode61 remove_diacritics 2')",
+]
+POSTGRES_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS product_search ("
+    "product_id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_product_search_document ON product_search USING GIN (document)",
+]
+
+def create_schema():
+    # For databases built with create_all() (benchmarks); migrations create the same objects
+    for statement in POSTGRES_SCHEMA if _postgres() else SQLITE_SCHEMA:
+        db.session.execute(text(statement))
+    db.session.commit()
+
+def drop_schema():
+    db.session.execute(text("DROP TABLE IF EXISTS product_search"))
+    db.session.commit()
+
+# --- indexing ---------------------------------------------------------------
+
+# Postgres document: name (A) > shop name (B) > category (C) > description (D)
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(p.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(t.shop_name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(t.category, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(p.description, '')), 'D')"
+)
+
+def _reindex(where, params, expanding=()):
+    # Rewrite the search documents of the products matching `where` (on alias p)
+    db.session.flush()
+    matching = f"SELECT p.id FROM product p WHERE {where}"
+    if _postgres():
+        statements = [
+            f"DELETE FROM product_search WHERE product_id IN ({matching})",
+            "INSERT INTO product_search (product_id, document) "
+            f"SELECT p.id, {POSTGRES_DOCUMENT} FROM product p JOIN tenant t ON t.id = p.tenant_id WHERE {where}",
+        ]
+    else:
+        statements = [
+            f"DELETE FROM product_search WHERE rowid IN ({matching})",
+            "INSERT INTO product_search (rowid, name, description, shop_name, category) "
+            "SELECT p.id, p.name, coalesce(p.description, ''), t.shop_name, coalesce(t.category, '') "
+            f"FROM product p JOIN tenant t ON t.id = p.tenant_id WHERE {where}",
+        ]
+    for statement in statements:
+        clause = text(statement)
+        if expanding:
+            clause = clause.bindparams(*[bindparam(name, expanding=True) for name in expanding])
+        db.session.execute(clause, params)
+
+def index_products(product_ids):
+    """Re-index products after they were created or edited."""
+    if product_ids:
+        _reindex("p.id IN :ids", {'ids': list(product_ids)}, expanding=('ids',))
+
+def index_skus(tenant_id, skus):
+    if skus:
+        _reindex("p.tenant_id = :tenant_id AND p.sku IN :skus",
+                 {'tenant_id': tenant_id, 'skus': list(skus)}, expanding=('skus',))
+
+def index_tenant(tenant_id):
+    """Re-index every product of a shop, e.g. after its name or category changed."""
+    _reindex("p.tenant_id = :tenant_id", {'tenant_id': tenant_id})
+
+def remove_products(product_ids):
+    if not product_ids:
+        return
+    key = 'product_id' if _postgres() else 'rowid'
+    db.session.execute(
+        text(f"DELETE FROM product_search WHERE {key} IN :ids").bindparams(bindparam('ids', expanding=True)),
+        {'ids': list(product_ids)}
+    )
+
+def reindex_all():
+    """Rebuild the whole index from the product table. Returns the number of documents."""
+    db.session.execute(text("DELETE FROM product_search"))
+    _reindex("1 = 1", {})
+    db.session.commit()
+    return db.session.execute(text("SELECT count(*) FROM product_search")).scalar()
+
+# --- querying ---------------------------------------------------------------
+
+def terms(query):
+    # Words only, so user input can never inject FTS5 / tsquery syntax
+    return re.findall(r'\w+', (query or '').lower())[:MAX_TERMS]
+
+def encode_cursor(score, product_id):
+    return base64.urlsafe_b64encode(f"{score!r}|{product_id}".encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        score, product_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return float(score), int(product_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(str(e))
+
+def search_query(words, category=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """The ranked search statement and its parameters (also used by the benchmark)."""
+    params = {'limit': limit}
+    if _postgres():
+        params['query'] = ' & '.join(f"{word}:*" for word in words)
+        # ts_rank is float4; as float8 its repr() in the cursor compares back exactly
+        score = "-ts_rank(s.document, to_tsquery('simple', :query))::float8"
+        source = "product_search s JOIN product p ON p.id = s.product_id"
+        match = "s.document @@ to_tsquery('simple', :query)"
+    else:
+        params['query'] = ' '.join(f'"{word}"*' for word in words)
+        score = "bm25(product_search, 10.0, 1.0, 5.0, 2.0)"
+        source = "product_search JOIN product p ON p.id = product_search.rowid"
+        match = "product_search MATCH :query"
+
+    where = [match, "t.is_approved"]
+    if category:
+        where.append("t.category = :category")
+        params['category'] = category
+    if cursor:
+        params['after_score'], params['after_id'] = decode_cursor(cursor)
+        where.append(f"({score} > :after_score OR ({score} = :after_score AND p.id > :after_id))")
+
+    sql = (
+        f"SELECT p.id, p.name, p.description, p.price, p.stock, p.image_url, p.tenant_id, "
+        f"t.shop_name, t.category, {score} AS score "
+        f"FROM {source} JOIN tenant t ON t.id = p.tenant_id "
+        f"WHERE {' AND '.join(where)} "
+        f"ORDER BY score, p.id LIMIT :limit"
+    )
+    return text(sql), params
+
+def search(query, category=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return (results, next_cursor) for one page of matching products, best first."""
+    words = terms(query)
+    if not words:
+        return [], None
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    statement, params = search_query(words, category, cursor, limit + 1)
+    rows = db.session.execute(statement, params).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    results = [
+        {
+            'id': row.id,
+            'name': row.name,
+            'description': row.description,
+            'price': row.price,
+            'stock': row.stock,
+            'image_url': row.image_url,
+            'tenant_id': row.tenant_id,
+            'shop_name': row.shop_name,
+            'category': row.category,
+        }
+        for row in rows
+    ]
+    next_cursor = encode_cursor(rows[-1].score, rows[-1].id) if has_more and rows else None
+    return results, next_cursor
@@ -0,0 +1,414 @@
+import csv
+import io
+import random
+import time
+from array import array
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate
+from sqlalchemy import DateTime, func, inspect, select, text
+from app import db
+from app.models import (
+    User, Tenant, CustomerProfile, Product, Order, OrderItem, Wishlist, Event, TenantBalanceSnapshot, UserRole
+)
+from app.services import activity, conditional, sales_rollup, search
+from app.services.checkout import tier_for
+from app.services.passwords import hash_password
+
+# Synthetic mall data for load tests and query tuning (`flask seed`).
+# The same seed, sizes and end date always produce the same rows. Traffic is
+# skewed the way a real mall's is: a few hot shops get most orders (Zipf),
+# some customers buy far more often than others, and orders follow the
+# clock - evenings, weekends, a year-end season and a Black Friday spike -
+# over the HISTORY_DAYS before the end date, growing over the year.
+#
+# Rows get explicit ids and are written in batches straight through the
+# DBAPI: executemany on SQLite, COPY on PostgreSQL, with the secondary indexes
+# dropped during the load and rebuilt after it. Only one batch is held in
+# memory, plus one float per product (prices) and one int per customer
+# (loyalty points). The derived tables (revenue rollup, hourly counters,
+# search index, balance snapshots) are rebuilt at the end. The database
+# must be empty: run `flask db upgrade` on a fresh one first.
+
+SCALES = {
+    'small': {'tenants': 50, 'products': 5_000, 'customers': 2_000, 'orders': 20_000, 'events': 50},
+    'medium': {'tenants': 500, 'products': 100_000, 'customers': 50_000, 'orders': 500_000, 'events': 300},
+    'large': {'tenants': 5_000, 'products': 1_000_000, 'customers': 500_000, 'orders': 10_000_000, 'events': 2_000},
+}
+SEED_BATCH_SIZE = 20_000
+# SQLite only, for the seeding connection: page cache (KiB) big enough for the
+# randomly ordered index inserts, and no fsync per batch (a crash means reseeding anyway)
+SQLITE_CACHE_KIB = 512 * 1024
+SQLITE_DEFAULTS = {'cache_size': -2000, 'synchronous': 'FULL'}
+HISTORY_DAYS = 365
+PASSWORD = 'password'
+
+# Zipf exponents: how strongly orders (and catalog size) concentrate on the top shops
+SHOP_SKEW = 1.1
+CATALOG_SKEW = 0.7
+WISHLIST_SHARE = 0.3
+
+CATEGORIES = ['Fashion', 'Electronics', 'Food', 'General']
+WORDS = {
+    'Fashion': (['Linen', 'Denim', 'Silk', 'Wool', 'Leather', 'Cotton'], ['Shirt', 'Jacket', 'Dress', 'Scarf', 'Boots', 'Bag']),
+    'Electronics': (['Wireless', 'Smart', 'Portable', 'Compact', 'Pro', 'Ultra'], ['Headphones', 'Speaker', 'Charger', 'Watch', 'Camera', 'Tablet']),
+    'Food': (['Spicy', 'Organic', 'Fresh', 'Roasted', 'Classic', 'Sweet'], ['Noodles', 'Coffee', 'Burger', 'Smoothie', 'Pastry', 'Salad']),
+    'General': (['Handmade', 'Scented', 'Ceramic', 'Wooden', 'Travel', 'Mini'], ['Candle', 'Mug', 'Notebook', 'Lamp', 'Planter', 'Toy']),
+}
+SHOP_WORDS = ['Urban', 'Royal', 'Golden', 'Blue', 'Corner', 'House', 'Studio', 'Market', 'Avenue', 'Express']
+EVENT_NAMES = ['Flash Sale', 'Live Music Night', 'Kids Workshop', 'Food Festival', 'Fashion Show', 'Book Signing']
+
+# Share of a day's orders per UTC hour: quiet nights, a lunch bump, an evening peak
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 9, 11, 13, 12, 10, 9, 9, 11, 14, 16, 15, 11, 6, 3]
+
+# Column order of the generated tuples
+COLUMNS = {
+    User: ['id', 'username', 'email', 'password_hash', 'role', 'created_at'],
+    Tenant: ['id', 'user_id', 'shop_name', 'category', 'shop_number', 'description', 'account_balance', 'is_approved'],
+    Product: ['id', 'tenant_id', 'sku', 'name', 'description', 'price', 'stock', 'created_at'],
+    Order: ['id', 'user_id', 'total_amount', 'status', 'delivery_address', 'contact_number', 'delivery_time', 'created_at'],
+    OrderItem: ['id', 'order_id', 'product_id', 'quantity', 'price_at_purchase'],
+    CustomerProfile: ['id', 'user_id', 'loyalty_points', 'tier', 'joined_at'],
+    Wishlist: ['id', 'user_id', 'product_id'],
+    Event: ['id', 'name', 'description', 'date', 'tenant_id'],
+    TenantBalanceSnapshot: ['tenant_id', 'balance', 'updated_at'],
+}
+
+def _cum_weights(weights):
+    return list(accumulate(weights))
+
+def _chooser(values, weights):
+    # random.choices() for one value rebuilds its tables every call; this is the hot path
+    cum = _cum_weights(weights)
+    return lambda rng: values[bisect(cum, rng.random() * cum[-1])]
+
+pick_hour = _chooser(range(24), HOUR_WEIGHTS)
+pick_item_count = _chooser((1, 2, 3, 4), (50, 28, 15, 7))
+pick_quantity = _chooser((1, 2, 3), (80, 15, 5))
+pick_recent_status = _chooser(('Pending', 'Completed', 'Cancelled'), (60, 35, 5))
+pick_past_status = _chooser(('Completed', 'Cancelled', 'Expired'), (90, 7, 3))
+
+def _zipf(n, skew):
+    return [1 / (rank + 1) ** skew for rank in range(n)]
+
+def _day_weight(day, position):
+    # position: 0..1 through the history, for year-over-year growth
+    weight = 0.6 + 0.4 * position
+    if day.weekday() >= 5:
+        weight *= 1.4
+    if (day.month, day.day) >= (11, 20):
+        weight *= 2.5
+    if day.month == 11 and day.weekday() == 4 and day.day >= 23:
+        weight *= 4 # Black Friday
+    if day.month == 7 and day.day <= 7:
+        weight *= 1.8 # mid-year sale
+    return weight
+
+def _allocate(rng, total, weights, minimum=0):
+    # Split `total` over the weights; the rounding remainder goes to random (weighted) slots
+    scale = (total - minimum * len(weights)) / sum(weights)
+    counts = [minimum + int(weight * scale) for weight in weights]
+    for index in rng.choices(range(len(weights)), weights=weights, k=total - sum(counts)):
+        counts[index] += 1
+    return counts
+
+class _Writer:
+    """Batched inserts of plain tuples, through COPY on PostgreSQL."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.postgres = db.engine.name == 'postgresql'
+
+    def load(self, table, columns, rows):
+        """Insert an iterable of tuples (in `columns` order); returns the row count."""
+        written, batch = 0, []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                written += self.flush(table, columns, batch)
+        return written + self.flush(table, columns, batch)
+
+    def flush(self, table, columns, batch):
+        """Write and empty `batch`; returns how many rows it held."""
+        if not batch:
+            return 0
+        # The session's own connection, so rows commit with db.session.commit()
+        cursor = db.session.connection().connection.dbapi_connection.cursor()
+        names = ', '.join(f'"{column}"' for column in columns)
+        try:
+            if self.postgres:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                sql = f'COPY "{table.name}" ({names}) FROM STDIN WITH (FORMAT csv)'
+                if hasattr(cursor, 'copy_expert'): # psycopg2
+                    cursor.copy_expert(sql, buffer)
+                else: # psycopg 3
+                    with cursor.copy(sql) as copy:
+                        copy.write(buffer.getvalue())
+            else:
+                cursor.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_KIB}")
+                # DateTime columns in the text layout SQLAlchemy itself stores (compared as text)
+                dates = [i for i, column in enumerate(columns) if isinstance(table.c[column].type, DateTime)]
+                rows = batch
+                if dates:
+                    rows = [list(row) for row in batch]
+                    for row in rows:
+                        for i in dates:
+                            if row[i] is not None:
+                                row[i] = row[i].isoformat(' ', 'microseconds')
+                placeholders = ', '.join('?' * len(columns))
+                cursor.executemany(f'INSERT INTO "{table.name}" ({names}) VALUES ({placeholders})', rows)
+        finally:
+            cursor.close()
+        count = len(batch)
+        batch.clear()
+        return count
+
+class Generator:
+    """One deterministic dataset; run() it once against an empty database."""
+
+    def __init__(self, tenants, products, customers, orders, events, seed=0, end_date=None,
+                 batch_size=SEED_BATCH_SIZE, progress=None):
+        if tenants < 1 or customers < 1 or products < tenants:
+            raise ValueError("need at least one tenant and customer, and a product per tenant")
+        self.sizes = {'tenants': tenants, 'products': products, 'customers': customers,
+                      'orders': orders, 'events': events}
+        self.rng = random.Random(seed)
+        end_date = end_date or datetime.utcnow().date()
+        self.end = datetime(end_date.year, end_date.month, end_date.day)
+        self.writer = _Writer(batch_size)
+        self.progress = progress or (lambda table, rows, seconds: None)
+
+        # Ids: 1 = admin, then one owner per tenant, then the customers
+        self.first_customer = tenants + 2
+        self.customer_points = array('q', [0]) * customers
+        self.balances = [0.0] * (tenants + 1)
+
+    def _timed(self, model, rows):
+        started = time.perf_counter()
+        count = self.writer.load(model.__table__, COLUMNS[model], rows)
+        db.session.commit()
+        self.progress(model.__tablename__, count, time.perf_counter() - started)
+        return count
+
+    def _load_orders(self):
+        # Items are generated with their orders and written right after each orders batch
+        started, orders, items = time.perf_counter(), [], []
+        written = [0, 0]
+
+        def flush():
+            written[0] += self.writer.flush(Order.__table__, COLUMNS[Order], orders)
+            written[1] += self.writer.flush(OrderItem.__table__, COLUMNS[OrderItem], items)
+            db.session.commit()
+
+        for row in self._orders(items):
+            orders.append(row)
+            if len(orders) >= self.writer.batch_size:
+                flush()
+        flush()
+        seconds = time.perf_counter() - started
+        self.progress('order', written[0], seconds)
+        self.progress('order_item', written[1], seconds)
+        return written
+
+    # --- rows -------------------------------------------------------------
+
+    def _users(self, password_hash):
+        rng, joined_from = self.rng, self.end - timedelta(days=2 * HISTORY_DAYS)
+        yield (1, 'admin', 'admin@example.com', password_hash, UserRole.ADMIN.value, joined_from)
+        for i in range(1, self.sizes['tenants'] + 1):
+            yield (i + 1, f'owner{i}', f'owner{i}@example.com', password_hash, UserRole.TENANT.value,
+                   joined_from + timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400)))
+        for i in range(1, self.sizes['customers'] + 1):
+            yield (self.first_customer + i - 1, f'customer{i}', f'customer{i}@example.com', password_hash,
+                   UserRole.CUSTOMER.value, joined_from + timedelta(seconds=rng.randrange(2 * HISTORY_DAYS * 86400)))
+
+    def _tenants(self):
+        rng = self.rng
+        for tenant_id in range(1, self.sizes['tenants'] + 1):
+            category = self.categories[tenant_id]
+            name = f"{rng.choice(SHOP_WORDS)} {WORDS[category][1][tenant_id % 6]} {tenant_id}"
+            yield (tenant_id, tenant_id + 1, name, category, f"{rng.choice('GFS')}-{tenant_id:04d}",
+                   f"{category} shop on level {rng.randint(0, 3)}", 0.0, rng.random() < 0.95)
+
+    def _products(self):
+        rng = self.rng
+        for tenant_id in range(1, self.sizes['tenants'] + 1):
+            adjectives, nouns = WORDS[self.categories[tenant_id]]
+            start = self.catalog_start[tenant_id]
+            for product_id in range(start, start + self.catalog_size[tenant_id]):
+                price = self.prices[product_id]
+                stock = 0 if rng.random() < 0.05 else rng.randint(1, 500)
+                yield (product_id, tenant_id, f'SKU-{product_id}',
+                       f"{rng.choice(adjectives)} {rng.choice(nouns)} {product_id}",
+                       f"{rng.choice(adjectives)} {rng.choice(nouns).lower()} from shop {tenant_id}",
+                       price, stock, self.end - timedelta(days=rng.randrange(2 * HISTORY_DAYS)))
+
+    def _pick_product(self, tenant_id):
+        # Within a shop a few best sellers dominate too
+        return self.catalog_start[tenant_id] + int(self.catalog_size[tenant_id] * self.rng.random() ** 3)
+
+    def _orders(self, items):
+        """Yield order rows day by day (ids ascend with created_at) and append their items to `items`."""
+        rng, days = self.rng, HISTORY_DAYS
+        first_day = self.end - timedelta(days=days)
+        day_weights = [_day_weight(first_day + timedelta(days=i), i / days) for i in range(days)]
+        per_day = _allocate(rng, self.sizes['orders'], day_weights)
+        customers = self.sizes['customers']
+        order_id = item_id = 0
+
+        for offset, count in enumerate(per_day):
+            day = first_day + timedelta(days=offset)
+            recent = days - offset <= 2
+            moments = sorted(
+                day + timedelta(hours=pick_hour(rng), seconds=int(rng.random() * 3600))
+                for _ in range(count)
+            )
+            shops = rng.choices(self.shop_ids, cum_weights=self.shop_cum, k=count)
+            for created_at, tenant_id in zip(moments, shops):
+                order_id += 1
+                customer = int(customers * rng.random() ** 2) # heavy buyers first
+                products = {self._pick_product(tenant_id)
+                            for _ in range(pick_item_count(rng))}
+                total = 0.0
+                for product_id in products:
+                    item_id += 1
+                    quantity = pick_quantity(rng)
+                    price = self.prices[product_id]
+                    total += quantity * price
+                    items.append((item_id, order_id, product_id, quantity, price))
+                total = round(total, 2)
+
+                status = pick_recent_status(rng) if recent else pick_past_status(rng)
+                if sales_rollup.counted(status):
+                    self.balances[tenant_id] += total
+                    self.customer_points[customer] += int(total)
+                yield (order_id, self.first_customer + customer, total, status, f"{int(rng.random() * 999) + 1} Mall Road",
+                       f"+1-555-{int(rng.random() * 10_000):04d}", created_at + timedelta(hours=int(rng.random() * 48) + 1),
+                       created_at)
+
+    def _customer_profiles(self):
+        rng = self.rng
+        for i in range(self.sizes['customers']):
+            points = self.customer_points[i]
+            yield (i + 1, self.first_customer + i, points, tier_for(points),
+                   self.end - timedelta(days=rng.randrange(2 * HISTORY_DAYS)))
+
+    def _wishlists(self):
+        rng, row_id = self.rng, 0
+        for i in range(self.sizes['customers']):
+            if rng.random() >= WISHLIST_SHARE:
+                continue
+            shops = rng.choices(self.shop_ids, cum_weights=self.shop_cum, k=rng.randint(1, 12))
+            for product_id in sorted({self._pick_product(tenant_id) for tenant_id in shops}):
+                row_id += 1
+                yield (row_id, self.first_customer + i, product_id)
+
+    def _events(self):
+        rng = self.rng
+        for event_id in range(1, self.sizes['events'] + 1):
+            # Most events belong to popular shops; a fifth are mall-wide
+            tenant_id = None if rng.random() < 0.2 else rng.choices(self.shop_ids, cum_weights=self.shop_cum)[0]
+            name = rng.choice(EVENT_NAMES)
+            yield (event_id, f"{name} #{event_id}", f"{name} at the mall",
+                   self.end + timedelta(days=rng.randint(-60, 90), hours=rng.randint(10, 20)), tenant_id)
+
+    # --- loading ----------------------------------------------------------
+
+    def _plan(self):
+        rng, tenants = self.rng, self.sizes['tenants']
+        self.categories = [None] + [rng.choice(CATEGORIES) for _ in range(tenants)]
+
+        # Popularity ranks are shuffled so the hot shops aren't simply the lowest ids
+        ranked = list(range(1, tenants + 1))
+        rng.shuffle(ranked)
+        self.shop_ids, self.shop_cum = ranked, _cum_weights(_zipf(tenants, SHOP_SKEW))
+
+        sizes = _allocate(rng, self.sizes['products'], _zipf(tenants, CATALOG_SKEW), minimum=1)
+        self.catalog_size, self.catalog_start = [0] * (tenants + 1), [0] * (tenants + 1)
+        for tenant_id, size in zip(ranked, sizes):
+            self.catalog_size[tenant_id] = size
+        next_id = 1
+        for tenant_id in range(1, tenants + 1):
+            self.catalog_start[tenant_id] = next_id
+            next_id += self.catalog_size[tenant_id]
+        self.prices = array('d', [0.0]) + array('d', (
+            round(min(rng.lognormvariate(3.2, 0.9), 2000), 2) for _ in range(self.sizes['products'])
+        ))
+
+    def run(self):
+        """Generate and load everything. Returns {table: rows}."""
+        if db.session.execute(select(func.count(User.id))).scalar():
+            raise ValueError("the database already has users; seed a fresh database")
+        self._plan()
+        if not self.writer.postgres:
+            _sqlite_pragmas({'synchronous': 'OFF'}) # outside a transaction, before the first write
+        indexes = self._drop_indexes()
+        written = {
+            'user': self._timed(User, self._users(hash_password(PASSWORD))),
+            'tenant': self._timed(Tenant, self._tenants()),
+            'product': self._timed(Product, self._products()),
+        }
+        written['order'], written['order_item'] = self._load_orders()
+        written['customer_profile'] = self._timed(CustomerProfile, self._customer_profiles())
+        written['wishlist'] = self._timed(Wishlist, self._wishlists())
+        written['event'] = self._timed(Event, self._events())
+        written['tenant_balance_snapshot'] = self._timed(TenantBalanceSnapshot, (
+            (tenant_id, round(self.balances[tenant_id], 2), self.end) for tenant_id in range(1, self.sizes['tenants'] + 1)
+        ))
+        self._create_indexes(indexes)
+
+        if self.writer.postgres:
+            _reset_sequences(model for model in COLUMNS if model is not TenantBalanceSnapshot)
+        self._derive('order_revenue_daily', sales_rollup.backfill)
+        self._derive('activity_counter', activity.backfill_orders)
+        self._derive('product_search', search.reindex_all)
+        # Processes that cached the empty catalog must not keep serving it
+        conditional.bump(conditional.SHOPS, conditional.EVENTS)
+        db.session.commit()
+        if not self.writer.postgres:
+            _sqlite_pragmas(SQLITE_DEFAULTS)
+        return written
+
+    def _drop_indexes(self):
+        # Secondary indexes are built once after the load: one sorted pass instead of
+        # millions of inserts at random places in trees that outgrow the cache
+        connection = db.session.connection()
+        indexes = []
+        for model in COLUMNS:
+            existing = {index['name'] for index in inspect(connection).get_indexes(model.__tablename__)}
+            indexes += [index for index in model.__table__.indexes if index.name in existing]
+        for index in indexes:
+            index.drop(connection)
+        db.session.commit()
+        return indexes
+
+    def _create_indexes(self, indexes):
+        started = time.perf_counter()
+        for index in indexes:
+            index.create(db.session.connection())
+        db.session.commit()
+        self.progress('(indexes)', len(indexes), time.perf_counter() - started)
+
+    def _derive(self, table, rebuild):
+        started = time.perf_counter()
+        count = rebuild()
+        self.progress(table, count, time.perf_counter() - started)
+
+def _sqlite_pragmas(settings):
+    for pragma, value in settings.items():
+        db.session.execute(text(f"PRAGMA {pragma} = {value}"))
+
+def _reset_sequences(models):
+    # Explicit ids don't advance PostgreSQL sequences; move them past the loaded rows
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), coalesce((SELECT max(id) FROM \"{table}\"), 0) + 1, false)"
+        ))
+    db.session.commit()
+
+def seed(tenants, products, customers, orders, events, **options):
+    """Load a synthetic dataset into an empty database. Returns {table: rows}."""
+    return Generator(tenants, products, customers, orders, events, **options).run()
@@ -0,0 +1,100 @@
+import json
+from datetime import date
+from flask import Response
+from sqlalchemy import func, select
+from app import db
+from app.models import Event, Order, OrderItem, Product, Tenant
+
+try:
+    import orjson
+except ImportError: # optional: plain json is a slower fallback
+    orjson = None
+
+# Column-projection serializers for the list endpoints.
+# Each query selects exactly the columns of the public payload, each with an
+# explicit .label() of its JSON key (so renaming a model attribute can't change
+# the API), and rows become dicts directly, so no ORM instance (or lazy
+# relationship) is ever loaded. The result is encoded with orjson when it is
+# installed. Output matches the models' to_dict(): datetimes are ISO 8601
+# strings; only key order may differ.
+
+PRODUCT_COLUMNS = (
+    Product.id.label('id'), Product.name.label('name'), Product.description.label('description'),
+    Product.price.label('price'), Product.stock.label('stock'), Product.image_url.label('image_url'),
+    Product.tenant_id.label('tenant_id'), Product.sku.label('sku')
+)
+TENANT_COLUMNS = (
+    Tenant.id.label('id'), Tenant.shop_name.label('shop_name'), Tenant.category.label('category'),
+    Tenant.shop_number.label('shop_number'), Tenant.image_url.label('image_url'),
+    Tenant.description.label('description'), Tenant.is_approved.label('is_approved')
+)
+EVENT_COLUMNS = (
+    Event.id.label('id'), Event.name.label('name'), Event.description.label('description'),
+    Event.date.label('date'), Event.tenant_id.label('tenant_id'), Event.image_url.label('image_url')
+)
+
+def _item_count():
+    # Correlated count served by ix_order_item_order_id, instead of loading Order.items
+    return select(func.count(OrderItem.id))\
+        .where(OrderItem.order_id == Order.id)\
+        .scalar_subquery()\
+        .label('item_count')
+
+ORDER_COLUMNS = (
+    Order.id.label('id'), Order.total_amount.label('total_amount'), Order.status.label('status'),
+    Order.created_at.label('created_at'), Order.delivery_address.label('delivery_address'),
+    Order.contact_number.label('contact_number'), Order.delivery_time.label('delivery_time')
+)
+
+# --- encoding ---------------------------------------------------------------
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def dumps(payload):
+    """Encode to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        # Naive datetimes come out exactly like datetime.isoformat()
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_default, separators=(',', ':')).encode()
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+def rows(statement):
+    result = db.session.execute(statement)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+# --- queries ----------------------------------------------------------------
+
+def products_query(tenant_id):
+    return select(*PRODUCT_COLUMNS).where(Product.tenant_id == tenant_id)
+
+def products(tenant_id):
+    return rows(products_query(tenant_id))
+
+def shops_query(approved_only=True):
+    query = select(*TENANT_COLUMNS)
+    return query.where(Tenant.is_approved == True) if approved_only else query
+
+def shops(approved_only=True):
+    return rows(shops_query(approved_only))
+
+def shop(tenant_id):
+    found = rows(select(*TENANT_COLUMNS).where(Tenant.id == tenant_id))
+    return found[0] if found else None
+
+def orders_query(user_id):
+    return select(*ORDER_COLUMNS, _item_count())\
+        .where(Order.user_id == user_id)\
+        .order_by(Order.created_at.desc())
+
+def orders(user_id):
+    return rows(orders_query(user_id))
+
+def events(statement):
+    """Rows of an Event query (e.g. event_listing.upcoming_query()) as dicts."""
+    return rows(statement.with_only_columns(*EVENT_COLUMNS))
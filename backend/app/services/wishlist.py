@@ -0,0 +1,64 @@
+from sqlalchemy import delete, literal, select
+from app import db
+from app.models import Product, Wishlist
+from app.services.dialect import insert_ignoring_conflicts
+from app.services.serializers import PRODUCT_COLUMNS, rows
+
+# Customer wishlist (GET/POST/DELETE /customer/wishlist).
+# Reads are one join of wishlist and product. Writes take one product id or
+# a batch and are single statements: adds are INSERT ... SELECT ... ON
+# CONFLICT DO NOTHING against uq_wishlist_user_id_product_id, so duplicates
+# and unknown products are skipped without probing first; removes are one
+# DELETE ... IN.
+
+MAX_BATCH = 500
+# product.id is a 32-bit INTEGER on PostgreSQL; larger values can't match a row
+MAX_PRODUCT_ID = 2**31 - 1
+# Compact mode for refreshing prices and stock of a wishlist the client already has
+AVAILABILITY_COLUMNS = (Product.id.label('id'), Product.price.label('price'), Product.stock.label('stock'))
+
+def product_ids(data):
+    """The product ids of a write request ({"product_id": 1} or {"product_ids": [1, 2]}), deduplicated."""
+    if not isinstance(data, dict):
+        raise ValueError("a JSON object is required")
+    if 'product_ids' in data:
+        raw = data['product_ids']
+    else:
+        raw = [data['product_id']] if data.get('product_id') else []
+    if not isinstance(raw, list) or not raw or len(raw) > MAX_BATCH:
+        raise ValueError(f"product_id or a list of 1-{MAX_BATCH} product_ids required")
+    ids = []
+    for value in raw:
+        if isinstance(value, str) and value.isascii() and value.isdecimal() and len(value) <= 10:
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= MAX_PRODUCT_ID:
+            raise ValueError("product ids must be positive integers")
+        ids.append(value)
+    return list(dict.fromkeys(ids))
+
+def items_query(user_id, columns=PRODUCT_COLUMNS):
+    # In the order the products were added
+    return select(*columns)\
+        .join(Wishlist, Wishlist.product_id == Product.id)\
+        .where(Wishlist.user_id == user_id)\
+        .order_by(Wishlist.id)
+
+def items(user_id):
+    return rows(items_query(user_id))
+
+def availability(user_id):
+    return rows(items_query(user_id, AVAILABILITY_COLUMNS))
+
+def add(user_id, ids):
+    """Add existing products not yet on the wishlist; returns how many rows were inserted."""
+    existing = select(literal(user_id), Product.id).where(Product.id.in_(ids)).order_by(Product.id)
+    result = db.session.execute(
+        insert_ignoring_conflicts(Wishlist.__table__).from_select(['user_id', 'product_id'], existing)
+    )
+    return result.rowcount
+
+def remove(user_id, ids):
+    result = db.session.execute(
+        delete(Wishlist).where(Wishlist.user_id == user_id).where(Wishlist.product_id.in_(ids))
+    )
+    return result.rowcount
@@ -0,0 +1,61 @@
+"""Checks that POST /customer/orders issues a fixed number of statements.
+
+Places orders with growing basket sizes and fails if the statement count
+changes with the number of lines.
+
+    python benchmarks/checkout_queries.py
+"""
+import sys
+from support import make_app, auth_headers, count_queries
+from app import db
+from app.models import User, Tenant, Product, CustomerProfile, UserRole
+
+BASKET_SIZES = [1, 5, 30, 100]
+
+def seed(app):
+    with app.app_context():
+        customer = User(username='shopper', email='shopper@example.com', role=UserRole.CUSTOMER.value)
+        db.session.add(customer)
+        db.session.flush()
+        db.session.add(CustomerProfile(user_id=customer.id, loyalty_points=0))
+
+        tenants = []
+        for i in range(10):
+            owner = User(username=f'owner{i}', email=f'owner{i}@example.com', role=UserRole.TENANT.value)
+            db.session.add(owner)
+            db.session.flush()
+            tenant = Tenant(user_id=owner.id, shop_name=f'Shop {i}', category='General', account_balance=0.0, is_approved=True)
+            db.session.add(tenant)
+            tenants.append(tenant)
+        db.session.flush()
+
+        for i in range(max(BASKET_SIZES)):
+            db.session.add(Product(tenant_id=tenants[i % len(tenants)].id, name=f'Product {i}', price=10.0 + i, stock=1000))
+        db.session.commit()
+
+        product_ids = [p.id for p in Product.query.order_by(Product.id).all()]
+        return customer.id, product_ids
+
+def main():
+    app = make_app()
+    user_id, product_ids = seed(app)
+    client = app.test_client()
+
+    counts = {}
+    with app.app_context():
+        headers = auth_headers(user_id)
+        for size in BASKET_SIZES:
+            basket = [{'id': pid, 'quantity': 2} for pid in product_ids[:size]]
+            with count_queries() as statements:
+                response = client.post('/customer/orders', json={'items': basket}, headers=headers)
+            assert response.status_code == 201, response.get_json()
+            counts[size] = len(statements)
+            print(f"basket={size:>4} lines  statements={counts[size]}")
+
+    if len(set(counts.values())) != 1:
+        print("FAIL: statement count grows with basket size")
+        sys.exit(1)
+    print("OK: statement count is constant")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,443 @@
+"""HTTP load test of the app as deployed: gunicorn (or run.py) on a seeded database.
+
+Seeds a throwaway SQLite database with `flask seed` (or uses --database-url,
+already migrated and seeded), starts the server, and runs virtual users for
+--duration seconds after a --warmup. Each user pauses about --think-ms
+between requests, like a person clicking, and picks each action from --mix:
+
+    browse    anonymous shoppers on /customer/shops*, /customer/search and /events/
+              (sending If-None-Match like a browser, so 304s count too)
+    checkout  signed-in customers opening a shop and ordering from it
+    tenant    shop owners polling /tenant/orders
+    admin     admins on /admin/stats
+
+Prints throughput and p50/p95/p99 per endpoint, plus the server's own time
+per route from /metrics, and writes them as JSON (--output). Compares with
+the stored baseline (--baseline, default benchmarks/load_baseline.json) when
+it was recorded with the same settings, and exits 1 if any endpoint's p50,
+p95 (given enough requests), server time or throughput regressed beyond
+--tolerance, or if any request failed. --save-baseline stores this run.
+
+    python benchmarks/load_test.py [--users 4] [--think-ms 100] [--duration 30] [--server gunicorn --workers 2]
+        [--mix browse=70,checkout=10,tenant=15,admin=5] [--scale small] [--output report.json]
+
+Keep the server below saturation (users at most about 2x workers, with think
+time): once requests queue, every endpoint shows the same queueing delay and
+a slower endpoint no longer stands out. The run warns when the server was
+busy for most of the measured time. The load generator shares the machine
+with the server: only compare runs from the same machine. Data, user mix and
+request choices are seeded, so two runs issue the same kind of traffic.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND, 'benchmarks', 'load_baseline.json')
+DEFAULT_MIX = 'browse=70,checkout=10,tenant=15,admin=5'
+SEED_END_DATE = '2026-01-31'
+SEARCH_WORDS = ['linen', 'wireless', 'coffee', 'candle', 'jacket', 'speaker', 'organic', 'ceramic']
+# Differences below this are noise on a shared machine, whatever the percentage
+NOISE_FLOOR_MS = 2.0
+# p95 of fewer requests than this swings too much between runs to gate on
+MIN_P95_REQUESTS = 200
+# Server busy (summed request time / workers) above this share of the run means queueing
+SATURATED = 0.7
+# Settings that must match for a baseline comparison to mean anything
+COMPARABLE = ('server', 'workers', 'users', 'duration', 'mix', 'scale', 'think_ms')
+
+# --- server -------------------------------------------------------------------
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def flask_cli(env, *args):
+    result = subprocess.run([sys.executable, '-m', 'flask', '--app', 'run', *args], cwd=BACKEND, env=env,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"flask {' '.join(args)} failed:\n{result.stdout}{result.stderr}")
+
+def seeded_database(env, scale):
+    fd, path = tempfile.mkstemp(prefix='queens_load_', suffix='.db')
+    os.close(fd)
+    env = dict(env, DATABASE_URL='sqlite:///' + path)
+    print(f"Seeding {path} ({scale})")
+    flask_cli(env, 'db', 'upgrade')
+    flask_cli(env, 'seed', '--scale', scale, '--seed', '0', '--end-date', SEED_END_DATE)
+    return path
+
+def start_server(args, env, port, log):
+    if args.server == 'gunicorn':
+        # cwd=backend so gunicorn.conf.py (warm-up, multiprocess metrics) is picked up
+        command = [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers),
+                   '--bind', f'127.0.0.1:{port}', 'run:app']
+    else:
+        command = [sys.executable, '-m', 'flask', '--app', 'run', 'run', '--port', str(port),
+                   '--no-reload', '--no-debugger', '--with-threads']
+    server = subprocess.Popen(command, cwd=BACKEND, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with {server.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/')
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError("server did not answer within 60s")
+
+# --- virtual users ------------------------------------------------------------
+
+class Client:
+    """One keep-alive connection; records (endpoint, seconds, status) while measuring."""
+
+    def __init__(self, port, clock, samples):
+        self.port, self.clock, self.samples = port, clock, samples
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        self.headers = {}
+        self.etags = {}
+
+    def call(self, method, path, endpoint, body=None, conditional=False):
+        headers = dict(self.headers)
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if conditional and path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+
+        started = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # A dropped connection is a failed request; reconnect for the next one
+            self.conn.close()
+            data, status, response = b'', 0, None
+        elapsed = time.perf_counter() - started
+
+        if self.clock is not None and self.clock.measuring():
+            self.samples.append((f"{method} {endpoint}", elapsed, status))
+        if response is not None and response.getheader('ETag'):
+            self.etags[path] = response.getheader('ETag')
+        return status, (json.loads(data) if data and status in (200, 201) else None)
+
+    def login(self, username):
+        """Authorization headers for `username`."""
+        for _ in range(20):
+            status, body = self.call('POST', '/auth/login', '/auth/login', {'username': username, 'password': 'password'})
+            if status == 200:
+                return {'Authorization': f"Bearer {body['access_token']}"}
+            time.sleep(0.5) # 429 while the hashing pool is saturated
+        raise RuntimeError(f"could not sign in as {username}")
+
+def pick_shop(rng, shops):
+    # The catalog lists shops in a stable order; weight the front like popular shops
+    return shops[min(int(len(shops) * rng.random() ** 3), len(shops) - 1)]
+
+def browse(client, rng, shops):
+    action = rng.random()
+    if action < 0.25:
+        client.call('GET', '/customer/shops', '/customer/shops', conditional=True)
+    elif action < 0.5:
+        shop = pick_shop(rng, shops)
+        client.call('GET', f'/customer/shops/{shop}', '/customer/shops/<id>', conditional=True)
+    elif action < 0.8:
+        shop = pick_shop(rng, shops)
+        client.call('GET', f'/customer/shops/{shop}/products', '/customer/shops/<id>/products', conditional=True)
+    elif action < 0.9:
+        client.call('GET', f'/customer/search?q={rng.choice(SEARCH_WORDS)}', '/customer/search')
+    else:
+        client.call('GET', '/events/', '/events/', conditional=True)
+
+def checkout(client, rng, shops):
+    shop = pick_shop(rng, shops)
+    status, products = client.call('GET', f'/customer/shops/{shop}/products', '/customer/shops/<id>/products')
+    in_stock = [product['id'] for product in products or [] if product['stock'] > 0]
+    if not in_stock:
+        return
+    basket = rng.sample(in_stock, min(len(in_stock), rng.randint(1, 3)))
+    client.call('POST', '/customer/orders', '/customer/orders', {'items': [{'id': pid, 'quantity': 1} for pid in basket]})
+
+def tenant(client, rng, shops):
+    client.call('GET', '/tenant/orders', '/tenant/orders')
+
+def admin(client, rng, shops):
+    client.call('GET', '/admin/stats', '/admin/stats')
+
+SCENARIOS = {'browse': browse, 'checkout': checkout, 'tenant': tenant, 'admin': admin}
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight)
+    return mix
+
+
+class Clock:
+    def __init__(self, warmup, duration):
+        self.start = time.monotonic() + warmup
+        self.stop = self.start + duration
+
+    def measuring(self):
+        return self.start <= time.monotonic() < self.stop
+
+    def running(self):
+        return time.monotonic() < self.stop
+
+def run_users(args, port, shops, owners, on_measure):
+    mix = {name: weight for name, weight in parse_mix(args.mix).items() if weight > 0}
+    samples = [] # list.append is atomic; one list for every thread
+    clocks = []
+    # Once every user has signed in, the warm-up starts for all of them at once
+    ready = threading.Barrier(args.users + 1, action=lambda: clocks.append(Clock(args.warmup, args.duration)))
+
+    def user(index):
+        # Every user acts in every scenario, so the mix holds however few users there are
+        rng = random.Random(index)
+        client = Client(port, None, samples)
+        headers = {'browse': {}}
+        if 'checkout' in mix:
+            headers['checkout'] = client.login(f'customer{index + 1}')
+        if 'tenant' in mix:
+            headers['tenant'] = client.login(f'owner{owners[index % len(owners)]}')
+        if 'admin' in mix:
+            headers['admin'] = client.login('admin')
+        ready.wait()
+        client.clock = clocks[0]
+        while client.clock.running():
+            scenario = rng.choices(list(mix), weights=list(mix.values()))[0]
+            client.headers = headers[scenario]
+            SCENARIOS[scenario](client, rng, shops)
+            if args.think_ms:
+                time.sleep(rng.expovariate(1000 / args.think_ms))
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(args.users)]
+    for t in threads:
+        t.start()
+    ready.wait()
+    on_measure(clocks[0])
+    for t in threads:
+        t.join()
+    return samples
+
+# --- server-side time ---------------------------------------------------------
+
+def scrape(port):
+    """{(method, route): (requests, seconds)} from the server's request-latency histogram."""
+    from prometheus_client.parser import text_string_to_metric_families
+    headers = {'Authorization': f"Bearer {os.environ['METRICS_TOKEN']}"} if os.environ.get('METRICS_TOKEN') else {}
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('GET', '/metrics', headers=headers)
+    text = conn.getresponse().read().decode()
+    totals = {}
+    for family in text_string_to_metric_families(text):
+        if family.name != 'http_request_duration_seconds':
+            continue
+        for sample in family.samples:
+            key = (sample.labels.get('method'), sample.labels.get('endpoint'))
+            count, seconds = totals.get(key, (0, 0.0))
+            if sample.name.endswith('_count'):
+                totals[key] = (count + sample.value, seconds)
+            elif sample.name.endswith('_sum'):
+                totals[key] = (count, seconds + sample.value)
+    return totals
+
+def server_time(before, after):
+    """Requests and mean server-side ms per route between two scrapes."""
+    report = {}
+    for (method, route), (count, seconds) in sorted(after.items(), key=lambda item: str(item[0])):
+        count -= before.get((method, route), (0, 0.0))[0]
+        seconds -= before.get((method, route), (0, 0.0))[1]
+        if count > 0 and route != 'metrics':
+            report[f"{method} {route}"] = {'requests': int(count), 'mean_ms': round(seconds / count * 1000, 2),
+                                           'busy_s': round(seconds, 2)}
+    return report
+
+# --- report -------------------------------------------------------------------
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+def summarize(samples, seconds):
+    groups = {}
+    for endpoint, elapsed, status in samples:
+        groups.setdefault(endpoint, []).append((elapsed, status))
+    groups['total'] = [(elapsed, status) for _, elapsed, status in samples]
+
+    report = {}
+    for endpoint, results in sorted(groups.items()):
+        latencies = sorted(elapsed for elapsed, _ in results)
+        report[endpoint] = {
+            'requests': len(results),
+            'rps': round(len(results) / seconds, 2),
+            # 409 = sold out: the expected answer for a popular product, not a failure
+            'errors': sum(1 for _, status in results if status == 0 or (status >= 400 and status != 409)),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+        }
+    return report
+
+def slower(before, after, tolerance):
+    return after > before * (1 + tolerance) and after - before > NOISE_FLOOR_MS
+
+def compare(report, baseline, tolerance):
+    problems = []
+    for endpoint, base in baseline['endpoints'].items():
+        current = report['endpoints'].get(endpoint)
+        if current is None:
+            problems.append(f"{endpoint}: no requests in this run")
+            continue
+        if slower(base['p50_ms'], current['p50_ms'], tolerance):
+            problems.append(f"{endpoint}: p50 {base['p50_ms']}ms -> {current['p50_ms']}ms")
+        if base['requests'] >= MIN_P95_REQUESTS and slower(base['p95_ms'], current['p95_ms'], tolerance):
+            problems.append(f"{endpoint}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current['rps'] < base['rps'] * (1 - tolerance):
+            problems.append(f"{endpoint}: throughput {base['rps']}/s -> {current['rps']}/s")
+    for route, base in baseline.get('server', {}).items():
+        current = report['server'].get(route)
+        if current and slower(base['mean_ms'], current['mean_ms'], tolerance):
+            problems.append(f"{route}: server time {base['mean_ms']}ms -> {current['mean_ms']}ms")
+    return problems
+
+def print_table(endpoints, baseline):
+    print(f"\n{'endpoint':<40} {'reqs':>7} {'req/s':>8} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'base p95':>9}")
+    for endpoint, row in endpoints.items():
+        base = baseline['endpoints'].get(endpoint, {}).get('p95_ms', '-') if baseline else '-'
+        print(f"{endpoint:<40} {row['requests']:>7} {row['rps']:>8} {row['errors']:>5} "
+              f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} {base:>9}")
+
+def print_server_time(routes, baseline):
+    print(f"\n{'route (server side)':<40} {'reqs':>7} {'mean ms':>8} {'base':>9}")
+    for route, row in routes.items():
+        base = baseline.get('server', {}).get(route, {}).get('mean_ms', '-') if baseline else '-'
+        print(f"{route:<40} {row['requests']:>7} {row['mean_ms']:>8} {base:>9}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--server', choices=['gunicorn', 'flask'], default='gunicorn',
+                        help='gunicorn run:app, or the run.py app on the threaded development server')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--users', type=int, default=4, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured seconds before measuring')
+    parser.add_argument('--think-ms', type=float, default=100, help='mean pause between a user\'s requests')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='scenario weights for the virtual users')
+    parser.add_argument('--scale', default='small', help='`flask seed` preset for the throwaway database')
+    parser.add_argument('--database-url', help='use this migrated, seeded database instead')
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed regression, as a fraction')
+    args = parser.parse_args()
+
+    metrics_dir = tempfile.mkdtemp(prefix='queens_load_metrics_')
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=metrics_dir)
+    env.pop('FLASK_ENV', None)
+    database = None if args.database_url else seeded_database(env, args.scale)
+    env['DATABASE_URL'] = args.database_url or 'sqlite:///' + database
+    port = free_port()
+
+    with tempfile.NamedTemporaryFile('w+', prefix='queens_load_server_', suffix='.log', delete=False) as log:
+        try:
+            server = start_server(args, env, port, log)
+            try:
+                probe = Client(port, None, [])
+                shops = [shop['id'] for shop in probe.call('GET', '/customer/shops', '/customer/shops')[1]]
+                owners = shops[:max(1, len(shops) // 10)] # owners of the busiest-looking shops
+                print(f"Server: {args.server} on :{port}; {args.users} users for {args.duration:.0f}s "
+                      f"after {args.warmup:.0f}s warm-up")
+                scrapes = []
+
+                def measure(clock):
+                    # Histogram totals at the start and end of the measured window
+                    time.sleep(max(0.0, clock.start - time.monotonic()))
+                    scrapes.append(scrape(port))
+                    time.sleep(max(0.0, clock.stop - time.monotonic()))
+                    scrapes.append(scrape(port))
+
+                samples = run_users(args, port, shops, owners, measure)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+        except Exception:
+            print(f"Server log: {log.name}")
+            raise
+        finally:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+            if database:
+                os.remove(database)
+    os.remove(log.name)
+
+    settings = {
+        'server': args.server, 'workers': args.workers if args.server == 'gunicorn' else None,
+        'users': args.users, 'duration': args.duration, 'mix': args.mix, 'think_ms': args.think_ms,
+        'scale': None if args.database_url else args.scale,
+    }
+    report = {
+        'settings': settings,
+        'machine': {'cpus': os.cpu_count(), 'python': platform.python_version(), 'platform': platform.platform()},
+        'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'endpoints': summarize(samples, args.duration),
+        'server': server_time(*scrapes),
+    }
+    workers = args.workers if args.server == 'gunicorn' else 1
+    busy = sum(row['busy_s'] for row in report['server'].values()) / (args.duration * workers)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if any(baseline['settings'].get(key) != settings[key] for key in COMPARABLE):
+            print(f"\nBaseline {args.baseline} was recorded with other settings; not compared")
+            baseline = None
+    print_table(report['endpoints'], baseline)
+    print_server_time(report['server'], baseline)
+    print(f"Server busy {busy:.0%} of the measured time")
+    if busy > SATURATED:
+        print("WARNING: the server was close to saturation; latencies include queueing. "
+              "Use fewer --users or a longer --think-ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+
+    problems = [f"{endpoint}: {row['errors']} failed requests"
+                for endpoint, row in report['endpoints'].items() if row['errors'] and endpoint != 'total']
+    if baseline:
+        problems += compare(report, baseline, args.tolerance)
+    if problems:
+        print(f"\nFAIL: {len(problems)} problems")
+        for problem in problems:
+            print(f"- {problem}")
+        sys.exit(1)
+    print("\nOK" + (f": within {args.tolerance:.0%} of the baseline" if baseline else ""))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Login latency under a burst, with and without the password-hashing pool.
+
+Many threads log in concurrently while a few others keep hitting the cheap
+GET /events/ endpoint. Each mode reports p50/p95/p99 latency for both,
+successful logins, and how many logins were turned away with 429.
+PASSWORD_HASH_WORKERS=0 is the old behaviour: hashing inline on the request thread.
+
+By default requests go through the test client in this process. --server
+gunicorn serves them from gunicorn as deployed (gunicorn.conf.py, so threaded
+workers) and sends them over HTTP.
+
+    python benchmarks/login_latency.py [--modes 0,2] [--login-threads 32] [--seconds 10]
+        [--server gunicorn --workers 2]
+"""
+import argparse
+import http.client
+import os
+import shutil
+import tempfile
+import threading
+import time
+from json import dumps
+from types import SimpleNamespace
+from support import make_app
+from load_test import free_port, start_server
+from app import db
+from app.models import User, UserRole
+from app.services import passwords
+
+def seed(app, users):
+    with app.app_context():
+        password_hash = passwords.hash_password('secret') # one hash shared by every user
+        db.session.add_all([
+            User(username=f'user{i}', email=f'user{i}@example.com', password_hash=password_hash, role=UserRole.CUSTOMER.value)
+            for i in range(users)
+        ])
+        db.session.commit()
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+class HTTPClient:
+    """Just enough of the Flask test client, over HTTP: post(json=) / get(), returning .status_code."""
+
+    def __init__(self, port):
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+    def open(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            return SimpleNamespace(status_code=response.status)
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            return SimpleNamespace(status_code=0) # counted as a failure
+
+    def post(self, path, json=None):
+        return self.open('POST', path, dumps(json))
+
+    def get(self, path):
+        return self.open('GET', path)
+
+def serve(workers, args, app):
+    # gunicorn on the benchmark database, with this mode's hashing settings
+    env = dict(os.environ, DATABASE_URL=app.config['SQLALCHEMY_DATABASE_URI'], BACKGROUND_JOBS='0',
+               PASSWORD_HASH_WORKERS=str(workers), PASSWORD_HASH_QUEUE=str(args.queue),
+               PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(prefix='queens_login_metrics_'))
+    env.pop('FLASK_ENV', None)
+    port = free_port()
+    log = tempfile.NamedTemporaryFile('w+', prefix='queens_login_server_', suffix='.log', delete=False)
+    server = start_server(argparse.Namespace(server='gunicorn', workers=args.workers), env, port, log)
+    # One login per worker so every hashing pool is running before the timing
+    for _ in range(args.workers * 2):
+        HTTPClient(port).post('/auth/login', json={'username': 'user0', 'password': 'secret'})
+
+    def stop():
+        server.terminate()
+        server.wait(timeout=30)
+        log.close()
+        os.remove(log.name)
+        shutil.rmtree(env['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    return (lambda: HTTPClient(port)), stop
+
+def run(workers, args):
+    app = make_app(TESTING=False, BACKGROUND_JOBS=False, PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_QUEUE=args.queue)
+    seed(app, args.login_threads)
+    if args.server == 'gunicorn':
+        new_client, stop = serve(workers, args, app)
+    else:
+        new_client, stop = app.test_client, lambda: None
+        with app.app_context():
+            passwords.verify_password(passwords.hash_password('warm-up'), 'warm-up') # start the pool outside the timing
+
+    logins, events = [], []
+    statuses = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def login(i):
+        client = new_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = client.post('/auth/login', json={'username': f'user{i}', 'password': 'secret'})
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 200:
+                    logins.append(elapsed)
+            if response.status_code == 429:
+                time.sleep(0.05)
+
+    def browse():
+        client = new_client()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.get('/events/')
+            with lock:
+                events.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=login, args=(i,)) for i in range(args.login_threads)]
+    threads += [threading.Thread(target=browse) for _ in range(args.browse_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stop()
+
+    ms = lambda samples, pct: percentile(samples, pct) * 1000
+    label = 'inline' if workers == 0 else f'pool={workers}'
+    print(f"[{label:<8}] login  ok={len(logins):<5} 429={statuses.get(429, 0):<5} "
+          f"p50={ms(logins, 50):7.1f}ms p95={ms(logins, 95):7.1f}ms p99={ms(logins, 99):7.1f}ms")
+    print(f"[{label:<8}] events n={len(events):<6} "
+          f"p50={ms(events, 50):7.1f}ms p95={ms(events, 95):7.1f}ms p99={ms(events, 99):7.1f}ms"
+          + (f" failed={statuses.get(0, 0)}" if statuses.get(0) else ''))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', default='0,2', help='comma-separated PASSWORD_HASH_WORKERS values; 0 = inline')
+    parser.add_argument('--login-threads', type=int, default=32)
+    parser.add_argument('--browse-threads', type=int, default=4)
+    parser.add_argument('--queue', type=int, default=4)
+    parser.add_argument('--server', choices=['test-client', 'gunicorn'], default='test-client')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    for workers in [int(m) for m in args.modes.split(',')]:
+        run(workers, args)
+
+if __name__ == '__main__':
+    main()
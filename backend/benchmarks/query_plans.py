@@ -0,0 +1,148 @@
+"""Query-plan regression check for the hot queries of every blueprint.
+
+Runs EXPLAIN for each query below and fails if the planner has to fall back
+to a full table scan on a table the query is not allowed to scan.
+
+    python benchmarks/query_plans.py                      # SQLite
+    BENCH_DATABASE_URL=postgresql://localhost/queens_bench python benchmarks/query_plans.py
+
+SQLite: any "SCAN <table>" step counts as a full scan, including walks of a
+whole index; only "SEARCH" steps are index lookups.
+Postgres: sequential scans are disabled for the session, so any remaining
+"Seq Scan" node means no usable index exists.
+"""
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+from support import make_app
+from sqlalchemy import func, select, text
+from app import db
+from app.models import (
+    User, Tenant, Product, Order, OrderItem, CustomerProfile, Wishlist,
+    InventoryLedger, IdempotencyKey, OrderRevenueDaily, DashboardSnapshot, UserRole
+)
+from app.services import activity, dashboard, event_listing, order_feed, revenue, search, serializers, wishlist
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+# (blueprint, description, statement factory, tables allowed to be scanned in full)
+HOT_QUERIES = [
+    ('customer', 'checkout: basket products',
+        lambda: select(Product).where(Product.id.in_([1, 2, 3])), set()),
+    ('customer', 'checkout: loyalty profile',
+        lambda: select(CustomerProfile).where(CustomerProfile.user_id == 1), set()),
+    ('customer', 'checkout: idempotency key',
+        lambda: select(IdempotencyKey).where(IdempotencyKey.user_id == 1, IdempotencyKey.key == 'k'), set()),
+    ('customer', 'order history with item counts',
+        lambda: serializers.orders_query(1), set()),
+    ('customer', 'shop products',
+        lambda: select(Product).where(Product.tenant_id == 1), set()),
+    ('customer', 'approved shops (full listing)',
+        lambda: select(Tenant).where(Tenant.is_approved == True), {'tenant'}),
+    ('customer', 'shop balances',
+        lambda: revenue.balances_query([1, 2]), set()),
+    ('customer', 'product search page',
+        lambda: search_statement(['running', 'shoe'], category='Sports'), set()),
+    ('customer', 'product search page after cursor',
+        lambda: search_statement(['shoe'], cursor=search.encode_cursor(-1.5, 100)), set()),
+    ('customer', 'wishlist with products',
+        lambda: wishlist.items_query(1), set()),
+    ('customer', 'wishlist bulk remove',
+        lambda: select(Wishlist).where(Wishlist.user_id == 1, Wishlist.product_id.in_([2, 3])), set()),
+    ('tenant', 'current tenant',
+        lambda: select(Tenant).where(Tenant.user_id == 1), set()),
+    ('tenant', 'product count',
+        lambda: select(func.count(Product.id)).where(Product.tenant_id == 1), set()),
+    ('tenant', 'orders feed page',
+        # First page walks ix_order_created_at_id newest-first and stops at the LIMIT
+        lambda: order_feed.page_query(1, limit=51), {'order'}),
+    ('tenant', 'orders feed page after cursor',
+        lambda: order_feed.page_query(1, cursor=order_feed.encode_cursor(NOW, 100), limit=51), set()),
+    ('tenant', 'orders feed stream',
+        lambda: order_feed.stream_query(1), set()),
+    ('tenant', 'order status ownership check',
+        lambda: select(Order).join(OrderItem).join(Product).where(Order.id == 1, Product.tenant_id == 1), set()),
+    ('tenant', 'stock release',
+        lambda: select(InventoryLedger.order_id, InventoryLedger.product_id, func.sum(InventoryLedger.quantity))
+        .where(InventoryLedger.order_id.in_([1, 2]))
+        .group_by(InventoryLedger.order_id, InventoryLedger.product_id), set()),
+    ('tenant', 'expiry sweep',
+        lambda: select(Order.id).where(Order.status == 'Pending', Order.delivery_time < NOW).limit(5000), set()),
+    ('admin', 'tenant user count',
+        lambda: select(func.count(User.id)).where(User.role == UserRole.TENANT.value), set()),
+    ('admin', 'all tenant balances (full listing)',
+        lambda: revenue.balances_query(), {'tenant', 'tenant_balance_snapshot'}),
+    ('admin', 'top shops by revenue (ranks every balance)',
+        lambda: dashboard.shop_revenue_query(10), {'tenant', 'tenant_balance_snapshot'}),
+    ('admin', 'dashboard snapshot',
+        lambda: select(DashboardSnapshot).where(DashboardSnapshot.name == 'admin'), set()),
+    ('admin', 'monthly revenue (daily rollup)',
+        lambda: select(OrderRevenueDaily.day, func.sum(OrderRevenueDaily.revenue))
+        .where(OrderRevenueDaily.day >= NOW.date()).group_by(OrderRevenueDaily.day), set()),
+    ('admin', 'weekday footfall (hourly counters)',
+        lambda: activity.range_query(activity.ORDER, NOW, NOW + timedelta(days=28)), set()),
+    ('admin', 'category distribution (full listing)',
+        lambda: select(Tenant.category, func.count(Tenant.id)).group_by(Tenant.category), {'tenant'}),
+    ('events', 'upcoming events',
+        lambda: event_listing.upcoming_query(NOW), set()),
+]
+
+def search_statement(words, **kwargs):
+    statement, params = search.search_query(words, **kwargs)
+    return statement.bindparams(**params)
+
+def compile_sql(statement):
+    return str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+
+def sqlite_scans(conn, sql, tables):
+    scans = set()
+    for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql)):
+        detail = row[-1]
+        match = re.match(r'SCAN (?:TABLE )?"?(\w+)"?(?: AS \w+)?(?: USING (?:COVERING )?INDEX \w+)?$', detail)
+        if match and match.group(1) in tables:
+            scans.add(match.group(1))
+    return scans
+
+def postgres_scans(conn, sql, tables):
+    conn.execute(text('SET enable_seqscan = off'))
+    plan = conn.execute(text('EXPLAIN (FORMAT JSON) ' + sql)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scans = set()
+    def walk(node):
+        if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in tables:
+            scans.add(node['Relation Name'])
+        for child in node.get('Plans', []):
+            walk(child)
+    walk(plan[0]['Plan'])
+    return scans
+
+def main():
+    app = make_app()
+    failures = []
+    with app.app_context():
+        tables = set(db.metadata.tables.keys())
+        explain = postgres_scans if db.engine.name == 'postgresql' else sqlite_scans
+        print(f"dialect={db.engine.name}")
+        with db.engine.connect() as conn:
+            for blueprint, description, build, allowed in HOT_QUERIES:
+                scans = explain(conn, compile_sql(build()), tables)
+                unexpected = scans - allowed
+                if unexpected:
+                    status = 'FULL SCAN: ' + ', '.join(sorted(unexpected))
+                    failures.append((blueprint, description, unexpected))
+                elif scans:
+                    status = 'ok (allowed scan: ' + ', '.join(sorted(scans)) + ')'
+                else:
+                    status = 'ok'
+                print(f"[{blueprint:<8}] {description:<45} {status}")
+
+    if failures:
+        print(f"FAIL: {len(failures)} hot queries regressed to a full scan")
+        sys.exit(1)
+    print("OK: every hot query is index-backed")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Query-count report for every route, with budgets and N+1 detection enforced.
+
+Seeds databases of increasing size, calls every endpoint with
+QUERY_BUDGETS on (app.services.query_budget), and prints the statements
+each request ran per size. Fails if any request breaks its endpoint's
+budget, repeats a statement N+1 style, or runs more statements as the
+data grows. Every registered route must be exercised here.
+
+    python benchmarks/query_report.py [--sizes 1,10,50] [--json report.json]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from support import make_app, auth_headers
+from sqlalchemy import insert
+from app import db
+from app.models import User, Tenant, Product, Order, OrderItem, CustomerProfile, Wishlist, Event, UserRole
+from app.services import query_budget
+from app.services.passwords import hash_password
+
+def seed(app, n):
+    now = datetime.utcnow()
+    with app.app_context():
+        password_hash = hash_password('secret')
+        users = [
+            {'username': 'admin', 'email': 'admin@example.com', 'role': UserRole.ADMIN.value},
+            {'username': 'customer', 'email': 'customer@example.com', 'role': UserRole.CUSTOMER.value},
+        ] + [
+            {'username': f'owner{i}', 'email': f'owner{i}@example.com', 'role': UserRole.TENANT.value}
+            for i in range(n)
+        ]
+        db.session.execute(insert(User), [dict(user, password_hash=password_hash) for user in users])
+        db.session.execute(insert(CustomerProfile), [{'user_id': 2, 'loyalty_points': 0}])
+        db.session.execute(insert(Tenant), [
+            {'user_id': i + 3, 'shop_name': f'Shop {i}', 'category': 'Fashion', 'is_approved': True, 'account_balance': 0.0}
+            for i in range(n)
+        ])
+        db.session.execute(insert(Product), [
+            {'tenant_id': t + 1, 'name': f'Shoe {t}-{i}', 'price': 10.0, 'stock': 1000, 'sku': f'S{t}-{i}'}
+            for t in range(n) for i in range(n)
+        ])
+        # Tenant 1 owns products 1..n; every order has 3 of them
+        db.session.execute(insert(Order), [
+            {'user_id': 2, 'total_amount': 30.0, 'status': 'Pending', 'created_at': now - timedelta(minutes=i)}
+            for i in range(n)
+        ])
+        db.session.execute(insert(OrderItem), [
+            {'order_id': o + 1, 'product_id': (o + k) % n + 1, 'quantity': 1, 'price_at_purchase': 10.0}
+            for o in range(n) for k in range(3)
+        ])
+        db.session.execute(insert(Wishlist), [{'user_id': 2, 'product_id': i + 1} for i in range(n)])
+        db.session.execute(insert(Event), [
+            {'name': f'Event {i}', 'date': now + timedelta(days=i + 1), 'tenant_id': 1} for i in range(n)
+        ])
+        db.session.commit()
+        return {'admin': auth_headers(1), 'customer': auth_headers(2), 'owner': auth_headers(3), None: {}}
+
+def calls(n):
+    # (method, path, caller, request kwargs); reads first, then writes
+    products = list(range(1, n + 1))
+    catalog = '\n'.join(['sku,name,price,stock'] + [f'S0-{i},Boot {i},12,5' for i in range(n)])
+    return [
+        ('GET', '/', None, {}),
+        ('GET', '/metrics', None, {}),
+        ('GET', '/customer/shops', None, {}),
+        ('GET', '/customer/shops/1', None, {}),
+        ('GET', '/customer/shops/1/products', None, {}),
+        ('GET', '/customer/search?q=shoe', None, {}),
+        ('GET', '/customer/orders', 'customer', {}),
+        ('GET', '/customer/profile', 'customer', {}),
+        ('GET', '/customer/wishlist', 'customer', {}),
+        ('GET', '/customer/wishlist?view=availability', 'customer', {}),
+        ('GET', '/events/', None, {}),
+        ('GET', '/tenant/stats', 'owner', {}),
+        ('GET', '/tenant/products', 'owner', {}),
+        ('GET', '/tenant/orders', 'owner', {}),
+        ('GET', '/tenant/orders?stream=1', 'owner', {}),
+        ('GET', '/admin/tenants', 'admin', {}),
+        ('GET', '/admin/stats', 'admin', {}),
+        ('GET', '/admin/shops/revenue', 'admin', {}),
+        ('GET', '/admin/analytics', 'admin', {}),
+        ('GET', '/admin/caches', 'admin', {}),
+        ('GET', '/admin/pool', 'admin', {}),
+        ('POST', '/auth/register', None, {'json': {'username': 'new', 'email': 'new@example.com', 'password': 'secret'}}),
+        ('POST', '/auth/login', None, {'json': {'username': 'customer', 'password': 'secret'}}),
+        ('POST', '/customer/orders', 'customer', {'json': {'items': [{'id': pid, 'quantity': 1} for pid in products]}}),
+        ('POST', '/customer/wishlist', 'customer', {'json': {'product_ids': [n + pid for pid in products]}}),
+        ('DELETE', '/customer/wishlist', 'customer', {'json': {'product_ids': products}}),
+        ('PUT', '/tenant/profile', 'owner', {'json': {'shop_name': 'Renamed', 'category': 'Shoes'}}),
+        ('POST', '/tenant/products', 'owner', {'json': {'name': 'New', 'price': 5, 'stock': 1}}),
+        ('PUT', '/tenant/products/1', 'owner', {'json': {'name': 'Changed', 'stock': 3}}),
+        ('DELETE', f'/tenant/products/{n * n + 1}', 'owner', {}), # the one added above
+        ('POST', '/tenant/products/import', 'owner', {'data': catalog, 'content_type': 'text/csv'}),
+        ('PUT', '/tenant/orders/1/status', 'owner', {'json': {'status': 'Cancelled'}}),
+        ('POST', '/admin/tenants/1/approve', 'admin', {}),
+        ('POST', '/events/', 'owner', {'json': {'name': 'Sale', 'date': '2030-01-01T10:00:00'}}),
+        ('PUT', '/events/1', 'owner', {'json': {'name': 'Big sale'}}),
+        ('DELETE', '/events/2', 'owner', {}),
+        ('POST', '/events/seed', None, {}),
+    ]
+
+def run(n):
+    app = make_app(QUERY_BUDGETS=True)
+    headers = seed(app, n)
+    client = app.test_client()
+    counts, failures = {}, []
+    with app.app_context():
+        for method, path, caller, kwargs in calls(n):
+            try:
+                response = client.open(path, method=method, headers=headers[caller], **kwargs)
+                body = response.get_data(as_text=True) # drains streamed bodies
+                response.close()
+                if response.status_code >= 400:
+                    failures.append(f"{method} {path}: HTTP {response.status_code} {body[:200]}")
+            except query_budget.QueryBudgetExceeded as e:
+                failures.append(f"{method} {path} (n={n}): {e}")
+            _, endpoint, statements = app.extensions['query_budget']['requests'][-1]
+            counts[(method, endpoint)] = max(statements, counts.get((method, endpoint), 0))
+    return app, counts, failures
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='1,10,50', help='comma-separated seed sizes (shops, products per shop, orders...)')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    results, failures = {}, []
+    for n in sizes:
+        app, counts, size_failures = run(n)
+        failures += size_failures
+        for key, statements in counts.items():
+            results.setdefault(key, {})[n] = statements
+
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules()}
+    missing = endpoints - {endpoint for _, endpoint in results} - {'static'} # files, no SQL
+    failures += [f"{endpoint}: not exercised by this report" for endpoint in sorted(missing)]
+
+    print(f"{'endpoint':<40} {'budget':>6} " + ' '.join(f"{'n=' + str(n):>6}" for n in sizes))
+    for (method, endpoint), by_size in sorted(results.items(), key=lambda item: item[0][1]):
+        budget = query_budget.BUDGETS.get(endpoint, '-')
+        budget = 'unbnd' if budget is query_budget.UNBOUNDED else budget
+        grows = budget != 'unbnd' and len(set(by_size.values())) > 1
+        if grows:
+            failures.append(f"{method} {endpoint}: statement count grows with data {by_size}")
+        print(f"{method + ' ' + endpoint:<40} {budget:>6} " + ' '.join(f"{by_size.get(n, '-'):>6}" for n in sizes)
+              + ('   <- grows' if grows else ''))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'sizes': sizes,
+                'endpoints': [
+                    {'method': method, 'endpoint': endpoint, 'budget': query_budget.BUDGETS.get(endpoint),
+                     'statements': {str(n): count for n, count in by_size.items()}}
+                    for (method, endpoint), by_size in sorted(results.items())
+                ],
+                'failures': failures,
+            }, f, indent=2)
+
+    if failures:
+        print(f"\nFAIL: {len(failures)} problems")
+        for failure in failures:
+            print(f"- {failure}")
+        sys.exit(1)
+    print("\nOK: every endpoint within budget, no N+1 patterns")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Read-replica routing check with two SQLite files.
+
+The "replica" is a copy of the primary file, refreshed only when the script
+replicates explicitly, so a stale read shows exactly which database answered.
+Checks that read-only views read from the replica, that writes (and the
+dashboard's lease UPDATEs) go to the primary, and that a user's reads stick
+to the primary for REPLICA_STICKY_SECONDS after their own write, both in
+process and via the echoed X-Read-Primary-Until header.
+
+    python benchmarks/replica_routing.py
+
+Against two local Postgres instances with real replication, point
+DATABASE_URL / DATABASE_REPLICA_URL at them and run the app instead.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from support import make_app, auth_headers
+from sqlalchemy import event
+from app import db
+from app.models import User, Tenant, Product, UserRole
+from app.services import replica
+
+STICKY_SECONDS = 1
+
+def main():
+    fd, replica_path = tempfile.mkstemp(prefix='queens_replica_', suffix='.db')
+    os.close(fd)
+    app = make_app(DATABASE_REPLICA_URL='sqlite:///' + replica_path, REPLICA_STICKY_SECONDS=STICKY_SECONDS,
+                   CATALOG_CACHE_SIZE=0)
+    primary_path = db_path(app)
+    failures = []
+
+    def check(label, ok):
+        print(f"{'ok  ' if ok else 'FAIL'} {label}")
+        if not ok:
+            failures.append(label)
+
+    def replicate():
+        with app.app_context():
+            db.engines[replica.REPLICA].dispose()
+        shutil.copyfile(primary_path, replica_path)
+
+    statements = {'primary': [], 'replica': []}
+    with app.app_context():
+        for name, engine in (('primary', db.engines[None]), ('replica', db.engines[replica.REPLICA])):
+            event.listen(engine, 'before_cursor_execute',
+                         lambda conn, cursor, sql, *args, name=name: statements[name].append(sql))
+
+        owner = User(username='owner', email='owner@example.com', role=UserRole.TENANT.value)
+        admin = User(username='admin', email='admin@example.com', role=UserRole.ADMIN.value)
+        db.session.add_all([owner, admin])
+        db.session.flush()
+        shop = Tenant(user_id=owner.id, shop_name='Shop', category='Fashion', is_approved=True)
+        db.session.add(shop)
+        db.session.flush()
+        db.session.add(Product(tenant_id=shop.id, name='Old name', price=10, stock=5))
+        db.session.commit()
+        owner_headers, admin_headers = auth_headers(owner.id), auth_headers(admin.id)
+    replicate()
+
+    client = app.test_client()
+    products = '/customer/shops/1/products'
+    name = lambda response: response.json[0]['name']
+
+    for sql in statements.values():
+        sql.clear()
+    check("catalog read is served by the replica", name(client.get(products)) == 'Old name'
+          and statements['replica'] and not statements['primary'])
+
+    response = client.put('/tenant/products/1', json={'name': 'New name'}, headers=owner_headers)
+    until = response.headers.get(replica.STICKY_HEADER)
+    check("write goes to the primary and returns the sticky header", response.status_code == 200 and until)
+
+    check("the writer reads their own write (sticky in process)",
+          name(client.get(products, headers=owner_headers)) == 'New name')
+    check("anonymous readers still get the replica (stale until replication)",
+          name(client.get(products)) == 'Old name')
+    check("an echoed header pins reads to the primary",
+          name(client.get(products, headers={replica.STICKY_HEADER: until})) == 'New name')
+    check("a header beyond the sticky window is ignored",
+          name(client.get(products, headers={replica.STICKY_HEADER: str(time.time() + 3600)})) == 'Old name')
+
+    time.sleep(STICKY_SECONDS + 0.2)
+    check("after the window the writer reads the replica again",
+          name(client.get(products, headers=owner_headers)) == 'Old name')
+    replicate()
+    check("replicated data shows up", name(client.get(products)) == 'New name')
+
+    for sql in statements.values():
+        sql.clear()
+    response = client.get('/admin/stats', headers=admin_headers)
+    writes = [sql for sql in statements['replica'] if not sql.lstrip().upper().startswith('SELECT')]
+    check("dashboard lease writes go to the primary inside a replica-routed view",
+          response.status_code == 200 and not writes and statements['primary'])
+
+    if failures:
+        print(f"FAIL: {len(failures)} routing checks failed")
+        sys.exit(1)
+    print("OK: reads routed to the replica, writes and sticky reads to the primary")
+
+def db_path(app):
+    with app.app_context():
+        return db.engines[None].url.database
+
+if __name__ == '__main__':
+    main()
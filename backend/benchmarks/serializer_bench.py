@@ -0,0 +1,103 @@
+"""List serialization: ORM instances + to_dict() + jsonify vs column projection.
+
+For each list endpoint's payload, times building the JSON body the old way
+(load models, to_dict(), Flask's JSON provider) against app.services.serializers
+(select the payload columns, rows to dicts, orjson), and counts SQL statements.
+Runs in one request context so jsonify behaves as it does in the routes.
+
+    python benchmarks/serializer_bench.py [--rows 2000] [--repeat 20]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from support import make_app, count_queries
+from flask import jsonify
+from sqlalchemy import insert
+from app import db
+from app.models import User, Tenant, Product, Order, OrderItem, Event, UserRole
+from app.services import event_listing, revenue, serializers
+
+def seed(app, n):
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {'username': f'user{i}', 'email': f'user{i}@example.com',
+             'role': UserRole.TENANT.value if i else UserRole.CUSTOMER.value}
+            for i in range(n + 1)
+        ])
+        db.session.execute(insert(Tenant), [
+            {'user_id': i + 2, 'shop_name': f'Shop {i}', 'category': 'Fashion', 'description': 'A shop ' * 10,
+             'is_approved': i % 10 != 0, 'account_balance': 0.0}
+            for i in range(n)
+        ])
+        db.session.execute(insert(Product), [
+            {'tenant_id': 1, 'name': f'Product {i}', 'description': 'Nice things ' * 8,
+             'price': round(rng.uniform(1, 100), 2), 'stock': rng.randint(0, 50), 'sku': f'SKU-{i}'}
+            for i in range(n)
+        ])
+        db.session.execute(insert(Order), [
+            {'user_id': 1, 'total_amount': 42.0, 'status': 'Pending', 'delivery_address': '1 Mall Road',
+             'contact_number': '555-0100', 'created_at': now - timedelta(minutes=i), 'delivery_time': now}
+            for i in range(n)
+        ])
+        db.session.execute(insert(OrderItem), [
+            {'order_id': i // 3 + 1, 'product_id': i % n + 1, 'quantity': 1, 'price_at_purchase': 14.0}
+            for i in range(n * 3)
+        ])
+        db.session.execute(insert(Event), [
+            {'name': f'Event {i}', 'description': 'Sale ' * 10, 'date': now + timedelta(hours=i)}
+            for i in range(n)
+        ])
+        db.session.commit()
+
+CASES = [
+    ('/customer/orders',
+        lambda: jsonify([o.to_dict() for o in Order.query.filter_by(user_id=1).order_by(Order.created_at.desc()).all()]),
+        lambda: serializers.json_response(serializers.orders(1))),
+    ('/customer/shops',
+        lambda: jsonify([t.to_dict(include_balance=False) for t in Tenant.query.filter_by(is_approved=True).all()]),
+        lambda: serializers.json_response(serializers.shops())),
+    ('/customer/shops/<id>/products',
+        lambda: jsonify([p.to_dict() for p in Product.query.filter_by(tenant_id=1).all()]),
+        lambda: serializers.json_response(serializers.products(1))),
+    ('/admin/tenants',
+        lambda: jsonify([t.to_dict(balance=b.get(t.id, 0.0)) for b in [revenue.balances()] for t in Tenant.query.all()]),
+        lambda: serializers.json_response(
+            [dict(t, account_balance=b.get(t['id'], 0.0)) for b in [revenue.balances()] for t in serializers.shops(False)])),
+    ('/events/',
+        lambda: jsonify([e.to_dict() for e in db.session.scalars(event_listing.upcoming_query()).all()]),
+        lambda: serializers.json_response(serializers.events(event_listing.upcoming_query()))),
+]
+
+def measure(build, repeat):
+    samples = []
+    for _ in range(repeat):
+        db.session.expunge_all() # every request starts with an empty identity map
+        started = time.perf_counter()
+        body = build().get_data()
+        samples.append((time.perf_counter() - started) * 1000)
+    db.session.expunge_all()
+    with count_queries() as statements:
+        build()
+    return sorted(samples)[len(samples) // 2], len(statements), len(body)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    seed(app, args.rows)
+    print(f"rows={args.rows} encoder={'orjson' if serializers.orjson else 'json'} (median of {args.repeat})")
+    with app.test_request_context():
+        for path, old, new in CASES:
+            old_ms, old_queries, old_size = measure(old, args.repeat)
+            new_ms, new_queries, new_size = measure(new, args.repeat)
+            print(f"{path:<30} to_dict {old_ms:7.1f}ms {old_queries:>5}q {old_size:>8}B | "
+                  f"projection {new_ms:7.1f}ms {new_queries:>3}q {new_size:>8}B | x{old_ms / new_ms:4.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Concurrent checkout stress test for stock reservation.
+
+Many threads race to buy the same product through POST /customer/orders.
+Fails if more units are sold than were in stock, if stock goes negative, or
+if the inventory ledger disagrees with Product.stock. Prints throughput.
+
+    python benchmarks/stock_stress.py [--threads 16] [--stock 200] [--attempts 600]
+
+Point BENCH_DATABASE_URL at a local Postgres to exercise real row-level
+concurrency; SQLite serializes writers but still checks correctness.
+"""
+import argparse
+import sys
+import threading
+import time
+from support import make_app, auth_headers
+from sqlalchemy import func
+from app import db
+from app.models import User, Tenant, Product, InventoryLedger, UserRole
+
+def seed(app, stock):
+    with app.app_context():
+        owner = User(username='owner', email='owner@example.com', role=UserRole.TENANT.value)
+        customer = User(username='shopper', email='shopper@example.com', role=UserRole.CUSTOMER.value)
+        db.session.add_all([owner, customer])
+        db.session.flush()
+        tenant = Tenant(user_id=owner.id, shop_name='Hot Shop', account_balance=0.0, is_approved=True)
+        db.session.add(tenant)
+        db.session.flush()
+        product = Product(tenant_id=tenant.id, name='Limited Sneaker', price=99.0, stock=stock)
+        db.session.add(product)
+        db.session.commit()
+        return customer.id, product.id
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--stock', type=int, default=200)
+    parser.add_argument('--attempts', type=int, default=600)
+    args = parser.parse_args()
+
+    app = make_app()
+    user_id, product_id = seed(app, args.stock)
+    with app.app_context():
+        headers = auth_headers(user_id)
+
+    results = {'sold': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+    remaining = iter(range(args.attempts))
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            response = client.post('/customer/orders', json={'items': [{'id': product_id, 'quantity': 1}]}, headers=headers)
+            key = {201: 'sold', 409: 'rejected'}.get(response.status_code, 'errors')
+            with lock:
+                results[key] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        stock = db.session.get(Product, product_id).stock
+        ledger_net = db.session.query(func.coalesce(func.sum(InventoryLedger.quantity), 0))\
+            .filter(InventoryLedger.product_id == product_id).scalar()
+
+    print(f"threads={args.threads} attempts={args.attempts} initial_stock={args.stock}")
+    print(f"sold={results['sold']} rejected={results['rejected']} errors={results['errors']}")
+    print(f"final_stock={stock} ledger_net={ledger_net}")
+    print(f"elapsed={elapsed:.2f}s throughput={args.attempts / elapsed:.1f} checkouts/s")
+
+    failures = []
+    if results['sold'] > args.stock:
+        failures.append("oversold")
+    if stock < 0:
+        failures.append("negative stock")
+    if stock != args.stock - results['sold'] or ledger_net != -results['sold']:
+        failures.append("ledger and stock disagree")
+    if failures:
+        print("FAIL: " + ", ".join(failures))
+        sys.exit(1)
+    print("OK: no overselling")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+# Make 'app' and 'config' importable when run as `python benchmarks/<script>.py`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from config import Config
+from app import create_app, db
+from app.services import principal, search
+
+# Shared scaffolding for the scripts in this folder.
+# Each script runs against a throwaway database (BENCH_DATABASE_URL, or a
+# fresh SQLite file in the temp dir) so it never touches instance/site.db.
+
+def make_config(**overrides):
+    url = os.environ.get('BENCH_DATABASE_URL')
+    if not url:
+        fd, path = tempfile.mkstemp(prefix='queens_bench_', suffix='.db')
+        os.close(fd)
+        url = 'sqlite:///' + path
+
+    attrs = {'SQLALCHEMY_DATABASE_URI': url, 'TESTING': True}
+    attrs.update(overrides)
+    return type('BenchConfig', (Config,), attrs)
+
+def make_app(**overrides):
+    app = create_app(make_config(**overrides))
+    with app.app_context():
+        search.drop_schema()
+        db.drop_all()
+        db.create_all()
+        search.create_schema()
+    return app
+
+def auth_headers(user_id):
+    # Same claims auth.login issues, so routes authorize without touching the database
+    token = create_access_token(identity=str(user_id), additional_claims=principal.claims_for(user_id))
+    return {'Authorization': f'Bearer {token}'}
+
+@contextmanager
+def count_queries():
+    # Counts cursor executions; an executemany is one round trip and counts once
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
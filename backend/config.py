@@ -13,9 +13,85 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///site.db'
 
+    # Optional read replica for views marked @replica.read_only, and seconds a user's
+    # reads stay on the primary after they write (read-your-writes)
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+    # Statements slower than this (ms) are logged with the endpoint that ran them (0 disables)
+    SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
+    # Bearer token required to scrape /metrics (unset: open, e.g. behind a private network)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # Test mode: fail requests that exceed their endpoint's statement budget or repeat
+    # one statement this many times with different parameters (app.services.query_budget)
+    QUERY_BUDGETS = os.environ.get('QUERY_BUDGETS', '0') == '1'
+    QUERY_N_PLUS_ONE_REPEATS = int(os.environ.get('QUERY_N_PLUS_ONE_REPEATS', 3))
+
+    # Connection pool of each worker process (see app.services.pooling): kept-open connections,
+    # extra connections allowed under bursts, seconds a request may wait for one
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+    # Seconds before a pooled connection is replaced; keep it under the server's idle cutoff
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 240))
+    # Test connections on checkout so ones dropped while idle are replaced instead of failing a request
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    # PostgreSQL: seconds to wait for a new connection (covers a compute cold start), per-statement limit in ms (0 = none)
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', 15))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 0))
+    # DATABASE_URL goes through PgBouncer in transaction mode (default: on for Neon "-pooler" hosts)
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', '1' if '-pooler' in (os.environ.get('DATABASE_URL') or '') else '0') == '1'
+    # Connections each gunicorn worker opens as it boots (gunicorn.conf.py); 0 = on first use
+    DB_WARMUP_CONNECTIONS = int(os.environ.get('DB_WARMUP_CONNECTIONS', 0))
+
+    # Background jobs run on a daemon thread in each serving process (0 disables a job)
+    BACKGROUND_JOBS = os.environ.get('BACKGROUND_JOBS', '1') == '1'
+    # Seconds between folds of tenant revenue entries into balance snapshots
+    REVENUE_COMPACT_INTERVAL = int(os.environ.get('REVENUE_COMPACT_INTERVAL', 60))
+    # Seconds between sweeps that expire overdue Pending orders
+    ORDER_EXPIRY_INTERVAL = int(os.environ.get('ORDER_EXPIRY_INTERVAL', 60))
+
+    # Seconds a worker may serve its cached upcoming-events list before re-reading it
+    EVENTS_CACHE_TTL = int(os.environ.get('EVENTS_CACHE_TTL', 60))
+    # Seconds after which shop product ETags change even without catalog edits (stock moves at checkout)
+    CATALOG_STOCK_WINDOW = int(os.environ.get('CATALOG_STOCK_WINDOW', 30))
+    # Per-process cache of serialized shop and shop-product payloads: entries (0 disables), lifetime in seconds
+    CATALOG_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', 2000))
+    CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL', 300))
+
+    # Idempotency-Key responses: lifetime in seconds, in-process LRU size, purge interval
+    IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 24 * 3600))
+    IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', 10000))
+    IDEMPOTENCY_PURGE_INTERVAL = int(os.environ.get('IDEMPOTENCY_PURGE_INTERVAL', 3600))
+
+    # Password hashing: Werkzeug method string (algorithm and cost), pool processes per worker
+    # (0 hashes inline), extra jobs allowed to queue before logins get 429, seconds to wait for a result
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 4))
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Per-process cache of user identities for tokens lacking profile claims: lifetime in seconds, size
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 60))
+    IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE', 10000))
+
+    # Seconds the shared admin dashboard snapshot is served before one worker recomputes it
+    DASHBOARD_SNAPSHOT_TTL = int(os.environ.get('DASHBOARD_SNAPSHOT_TTL', 30))
+    # Shops listed in the dashboard's revenue breakdown (the rest via /admin/shops/revenue)
+    DASHBOARD_TOP_SHOPS = int(os.environ.get('DASHBOARD_TOP_SHOPS', 10))
+
 class DevelopmentConfig(Config):
     DEBUG = True
 
 class ProductionConfig(Config):
     DEBUG = False
     # In production, ensure DATABASE_URL is set to the Neon DB URL
+    # Selected with FLASK_ENV=production (run.py)
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+    DB_WARMUP_CONNECTIONS = int(os.environ.get('DB_WARMUP_CONNECTIONS', 2))
+
+CONFIGS = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+}
@@ -6,7 +6,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app, db
 from app.models import User, UserRole
-from werkzeug.security import generate_password_hash
+from app.services import passwords
 
 def create_admin(username, email, password):
     app = create_app()
@@ -20,7 +20,7 @@ def create_admin(username, email, password):
         admin = User(
             username=username,
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=passwords.hash_password(password),
             role=UserRole.ADMIN.value
         )
         
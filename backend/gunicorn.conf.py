@@ -0,0 +1,33 @@
+# Picked up automatically by `gunicorn run:app` when started from backend/.
+import os
+import shutil
+import tempfile
+
+# Workers write their Prometheus samples here so /metrics can sum them (app.services.metrics).
+# Set before any worker imports prometheus_client.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'queens_metrics'))
+
+# Threaded workers, so a login waiting on the password-hashing pool doesn't hold
+# up cheap requests to the same worker. Keep PASSWORD_HASH_WORKERS +
+# PASSWORD_HASH_QUEUE below `threads` (logins beyond that get 429 and leave
+# threads free) and DB_POOL_SIZE + DB_MAX_OVERFLOW at or above it.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+def on_starting(server):
+    # Samples from a previous run would be summed into this one
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+def post_worker_init(worker):
+    # Open the worker's database connections before it accepts requests, so the
+    # first request after a deploy or restart doesn't pay for connecting (or for
+    # waking a suspended Neon compute). DB_WARMUP_CONNECTIONS sets how many.
+    from app.services import pooling
+    opened, seconds = pooling.warm_up(worker.wsgi)
+    if opened:
+        worker.log.info("Opened %d database connections in %.0fms", opened, seconds * 1000)
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,76 @@
+"""add hot-path indexes and unique wishlist constraint
+
+Revision ID: 1d9a4c7e5b38
+Revises: f08b6e3d2a91
+Create Date: 2026-10-18 12:05:33.671208
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '1d9a4c7e5b38'
+down_revision = 'f08b6e3d2a91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_role'), ['role'], unique=False)
+
+    with op.batch_alter_table('tenant', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tenant_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('customer_profile', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_customer_profile_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_tenant_id'), ['tenant_id'], unique=False)
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_event_date'), ['date'], unique=False)
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.create_index('ix_order_user_id_created_at', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_order_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('order_item', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_item_order_id'), ['order_id'], unique=False)
+        batch_op.create_index('ix_order_item_product_id_order_id', ['product_id', 'order_id'], unique=False)
+
+    # Drop duplicate wishlist rows (keep the oldest) before enforcing uniqueness
+    op.execute(
+        'DELETE FROM wishlist WHERE id NOT IN '
+        '(SELECT MIN(id) FROM wishlist GROUP BY user_id, product_id)'
+    )
+    with op.batch_alter_table('wishlist', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_wishlist_user_id_product_id', ['user_id', 'product_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('wishlist', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_wishlist_user_id_product_id', type_='unique')
+
+    with op.batch_alter_table('order_item', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_item_product_id_order_id')
+        batch_op.drop_index(batch_op.f('ix_order_item_order_id'))
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_created_at_id')
+        batch_op.drop_index('ix_order_user_id_created_at')
+
+    with op.batch_alter_table('event', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_event_date'))
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_tenant_id'))
+
+    with op.batch_alter_table('customer_profile', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_customer_profile_user_id'))
+
+    with op.batch_alter_table('tenant', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tenant_user_id'))
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_role'))
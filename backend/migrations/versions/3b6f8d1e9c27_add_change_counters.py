@@ -0,0 +1,29 @@
+"""add change counters for catalog ETags
+
+Revision ID: 3b6f8d1e9c27
+Revises: 1d9a4c7e5b38
+Create Date: 2026-10-18 13:14:08.902355
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b6f8d1e9c27'
+down_revision = '1d9a4c7e5b38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_counter',
+    sa.Column('scope', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade():
+    op.drop_table('change_counter')
@@ -0,0 +1,59 @@
+"""split order_revenue_daily rows into write slots
+
+Revision ID: 5e8b2d7a1c93
+Revises: e7c3b9d4a215
+Create Date: 2026-10-18 19:12:37.481265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b2d7a1c93'
+down_revision = 'e7c3b9d4a215'
+branch_labels = None
+depends_on = None
+
+
+def _create(name, slotted):
+    op.create_table(name,
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    *([sa.Column('slot', sa.Integer(), autoincrement=False, nullable=False)] if slotted else []),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id'], ),
+    sa.PrimaryKeyConstraint('day', 'tenant_id', *(['slot'] if slotted else []))
+    )
+
+
+def _rename_old():
+    op.rename_table('order_revenue_daily', 'order_revenue_daily_old')
+    if op.get_bind().dialect.name == 'postgresql':
+        # Free the constraint names for the new table
+        op.execute('ALTER INDEX order_revenue_daily_pkey RENAME TO order_revenue_daily_old_pkey')
+        op.execute('ALTER TABLE order_revenue_daily_old RENAME CONSTRAINT '
+                   'order_revenue_daily_tenant_id_fkey TO order_revenue_daily_old_tenant_id_fkey')
+
+
+def upgrade():
+    # The primary key changes, so copy into a new table (SQLite can't alter keys)
+    _rename_old()
+    _create('order_revenue_daily', slotted=True)
+    op.execute(
+        'INSERT INTO order_revenue_daily (day, tenant_id, slot, revenue, order_count) '
+        'SELECT day, tenant_id, 0, revenue, order_count FROM order_revenue_daily_old'
+    )
+    op.drop_table('order_revenue_daily_old')
+
+
+def downgrade():
+    _rename_old()
+    _create('order_revenue_daily', slotted=False)
+    op.execute(
+        'INSERT INTO order_revenue_daily (day, tenant_id, revenue, order_count) '
+        'SELECT day, tenant_id, SUM(revenue), SUM(order_count) FROM order_revenue_daily_old '
+        'GROUP BY day, tenant_id'
+    )
+    op.drop_table('order_revenue_daily_old')
@@ -0,0 +1,41 @@
+"""add daily order revenue rollup
+
+Revision ID: 6c2e9a4f1b70
+Revises: 3b6f8d1e9c27
+Create Date: 2026-10-18 14:05:41.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c2e9a4f1b70'
+down_revision = '3b6f8d1e9c27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_revenue_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id'], ),
+    sa.PrimaryKeyConstraint('day', 'tenant_id')
+    )
+
+    # Backfill from existing orders (same as `flask backfill-revenue-rollup`);
+    # DATE() works on both SQLite and PostgreSQL timestamps
+    op.execute(
+        'INSERT INTO order_revenue_daily (day, tenant_id, revenue, order_count) '
+        'SELECT DATE(o.created_at), p.tenant_id, SUM(i.quantity * i.price_at_purchase), COUNT(DISTINCT o.id) '
+        'FROM "order" o JOIN order_item i ON i.order_id = o.id JOIN product p ON p.id = i.product_id '
+        "WHERE o.status NOT IN ('Cancelled', 'Expired') AND o.created_at IS NOT NULL "
+        'GROUP BY DATE(o.created_at), p.tenant_id'
+    )
+
+
+def downgrade():
+    op.drop_table('order_revenue_daily')
@@ -0,0 +1,33 @@
+"""normalize order.created_at text on SQLite
+
+Revision ID: 8f3c6a1d9e25
+Revises: 5e8b2d7a1c93
+Create Date: 2026-10-18 21:04:52.316094
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3c6a1d9e25'
+down_revision = '5e8b2d7a1c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Orders created while created_at defaulted to SQL current_timestamp are
+    # stored as 'YYYY-MM-DD HH:MM:SS'; newer ones as SQLAlchemy writes DateTime,
+    # with '.ffffff'. SQLite compares the text, so the short form sorts before
+    # the same second in the long form and the (created_at, id) keyset cursor
+    # can skip or repeat orders. PostgreSQL timestamps need nothing.
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "UPDATE \"order\" SET created_at = created_at || '.000000' "
+            "WHERE length(created_at) = 19"
+        )
+
+
+def downgrade():
+    # Both forms read back as the same datetime; nothing to undo
+    pass
@@ -0,0 +1,41 @@
+"""add hourly activity counters
+
+Revision ID: 9a7d3e5c2f14
+Revises: 6c2e9a4f1b70
+Create Date: 2026-10-18 14:48:20.617093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a7d3e5c2f14'
+down_revision = '6c2e9a4f1b70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('activity_counter',
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('slot', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'bucket', 'slot')
+    )
+
+    # Backfill order counters from existing orders (same as `flask backfill-activity`)
+    if op.get_bind().dialect.name == 'postgresql':
+        bucket = "date_trunc('hour', created_at)"
+    else:
+        bucket = "strftime('%Y-%m-%d %H:00:00.000000', created_at)"
+    op.execute(
+        f"INSERT INTO activity_counter (kind, bucket, slot, count) "
+        f"SELECT 'order', {bucket}, 0, COUNT(id) FROM \"order\" "
+        f"WHERE created_at IS NOT NULL GROUP BY {bucket}"
+    )
+
+
+def downgrade():
+    op.drop_table('activity_counter')
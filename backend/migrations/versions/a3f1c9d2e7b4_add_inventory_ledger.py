@@ -0,0 +1,41 @@
+"""add inventory ledger
+
+Revision ID: a3f1c9d2e7b4
+Revises: 4b76cd624767
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d2e7b4'
+down_revision = '4b76cd624767'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('inventory_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['product.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('inventory_ledger', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_inventory_ledger_order_id'), ['order_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_inventory_ledger_product_id'), ['product_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('inventory_ledger', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_inventory_ledger_product_id'))
+        batch_op.drop_index(batch_op.f('ix_inventory_ledger_order_id'))
+
+    op.drop_table('inventory_ledger')
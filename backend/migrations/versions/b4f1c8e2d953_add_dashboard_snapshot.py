@@ -0,0 +1,30 @@
+"""add admin dashboard snapshot
+
+Revision ID: b4f1c8e2d953
+Revises: 9a7d3e5c2f14
+Create Date: 2026-10-18 15:31:06.482951
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4f1c8e2d953'
+down_revision = '9a7d3e5c2f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('dashboard_snapshot',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.Column('lease_until', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('dashboard_snapshot')
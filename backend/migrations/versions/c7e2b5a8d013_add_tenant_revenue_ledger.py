@@ -0,0 +1,60 @@
+"""add tenant revenue ledger and balance snapshots
+
+Revision ID: c7e2b5a8d013
+Revises: a3f1c9d2e7b4
+Create Date: 2026-10-18 10:02:17.553910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2b5a8d013'
+down_revision = 'a3f1c9d2e7b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tenant_revenue_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('compacted', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tenant_revenue_entry', schema=None) as batch_op:
+        batch_op.create_index('ix_tenant_revenue_entry_compacted_tenant_id', ['compacted', 'tenant_id'], unique=False)
+
+    op.create_table('tenant_balance_snapshot',
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenant.id'], ),
+    sa.PrimaryKeyConstraint('tenant_id')
+    )
+
+    # Carry existing balances over as the opening snapshot of every tenant
+    op.execute(
+        'INSERT INTO tenant_balance_snapshot (tenant_id, balance, updated_at) '
+        'SELECT id, COALESCE(account_balance, 0), CURRENT_TIMESTAMP FROM tenant'
+    )
+
+
+def downgrade():
+    # Fold everything back into tenant.account_balance before dropping the ledger
+    op.execute(
+        'UPDATE tenant SET account_balance = '
+        'COALESCE((SELECT balance FROM tenant_balance_snapshot s WHERE s.tenant_id = tenant.id), account_balance, 0) + '
+        'COALESCE((SELECT SUM(amount) FROM tenant_revenue_entry e WHERE e.tenant_id = tenant.id AND NOT e.compacted), 0)'
+    )
+    op.drop_table('tenant_balance_snapshot')
+    with op.batch_alter_table('tenant_revenue_entry', schema=None) as batch_op:
+        batch_op.drop_index('ix_tenant_revenue_entry_compacted_tenant_id')
+
+    op.drop_table('tenant_revenue_entry')
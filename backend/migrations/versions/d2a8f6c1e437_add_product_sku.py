@@ -0,0 +1,28 @@
+"""add tenant-scoped product sku
+
+Revision ID: d2a8f6c1e437
+Revises: b4f1c8e2d953
+Create Date: 2026-10-18 16:12:44.309571
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a8f6c1e437'
+down_revision = 'b4f1c8e2d953'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sku', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_product_tenant_id_sku', ['tenant_id', 'sku'])
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_product_tenant_id_sku', type_='unique')
+        batch_op.drop_column('sku')
@@ -0,0 +1,48 @@
+"""add full-text product search index
+
+Revision ID: e7c3b9d4a215
+Revises: d2a8f6c1e437
+Create Date: 2026-10-18 16:58:12.904417
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c3b9d4a215'
+down_revision = 'd2a8f6c1e437'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Not in the models: FTS5 virtual table on SQLite, tsvector + GIN on PostgreSQL
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            'CREATE TABLE product_search ('
+            'product_id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)'
+        )
+        op.execute('CREATE INDEX ix_product_search_document ON product_search USING GIN (document)')
+        op.execute(
+            'INSERT INTO product_search (product_id, document) '
+            "SELECT p.id, "
+            "setweight(to_tsvector('simple', coalesce(p.name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(t.shop_name, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(t.category, '')), 'C') || "
+            "setweight(to_tsvector('simple', coalesce(p.description, '')), 'D') "
+            'FROM product p JOIN tenant t ON t.id = p.tenant_id'
+        )
+    else:
+        op.execute(
+            'CREATE VIRTUAL TABLE product_search USING fts5('
+            "name, description, shop_name, category, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            'INSERT INTO product_search (rowid, name, description, shop_name, category) '
+            "SELECT p.id, p.name, coalesce(p.description, ''), t.shop_name, coalesce(t.category, '') "
+            'FROM product p JOIN tenant t ON t.id = p.tenant_id'
+        )
+
+
+def downgrade():
+    op.execute('DROP TABLE product_search')
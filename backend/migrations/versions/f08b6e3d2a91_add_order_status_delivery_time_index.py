@@ -0,0 +1,25 @@
+"""add order status/delivery_time index
+
+Revision ID: f08b6e3d2a91
+Revises: e51d0a9c4f62
+Create Date: 2026-10-18 11:20:52.804415
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f08b6e3d2a91'
+down_revision = 'e51d0a9c4f62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.create_index('ix_order_status_delivery_time', ['status', 'delivery_time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index('ix_order_status_delivery_time')
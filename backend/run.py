@@ -4,7 +4,8 @@ import traceback
 
 try:
     from app import create_app
-    app = create_app()
+    from config import CONFIGS, Config
+    app = create_app(CONFIGS.get(os.environ.get('FLASK_ENV'), Config))
 except Exception as e:
     print("!!! ERROR DURING APP STARTUP !!!")
     traceback.print_exc()
@@ -18,6 +18,8 @@ const CartPage = () => {
     
     // Checkout State
     const [openCheckout, setOpenCheckout] = useState(false);
+    // One key per checkout attempt so retries never create duplicate orders
+    const [checkoutKey, setCheckoutKey] = useState(null);
     const [checkoutData, setCheckoutData] = useState({
         name: '',
         phone: '',
@@ -45,6 +47,8 @@ const CartPage = () => {
             await api.post('/customer/orders', { 
                 items: orderItems,
                 delivery_info: deliveryPayload
+            }, {
+                headers: { 'Idempotency-Key': checkoutKey }
             });
             
             clearCart();
@@ -206,7 +210,7 @@ const CartPage = () => {
                                     variant="contained" 
                                     fullWidth 
                                     size="large" 
-                                    onClick={() => setOpenCheckout(true)} 
+                                    onClick={() => { setCheckoutKey(crypto.randomUUID()); setOpenCheckout(true); }} 
                                     disabled={loading}
                                     sx={{ 
                                         py: 2.5, 
@@ -137,11 +137,14 @@ const OrderRow = ({ order, onUpdate }) => {
 const TenantOrders = () => {
     const [orders, setOrders] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     const fetchOrders = async () => {
         try {
             const res = await api.get('/tenant/orders');
             setOrders(res.data);
+            setNextCursor(res.headers['x-next-cursor'] || null);
         } catch (error) {
             console.error("Failed to load orders", error);
         } finally {
@@ -149,6 +152,19 @@ const TenantOrders = () => {
         }
     };
 
+    const loadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const res = await api.get('/tenant/orders', { params: { cursor: nextCursor } });
+            setOrders((prev) => [...prev, ...res.data]);
+            setNextCursor(res.headers['x-next-cursor'] || null);
+        } catch (error) {
+            console.error("Failed to load more orders", error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         fetchOrders();
     }, []);
@@ -194,6 +210,13 @@ const TenantOrders = () => {
                                 ))}
                             </TableBody>
                         </Table>
+                        {nextCursor && (
+                            <Box sx={{ display: 'flex', justifyContent: 'center', p: 2 }}>
+                                <Button onClick={loadMore} disabled={loadingMore} sx={{ color: '#D4AF37' }}>
+                                    {loadingMore ? <CircularProgress size={20} sx={{ color: '#D4AF37' }} /> : 'Load More'}
+                                </Button>
+                            </Box>
+                        )}
                     </TableContainer>
                 ) : (
                     <Paper sx={{ 
@@ -14,6 +14,11 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    // Read our own writes: the backend keeps our reads off the replica until this time
+    const readPrimaryUntil = sessionStorage.getItem('readPrimaryUntil');
+    if (readPrimaryUntil && Number(readPrimaryUntil) * 1000 > Date.now()) {
+      config.headers['X-Read-Primary-Until'] = readPrimaryUntil;
+    }
     return config;
   },
   (error) => Promise.reject(error)
@@ -21,7 +26,13 @@ api.interceptors.request.use(
 
 // Add a response interceptor to handle token expiration
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const readPrimaryUntil = response.headers['x-read-primary-until'];
+    if (readPrimaryUntil) {
+      sessionStorage.setItem('readPrimaryUntil', readPrimaryUntil);
+    }
+    return response;
+  },
   (error) => {
     if (error.response && error.response.status === 401) {
       localStorage.removeItem('token');